@@ -0,0 +1,134 @@
+"""Measures extraction throughput of a synthetic cuDNN 8.3 ``.tar.xz``.
+
+The archive has the shape of ``cudnn-linux-x86_64-8.3.*-archive.tar.xz``: a
+few large shared and static libraries, their symbolic links and headers.
+Library contents compress about 4:1 like the real ones.  Sizes are scaled
+by ``--scale``, where 1 is about the size of the real archive.
+
+    $ python benchmarks/extract_throughput.py [--scale S] [--dir DIR]
+"""
+
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cudnnenv import archive  # NOQA
+from cudnnenv import manifest  # NOQA
+from cudnnenv.archive import which  # NOQA
+
+
+# Sizes in MiB of libraries in cuDNN 8.3 for CUDA 11.5
+_libraries = [
+    ('libcudnn_cnn_infer.so.8.3.2', 620),
+    ('libcudnn_cnn_infer_static.a', 660),
+    ('libcudnn_adv_infer.so.8.3.2', 120),
+    ('libcudnn_adv_infer_static.a', 125),
+    ('libcudnn_ops_infer.so.8.3.2', 95),
+    ('libcudnn_ops_infer_static.a', 100),
+    ('libcudnn_cnn_train.so.8.3.2', 110),
+    ('libcudnn_adv_train.so.8.3.2', 110),
+    ('libcudnn_ops_train.so.8.3.2', 25),
+    ('libcudnn.so.8.3.2', 1),
+]
+
+_top = 'cudnn-linux-x86_64-8.3.2.44_cuda11.5-archive'
+
+
+def _content(size):
+    # A quarter of each block is random, so xz compresses it about 4:1
+    block = 1 << 16
+    blocks = (os.urandom(block // 4) + b'\0' * (block - block // 4)
+              for _ in range(size // block + 1))
+    return b''.join(blocks)[:size]
+
+
+def make_archive(path, scale):
+    with tarfile.open(path, 'w:xz', preset=1) as tar:
+        for i in range(12):
+            data = b'/* header %d */\n' % i * 2000
+            info = tarfile.TarInfo('%s/include/cudnn_%d.h' % (_top, i))
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        total = 0
+        for name, size in _libraries:
+            data = _content(int(size * scale * (1 << 20)))
+            total += len(data)
+            info = tarfile.TarInfo('%s/lib/%s' % (_top, name))
+            info.size = len(data)
+            info.mode = 0o755
+            tar.addfile(info, io.BytesIO(data))
+            if name.endswith('.so.8.3.2'):
+                info = tarfile.TarInfo('%s/lib/%s' % (_top, name[:-6]))
+                info.type = tarfile.SYMTYPE
+                info.linkname = name
+                tar.addfile(info)
+    return total
+
+
+def measure(run, dest):
+    best = None
+    for _ in range(3):
+        shutil.rmtree(dest, ignore_errors=True)
+        os.makedirs(dest)
+        start = time.time()
+        run()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=float, default=0.25,
+                        help='Size of the archive relative to the real one')
+    parser.add_argument('--dir', help='Directory to extract to')
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(dir=args.dir)
+    try:
+        path = os.path.join(work, 'cudnn.tar.xz')
+        dest = os.path.join(work, 'out')
+        total = make_archive(path, args.scale)
+        print('archive: %.0f MiB compressed, %.0f MiB extracted' % (
+            os.path.getsize(path) / (1 << 20), total / (1 << 20)))
+
+        def extract(writers, xz_decompressor):
+            with open(path, 'rb') as f:
+                archive.extract(f, dest, manifest=manifest.Manifest(),
+                                writers=writers,
+                                xz_decompressor=xz_decompressor)
+
+        runs = [
+            ('lzma thread, 0 writers', lambda: extract(0, 'lzma')),
+            ('lzma thread, 2 writers', lambda: extract(2, 'lzma')),
+        ]
+        # The rest depend on commands of the host
+        if which('xz') is not None:
+            runs += [
+                ('xz process, 0 writers', lambda: extract(0, 'xz')),
+                ('xz process, 2 writers', lambda: extract(2, 'xz')),
+            ]
+        if which('tar') is not None:
+            runs.append(('tar -xJf (no hashing)', lambda: subprocess.check_call(
+                ['tar', '-xJf', path, '-C', dest])))
+        for label, run in runs:
+            elapsed = measure(run, dest)
+            print('%-23s %6.2f s  %7.1f MiB/s' % (
+                label, elapsed, total / (1 << 20) / elapsed))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Measures the time a prompt spends on cudnnenv.
+
+It compares the hook printed by ``cudnnenv init bash``, which most prompts
+run without starting Python, with calling ``cudnnenv version`` from a prompt.
+
+    $ python benchmarks/prompt_overhead.py [-n PROMPTS]
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+
+_cudnnenv = '%s -c "import cudnnenv; cudnnenv.main()"' % sys.executable
+
+
+def time_prompts(setup, prompt, n, env):
+    # Only the loop is timed, by the `time` keyword of bash
+    script = '%s\nTIMEFORMAT=%%R\ntime { for i in $(seq %d); do %s; done; }' % (
+        setup, n, prompt)
+    output = subprocess.check_output(
+        ['bash', '-c', script], env=env, stderr=subprocess.STDOUT)
+    return float(output.decode('utf-8').split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=200, help='Number of prompts')
+    args = parser.parse_args()
+
+    home = tempfile.mkdtemp()
+    try:
+        env = dict(os.environ)
+        env['CUDNNENV_ROOT'] = os.path.join(home, '.cudnn')
+        env['PYTHONPATH'] = os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))
+        os.makedirs(os.path.join(home, '.cudnn', 'versions', 'v0', 'cuda'))
+        subprocess.check_output(_cudnnenv + ' activate v0', env=env,
+                                shell=True)
+        init = 'eval "$(%s init bash)"' % _cudnnenv
+
+        baseline = time_prompts(init, ':', args.n, env)
+        hook = time_prompts(init, '_cudnnenv_hook', args.n, env)
+        version = time_prompts(
+            '', '%s version >/dev/null' % _cudnnenv, args.n, env)
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+    print('prompts: %d' % args.n)
+    print('init hook:          %8.3f ms/prompt' % (
+        (hook - baseline) * 1000 / args.n))
+    print('`cudnnenv version`: %8.3f ms/prompt' % (
+        (version - baseline) * 1000 / args.n))
+
+
+if __name__ == '__main__':
+    main()
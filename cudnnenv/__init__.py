@@ -4,1023 +4,133 @@ from __future__ import unicode_literals
 import argparse
 import contextlib
 import os
-import platform
 import shutil
-import subprocess
 import sys
 import tempfile
 
 __version__ = '0.8.0'
 
 
-if int(platform.python_version_tuple()[0]) >= 3:
+if sys.version_info[0] >= 3:
     _raw_input = input
 else:
     _raw_input = raw_input  # NOQA
 
 
-cudnn_home = os.path.join(os.environ['HOME'], '.cudnn')
-
-codes = {}
+cudnn_home = os.environ.get(
+    'CUDNNENV_ROOT', os.path.join(os.environ['HOME'], '.cudnn'))
 
 if 'linux' in sys.platform:
-    cudnn2_base = '''
-curl -s -o {cudnn}.tgz https://developer.download.nvidia.com/compute/redist/cudnn/{cudnn_ver}/{cudnn}.tgz &&
-echo "{sha256sum}  {cudnn}.tgz" | sha256sum -cw --quiet - &&
-tar -xzf {cudnn}.tgz &&
-rm {cudnn}.tgz &&
-mkdir -p {{path}}/cuda/include &&
-mkdir -p {{path}}/cuda/lib64 &&
-mv {cudnn}/cudnn.h {{path}}/cuda/include/. &&
-mv {cudnn}/libcudnn.so {{path}}/cuda/lib64/. &&
-mv {cudnn}/libcudnn.so.6.5 {{path}}/cuda/lib64/. &&
-mv {cudnn}/libcudnn.so.6.5.48 {{path}}/cuda/lib64/. &&
-mv {cudnn}/libcudnn_static.a {{path}}/cuda/lib64/.
-'''
-
-    codes['v2'] = cudnn2_base.format(
-        cudnn='cudnn-6.5-linux-x64-v2',
-        cudnn_ver='v2',
-        sha256sum='4b02cb6bf9dfa57f63bfff33e532f53e2c5a12f9f1a1b46e980e626a55f380aa',
-    )
-
-    cudnn_base = '''
-curl -o {cudnn}.tgz https://developer.download.nvidia.com/compute/redist/cudnn/{cudnn_ver}/{cudnn}.tgz &&
-echo "{sha256sum}  {cudnn}.tgz" | sha256sum -cw --quiet - &&
-tar -xzf {cudnn}.tgz -C {{path}} &&
-rm {cudnn}.tgz
-'''
-
-    codes['v3'] = cudnn_base.format(
-        cudnn='cudnn-7.0-linux-x64-v3.0-prod',
-        cudnn_ver='v3',
-        sha256sum='98679d5ec039acfd4d81b8bfdc6a6352d6439e921523ff9909d364e706275c2b',
-    )
-
-    codes['v4'] = cudnn_base.format(
-        cudnn='cudnn-7.0-linux-x64-v4.0-prod',
-        cudnn_ver='v4',
-        sha256sum='cd091763d5889f0efff1fbda83bade191f530743a212c6b0ecc2a64d64d94405',
-    )
-
-    codes['v5'] = cudnn_base.format(
-        cudnn='cudnn-7.5-linux-x64-v5.0-ga',
-        cudnn_ver='v5',
-        sha256sum='c4739a00608c3b66a004a74fc8e721848f9112c5cb15f730c1be4964b3a23b3a',
-    )
-
-    codes['v5-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-linux-x64-v5.0-ga',
-        cudnn_ver='v5',
-        sha256sum='af80eb1ce0cb51e6a734b2bdc599e6d50b676eab3921e5bddfe5443485df86b6',
-    )
-
-    codes['v51'] = cudnn_base.format(
-        cudnn='cudnn-7.5-linux-x64-v5.1',
-        cudnn_ver='v5.1',
-        sha256sum='69ca71f7728b54b6e003393083f419b24774fecd3b08bbf41bceac9a9fe16345',
-    )
-
-    codes['v51-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-linux-x64-v5.1',
-        cudnn_ver='v5.1',
-        sha256sum='c10719b36f2dd6e9ddc63e3189affaa1a94d7d027e63b71c3f64d449ab0645ce',
-    )
-
-    codes['v6'] = cudnn_base.format(
-        cudnn='cudnn-7.5-linux-x64-v6.0',
-        cudnn_ver='v6.0',
-        sha256sum='568d4b070c5f91ab8a15b287b73dd072b99c7267a43edad13f70337cd186c82c',
-    )
-
-    codes['v6-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-linux-x64-v6.0',
-        cudnn_ver='v6.0',
-        sha256sum='9b09110af48c9a4d7b6344eb4b3e344daa84987ed6177d5c44319732f3bb7f9c',
-    )
-
-    codes['v7.0.1-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-linux-x64-v7',
-        cudnn_ver='v7.0.1',
-        sha256sum='288d844ab289b56d0c7b6719a34c7c0b57a01c58ffbe4d582c9b539da96ed2a7',
-    )
-
-    codes['v7.0.1-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7',
-        cudnn_ver='v7.0.1',
-        sha256sum='32d0caf6250ea8d2c3c80649ea6a032e46741d78bdca40c37b8ac67b00fe3244',
-    )
-
-    codes['v7.0.2-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-linux-x64-v7',
-        cudnn_ver='v7.0.2',
-        sha256sum='b667807f2b82af7a9ed5451e9ff5ea7a11deeef85aafdc5529e1adfddcc069ca',
-    )
-
-    codes['v7.0.2-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7',
-        cudnn_ver='v7.0.2',
-        sha256sum='ec2a89453ef6454d417b7f3dad67405e30953e1df1e47aafb846f99d02eaa5d1',
-    )
-
-    codes['v7.0.3-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-linux-x64-v7',
-        cudnn_ver='v7.0.3',
-        sha256sum='e44dd20750ea1fa287ed0576c71d7ba30383aabdaacd18df173947cf7a53fc3f',
-    )
-
-    codes['v7.0.3-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7',
-        cudnn_ver='v7.0.3',
-        sha256sum='09583e93110cee2bf76ea355e1d9c7c366a50ad858362064f7c927cc46209ef9',
-    )
-
-    codes['v7.0.4-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-linux-x64-v7',
-        cudnn_ver='v7.0.4',
-        sha256sum='c9d6e482063407edaa799c944279e5a1a3a27fd75534982076e62b1bebb4af48',
-    )
-
-    codes['v7.0.4-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7',
-        cudnn_ver='v7.0.4',
-        sha256sum='963da2057c298616dab0c754398dcb1cced1bdc5f21ca00258b149f709b5bc4f',
-    )
-
-    codes['v7.0.5-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-linux-x64-v7',
-        cudnn_ver='v7.0.5',
-        sha256sum='9e0b31735918fe33a79c4b3e612143d33f48f61c095a3b993023cdab46f6d66e',
-    )
-
-    codes['v7.0.5-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7',
-        cudnn_ver='v7.0.5',
-        sha256sum='1a3e076447d5b9860c73d9bebe7087ffcb7b0c8814fd1e506096435a2ad9ab0e',
-    )
-
-    codes['v7.0.5-cuda91'] = cudnn_base.format(
-        cudnn='cudnn-9.1-linux-x64-v7',
-        cudnn_ver='v7.0.5',
-        sha256sum='1ead5da7324db35dcdb3721a8d4fc020b217c68cdb3b3daa1be81eb2456bd5e5',
-    )
-
-    codes['v7-cuda8'] = codes['v7.0.5-cuda8']
-    codes['v7-cuda9'] = codes['v7.0.5-cuda9']
-    codes['v7-cuda91'] = codes['v7.0.5-cuda91']
-
-    codes['v7.1.1-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-linux-x64-v7.1',
-        cudnn_ver='v7.1.1',
-        sha256sum='4a9d59ecee53e830f24e90d689dbab1aa9f69efced823f33046040901c4151e1',
-    )
-
-    codes['v7.1.1-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.1',
-        cudnn_ver='v7.1.1',
-        sha256sum='d2038dca6e6070aa6879d827fa6c032c942514a6b9bddf5ade275670ca474b9c',
-    )
-
-    codes['v7.1.1-cuda91'] = cudnn_base.format(
-        cudnn='cudnn-9.1-linux-x64-v7.1',
-        cudnn_ver='v7.1.1',
-        sha256sum='ae3cf4f6d0d5b39c74742dadb44c91e51531b79e3d01a7aab3459ab9bed2f475',
-    )
-
-    codes['v7.1.2-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-linux-x64-v7.1',
-        cudnn_ver='v7.1.2',
-        sha256sum='a5dfd656811fe9c43d87c40338cec5e1a85ad5a9cd3b5f1e95dd67d5e126aacc',
-    )
-
-    codes['v7.1.2-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.1',
-        cudnn_ver='v7.1.2',
-        sha256sum='d5f8b56a05dc002a801f8f2081518c20b496006f14617d568bde24dcfb3f6388',
-    )
-
-    codes['v7.1.2-cuda91'] = cudnn_base.format(
-        cudnn='cudnn-9.1-linux-x64-v7.1',
-        cudnn_ver='v7.1.2',
-        sha256sum='c61000ed700bc5a009bc2e135bbdf736c9743212b2174a2fc9018a66cc0979ec',
-    )
-
-    codes['v7.1.3-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-linux-x64-v7.1',
-        cudnn_ver='v7.1.3',
-        sha256sum='31ed3c3bfb9c515c228c1dcbb306277ce08836e84e3facedef6182d872f8cd3d',
-    )
-
-    codes['v7.1.3-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.1',
-        cudnn_ver='v7.1.3',
-        sha256sum='203a1700cc5b96f679d550d8bbcf99bdc254654b399e6bf79ef8ed6e6b83a369',
-    )
-
-    codes['v7.1.3-cuda91'] = cudnn_base.format(
-        cudnn='cudnn-9.1-linux-x64-v7.1',
-        cudnn_ver='v7.1.3',
-        sha256sum='dd616d3794167ceb923d706bf73e8d6acdda770751492b921ee6827cdf190228',
-    )
-
-    codes['v7.1.4-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.1',
-        cudnn_ver='v7.1.4',
-        sha256sum='60b581d0f05324c33323024a264aa3fb185c533e2f67dae7fda847b926bb7e57',
-    )
-
-    codes['v7.1.4-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-linux-x64-v7.1',
-        cudnn_ver='v7.1.4',
-        sha256sum='f875340f812b942408098e4c9807cb4f8bdaea0db7c48613acece10c7c827101',
-    )
-
-    codes['v7.2.1-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-linux-x64-v7.2.1.38',
-        cudnn_ver='v7.2.1',
-        sha256sum='c2d58788fd51d892fb84a1fae578d8cb432f7301b279d0a1cf7b38faf79993f4',
-    )
-
-    codes['v7.2.1-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.2.1.38',
-        cudnn_ver='v7.2.1',
-        sha256sum='cf007437b9ac6250ec63b89c25f248d2597fdd01369c80146567f78e75ce4e37',
-    )
-
-    codes['v7.2.1-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-linux-x64-v7.2.1.38',
-        cudnn_ver='v7.2.1',
-        sha256sum='3e78f5f0edbe614b56f00ff2d859c5409d150c87ae6ba3df09f97d537909c2e9',
-    )
-
-    codes['v7.3.0-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.3.0.29',
-        cudnn_ver='v7.3.0',
-        sha256sum='403f9043ff2c7b2c5967454872275d07bca11fd41dfc7b21995eadcad6dbe49b',
-    )
-
-    codes['v7.3.0-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-linux-x64-v7.3.0.29',
-        cudnn_ver='v7.3.0',
-        sha256sum='7526a33bc3c152ca5d8f3eddedaa4a0b3c721a3c0000eeb80ebfe5cbc54696b7',
-    )
-
-    codes['v7.4.1-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.4.1.5',
-        cudnn_ver='v7.4.1',
-        sha256sum='bec38fc281fec0226766cce050473043765345cb8a5ed699da4d663ecfa4f24d',
-    )
-
-    codes['v7.4.1-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-linux-x64-v7.4.1.5',
-        cudnn_ver='v7.4.1',
-        sha256sum='a850d62f32c6a18271932d9a96072ac757c2c516bd1200ae8b79e4bdd3800b5b',
-    )
-
-    codes['v7.4.1-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-linux-x64-v7.4.1.5',
-        cudnn_ver='v7.4.1',
-        sha256sum='b320606f1840eec0cdd4453cb333554a3fe496dd4785f10d8e87fe1a4f52bd5c',
-    )
-
-    codes['v7.4.2-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.4.2.24',
-        cudnn_ver='v7.4.2',
-        sha256sum='e3e72e9e2bf4c5e4cdd467aa6b824effc4566d230a2cda4153ad894d7d15cf73',
-    )
-
-    codes['v7.4.2-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-linux-x64-v7.4.2.24',
-        cudnn_ver='v7.4.2',
-        sha256sum='19565be5dba39097d59f99227fd65cd2f3a3be9e4249500f772d4b14c7806371',
-    )
-
-    codes['v7.4.2-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-linux-x64-v7.4.2.24',
-        cudnn_ver='v7.4.2',
-        sha256sum='2edfc86a02b50d17e88c478955a332e6a1e8174e7e53a3458b4ea51faf02daa3',
-    )
-
-    codes['v7.5.0-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.5.0.56',
-        cudnn_ver='v7.5.0',
-        sha256sum='ee0ecd3cc30b9bf5ec875eac3ed375d3996bcb0ed5d2551716e4884b3ea5ce8c',
-    )
-
-    codes['v7.5.0-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-linux-x64-v7.5.0.56',
-        cudnn_ver='v7.5.0',
-        sha256sum='2a04fd5ed5b8d32e2401c85a1a38f3cfd6da662c31bd26e80bea25469e48a675',
-    )
-
-    codes['v7.5.0-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-linux-x64-v7.5.0.56',
-        cudnn_ver='v7.5.0',
-        sha256sum='701097882cb745d4683bb7ff6c33b8a35c7c81be31bac78f05bad130e7e0b781',
-    )
-
-    codes['v7.5.0-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-linux-x64-v7.5.0.56',
-        cudnn_ver='v7.5.0',
-        sha256sum='c31697d6b71afe62838ad2e57da3c3c9419c4e9f5635d14b683ebe63f904fbc8',
-    )
-
-    codes['v7.5.1-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.5.1.10',
-        cudnn_ver='v7.5.1',
-        sha256sum='1abe08839dcb59a3a7293c85f642bf0dd2486e377d0fbca1b0311f38e183251a',
-    )
-
-    codes['v7.5.1-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-linux-x64-v7.5.1.10',
-        cudnn_ver='v7.5.1',
-        sha256sum='e840d29ce5f0c068911966e62128397c6a9bb5e2ea9c66394a592c3b61e770a5',
-    )
-
-    codes['v7.5.1-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-linux-x64-v7.5.1.10',
-        cudnn_ver='v7.5.1',
-        sha256sum='c0a4ec438920aa581dd567117b9c316745b4a451ac739b1e04939a3d8b229985',
-    )
-
-    codes['v7.5.1-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-linux-x64-v7.5.1.10',
-        cudnn_ver='v7.5.1',
-        sha256sum='2c833f43c9147d9a25a20947a4c5a5f5c33b2443240fd767f63b330c482e68e0',
-    )
-
-    codes['v7.6.0-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.6.0.64',
-        cudnn_ver='v7.6.0',
-        sha256sum='90659ea77734b7b671afe930c9898d21a13b888998f1dd3940cc57d6b2f29b86',
-    )
-
-    codes['v7.6.0-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-linux-x64-v7.6.0.64',
-        cudnn_ver='v7.6.0',
-        sha256sum='ff028e6f07349445c16fef704a90bccb0992c3e012bba66ab1da352bad55b304',
-    )
-
-    codes['v7.6.0-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-linux-x64-v7.6.0.64',
-        cudnn_ver='v7.6.0',
-        sha256sum='c4e1ee4168f4cadabaa989487a47bed09f34d34e35398b6084a2699d11bd2560',
-    )
-
-    codes['v7.6.0-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-linux-x64-v7.6.0.64',
-        cudnn_ver='v7.6.0',
-        sha256sum='e956c6f9222fcb867a10449cfc76dee5cfd7c7531021d95fe9586d7e043b57d7',
-    )
-
-    codes['v7.6.1-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.6.1.34',
-        cudnn_ver='v7.6.1',
-        sha256sum='57a921b20be1d3d1192e59ecfdee61c55e06e530a6d414a013083fa81a77f1c5',
-    )
-
-    codes['v7.6.1-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-linux-x64-v7.6.1.34',
-        cudnn_ver='v7.6.1',
-        sha256sum='0d38735b06a1daf518c7ad4977fdb987a470f7793d95542ac9897e214ab1b006',
-    )
-
-    codes['v7.6.1-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-linux-x64-v7.6.1.34',
-        cudnn_ver='v7.6.1',
-        sha256sum='af0791cba08468a4bf2a4ef15a787dac261f41219caaf335984d47d11eca19ba',
-    )
-
-    codes['v7.6.1-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-linux-x64-v7.6.1.34',
-        cudnn_ver='v7.6.1',
-        sha256sum='9885e38e71fa9844b3e4fb7c7211af41b24c9f76a9014f9d5e1768ddff2087dc',
-    )
-
-    codes['v7.6.2-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.6.2.24',
-        cudnn_ver='v7.6.2',
-        sha256sum='787adab5287597bf9a6462be4bcd55904593690315a889884d8ccfa8aaa9e370',
-    )
-
-    codes['v7.6.2-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-linux-x64-v7.6.2.24',
-        cudnn_ver='v7.6.2',
-        sha256sum='9a015dbda1caa904433c71c89f7d61559c9fa5667ad53663c529efae49966e46',
-    )
-
-    codes['v7.6.2-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-linux-x64-v7.6.2.24',
-        cudnn_ver='v7.6.2',
-        sha256sum='86d87c426537a55dbdbe416b92f8afa1e49361a759c3d17f119e431767a88432',
-    )
-
-    codes['v7.6.2-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-linux-x64-v7.6.2.24',
-        cudnn_ver='v7.6.2',
-        sha256sum='afbfd6a61e774beb3851742452c007de4f65f8ec0592d583bc6806f8d386cd1f',
-    )
-
-    codes['v7.6.3-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.6.3.30',
-        cudnn_ver='v7.6.3',
-        sha256sum='00b4664a36fca4778ed245fe766a13ececef94797720e15e24efcde02fc4c230',
-    )
-
-    codes['v7.6.3-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-linux-x64-v7.6.3.30',
-        cudnn_ver='v7.6.3',
-        sha256sum='d72d276d2e15cbf443fa1f1041a6457a0b238cb321eee36fe80638791f059007',
-    )
-
-    codes['v7.6.3-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-linux-x64-v7.6.3.30',
-        cudnn_ver='v7.6.3',
-        sha256sum='e19e156a10f6ccd57e3323cdb38290ac7c786907c669283130dc2b8a47fbf83b',
-    )
-
-    codes['v7.6.3-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-linux-x64-v7.6.3.30',
-        cudnn_ver='v7.6.3',
-        sha256sum='352557346d8111e2f954c494be1a90207103d316b8777c33e62b3a7f7b708961',
-    )
-
-    codes['v7.6.4-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.6.4.38',
-        cudnn_ver='v7.6.4',
-        sha256sum='8db78c3623c192d4f03f3087b41c32cb0baac95e13408b5d9dabe626cb4aab5d',
-    )
-
-    codes['v7.6.4-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-linux-x64-v7.6.4.38',
-        cudnn_ver='v7.6.4',
-        sha256sum='c79156531e641289b6a6952888b9637059ef30defd43c3cf82acf38d67f60a27',
-    )
-
-    codes['v7.6.4-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-linux-x64-v7.6.4.38',
-        cudnn_ver='v7.6.4',
-        sha256sum='417bb5daf51377037eb2f5c87649000ca1b9cec0acb16cfe07cb1d3e9a961dbf',
-    )
-
-    codes['v7.6.4-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-linux-x64-v7.6.4.38',
-        cudnn_ver='v7.6.4',
-        sha256sum='32091d115c0373027418620a09ebec3658a6bc467d011de7cdd0eb07d644b099',
-    )
-
-    codes['v7.6.5-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-linux-x64-v7.6.5.32',
-        cudnn_ver='v7.6.5',
-        sha256sum='bd0a4c0090d5b02feec3f195738968690cc2470b9bc6026e6fe8ff245cd261c8',
-    )
-
-    codes['v7.6.5-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-linux-x64-v7.6.5.32',
-        cudnn_ver='v7.6.5',
-        sha256sum='a2a2c7a8ba7b16d323b651766ee37dcfdbc2b50d920f73f8fde85005424960e4',
-    )
-
-    codes['v7.6.5-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-linux-x64-v7.6.5.32',
-        cudnn_ver='v7.6.5',
-        sha256sum='28355e395f0b2b93ac2c83b61360b35ba6cd0377e44e78be197b6b61b4b492ba',
-    )
-
-    codes['v7.6.5-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-linux-x64-v7.6.5.32',
-        cudnn_ver='v7.6.5',
-        sha256sum='7eaec8039a2c30ab0bc758d303588767693def6bf49b22485a2c00bf2e136cb3',
-    )
-
-    codes['v7.6.5-cuda102'] = cudnn_base.format(
-        cudnn='cudnn-10.2-linux-x64-v7.6.5.32',
-        cudnn_ver='v7.6.5',
-        sha256sum='600267f2caaed2fd58eb214ba669d8ea35f396a7d19b94822e6b36f9f7088c20',
-    )
-
-    codes['v8.0.2-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-linux-x64-v8.0.2.39',
-        cudnn_ver='v8.0.2',
-        sha256sum='82148a68bd6bdaab93af5e05bb1842b8ccb3ab7de7bed41f609a7616c102213d',
-    )
-
-    codes['v8.0.2-cuda102'] = cudnn_base.format(
-        cudnn='cudnn-10.2-linux-x64-v8.0.2.39',
-        cudnn_ver='v8.0.2',
-        sha256sum='c9cbe5c211360f3cfbc0fb104f0e9096b37e53f89392525679f049276b2f701f',
-    )
-
-    codes['v8.0.2-cuda11'] = cudnn_base.format(
-        cudnn='cudnn-11.0-linux-x64-v8.0.2.39',
-        cudnn_ver='v8.0.2',
-        sha256sum='672f46288b8edd98f8d156a4f1ff518201ca6de0cff67915ceaa37f6d6d86345',
-    )
-
-    codes['v8.0.3-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-linux-x64-v8.0.3.33',
-        cudnn_ver='v8.0.3',
-        sha256sum='4752ac6aea4e4d2226061610d6843da6338ef75a93518aa9ce50d0f58df5fb07',
-    )
-
-    codes['v8.0.3-cuda102'] = cudnn_base.format(
-        cudnn='cudnn-10.2-linux-x64-v8.0.3.33',
-        cudnn_ver='v8.0.3',
-        sha256sum='b3d487c621e24b5711983b89bb8ad34f0378bdbf8a1a4b86eefaa23b19956dcc',
-    )
-
-    codes['v8.0.3-cuda11'] = cudnn_base.format(
-        cudnn='cudnn-11.0-linux-x64-v8.0.3.33',
-        cudnn_ver='v8.0.3',
-        sha256sum='8924bcc4f833734bdd0009050d110ad0c8419d3796010cf7bc515df654f6065a',
-    )
-
-    codes['v8.0.4-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-linux-x64-v8.0.4.30',
-        cudnn_ver='v8.0.4',
-        sha256sum='eb4b888e61715168f57a0a0a21c281ada6856b728e5112618ed15f8637487715',
-    )
-
-    codes['v8.0.4-cuda102'] = cudnn_base.format(
-        cudnn='cudnn-10.2-linux-x64-v8.0.4.30',
-        cudnn_ver='v8.0.4',
-        sha256sum='c12c69eb16698eacac40aa46b9ce399d4cd86efb6ff0c105142f8a28fcfb980e',
-    )
-
-    codes['v8.0.4-cuda11'] = cudnn_base.format(
-        cudnn='cudnn-11.0-linux-x64-v8.0.4.30',
-        cudnn_ver='v8.0.4',
-        sha256sum='38a81a28952e314e21577432b0bab68357ef9de7f6c8858f721f78df9ee60c35',
-    )
-
-    codes['v8.0.4-cuda111'] = cudnn_base.format(
-        cudnn='cudnn-11.1-linux-x64-v8.0.4.30',
-        cudnn_ver='v8.0.4',
-        sha256sum='8f4c662343afce5998ce963500fe3bb167e9a508c1a1a949d821a4b80fa9beab',
-    )
-
-    codes['v8.0.5-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-linux-x64-v8.0.5.39',
-        cudnn_ver='v8.0.5',
-        sha256sum='90908495298896b33aa95063a3471f93c36627d7ac01c17dc36d75c65eea4a00',
-    )
-
-    codes['v8.0.5-cuda102'] = cudnn_base.format(
-        cudnn='cudnn-10.2-linux-x64-v8.0.5.39',
-        cudnn_ver='v8.0.5',
-        sha256sum='21f84c05c67bf1ec859e77c38ccd5bf154964fa1c308f449959be4c356e382f3',
-    )
-
-    codes['v8.0.5-cuda11'] = cudnn_base.format(
-        cudnn='cudnn-11.0-linux-x64-v8.0.5.39',
-        cudnn_ver='v8.0.5',
-        sha256sum='4e16ee7895deb4a8b1c194b812ba49586ef7d26902051401d3717511898a9b73',
-    )
-
-    codes['v8.0.5-cuda111'] = cudnn_base.format(
-        cudnn='cudnn-11.1-linux-x64-v8.0.5.39',
-        cudnn_ver='v8.0.5',
-        sha256sum='1d046bfa79399dabcc6f6cb1507918754439442ea0ca9e0fbecdd446f9b00cce',
-    )
-
-    codes['v8.1.0-cuda102'] = cudnn_base.format(
-        cudnn='cudnn-10.2-linux-x64-v8.1.0.77',
-        cudnn_ver='v8.1.0',
-        sha256sum='c5bc617d89198b0fbe485156446be15a08aee37f7aff41c797b120912f2b14b4',
-    )
-
-    codes['v8.1.0-cuda112'] = cudnn_base.format(
-        cudnn='cudnn-11.2-linux-x64-v8.1.0.77',
-        cudnn_ver='v8.1.0',
-        sha256sum='dbe82faf071d91ba9bcf00480146ad33f462482dfee56caf4479c1b8dabe3ecb',
-    )
-
-    codes['v8.1.1-cuda102'] = cudnn_base.format(
-        cudnn='cudnn-10.2-linux-x64-v8.1.1.33',
-        cudnn_ver='v8.1.1',
-        sha256sum='2a4a7b99a6e9bfa690eb19bb41e49553f2a7a491a5b3abfcae900e166c5b6ebd',
-    )
-
-    codes['v8.1.1-cuda112'] = cudnn_base.format(
-        cudnn='cudnn-11.2-linux-x64-v8.1.1.33',
-        cudnn_ver='v8.1.1',
-        sha256sum='98a8784e92862f20018d20c281b30d4a0cd951f93694f6433ccf4ae9c502ba6a',
-    )
-
-    codes['v8.2.0-cuda102'] = cudnn_base.format(
-        cudnn='cudnn-10.2-linux-x64-v8.2.0.53',
-        cudnn_ver='v8.2.0',
-        sha256sum='6ecbc98b3795e940ce0831ffb7cd2c0781830fdd6b1911f950bcaf6d569f807c',
-    )
-
-    codes['v8.2.0-cuda113'] = cudnn_base.format(
-        cudnn='cudnn-11.3-linux-x64-v8.2.0.53',
-        cudnn_ver='v8.2.0',
-        sha256sum='7a195dc93a7cda2bdd4d9b73958d259c784be422cd941a9a625aab75309f19dc',
-    )
-
-    codes['v8.2.1-cuda102'] = cudnn_base.format(
-        cudnn='cudnn-10.2-linux-x64-v8.2.1.32',
-        cudnn_ver='v8.2.1',
-        sha256sum='fd6321ff3bce4ce0cb3342e5bd38c96dcf3b073d44d0808962711c518b6d61e2',
-    )
-
-    codes['v8.2.1-cuda113'] = cudnn_base.format(
-        cudnn='cudnn-11.3-linux-x64-v8.2.1.32',
-        cudnn_ver='v8.2.1',
-        sha256sum='39412acd9ef5dd27954b6b9f5df75bd381c5d7ceb7979af6c743a7f4521f9c77',
-    )
-
-    codes['v8.2.2-cuda102'] = cudnn_base.format(
-        cudnn='cudnn-10.2-linux-x64-v8.2.2.26',
-        cudnn_ver='v8.2.2',
-        sha256sum='b4a2067774f509e65a1d8ba3bd86162b9e09de5946bb636887b4cc605dddeb6e',
-    )
-
-    codes['v8.2.2-cuda114'] = cudnn_base.format(
-        cudnn='cudnn-11.4-linux-x64-v8.2.2.26',
-        cudnn_ver='v8.2.2',
-        sha256sum='fbc631ce19688e87d7d2420403b20db97885b17f718f0f51d7e9fc0905d86e07',
-    )
-
-    codes['v8.2.4-cuda102'] = cudnn_base.format(
-        cudnn='cudnn-10.2-linux-x64-v8.2.4.15',
-        cudnn_ver='v8.2.4',
-        sha256sum='d23c94a3115a1c77116a6c127d9175fbf59f723364374f26a34699075f3222f1',
-    )
-
-    codes['v8.2.4-cuda114'] = cudnn_base.format(
-        cudnn='cudnn-11.4-linux-x64-v8.2.4.15',
-        cudnn_ver='v8.2.4',
-        sha256sum='0e5d2df890b9967efa6619da421310d97323565a79f05a1a8cb9b7165baad0d7',
-    )
-
-    codes['v8.3.0-cuda102'] = cudnn_base.format(
-        cudnn='cudnn-10.2-linux-x64-v8.3.0.98',
-        cudnn_ver='v8.3.0',
-        sha256sum='8d00144181808aee2b77d1864993227eed0e22ae580e6d6643972581ae509485',
-    )
-
-    codes['v8.3.0-cuda115'] = cudnn_base.format(
-        cudnn='cudnn-11.5-linux-x64-v8.3.0.98',
-        cudnn_ver='v8.3.0',
-        sha256sum='44c6f5ad5cb12fb74fa0c9a1e7caaf4f04d755adf11a2e5b6c9e417da376b2b2',
-    )
-
-    cudnn83x_base = '''
-curl -o {cudnn}.tar.xz https://developer.download.nvidia.com/compute/redist/cudnn/{cudnn_ver}/local_installers/{cuda_ver}/{cudnn}.tar.xz &&
-echo "{sha256sum}  {cudnn}.tar.xz" | sha256sum -cw --quiet - &&
-tar -xJf {cudnn}.tar.xz -C {{path}} &&
-rm {cudnn}.tar.xz
-'''
-
-    codes['v8.3.1-cuda102'] = cudnn83x_base.format(
-        cudnn='cudnn-linux-x86_64-8.3.1.22_cuda10.2-archive',
-        cuda_ver='10.2',
-        cudnn_ver='v8.3.1',
-        sha256sum='5982bb96c2a720268fa44b908feb5258d060ad47f1f6e6030e760d13195ea964',
-    )
-
-    codes['v8.3.1-cuda115'] = cudnn83x_base.format(
-        cudnn='cudnn-linux-x86_64-8.3.1.22_cuda11.5-archive',
-        cuda_ver='11.5',
-        cudnn_ver='v8.3.1',
-        sha256sum='f5ff3c69b6a8a9454289b42eca1dd41c3527f70fcf49428eb80502bcf6b02f6e',
-    )
-
-    codes['v8.3.2-cuda102'] = cudnn83x_base.format(
-        cudnn='cudnn-linux-x86_64-8.3.2.44_cuda10.2-archive',
-        cuda_ver='10.2',
-        cudnn_ver='v8.3.2',
-        sha256sum='d6f56ef9ca8cf8f91eb73210ba6c3dca49ba4446c1661bfafe55c1ec40b669ac',
-    )
-
-    codes['v8.3.2-cuda115'] = cudnn83x_base.format(
-        cudnn='cudnn-linux-x86_64-8.3.2.44_cuda11.5-archive',
-        cuda_ver='11.5',
-        cudnn_ver='v8.3.2',
-        sha256sum='5500953c08c5e5d1dddcfda234f9efbddcdbe43a53b26dc0a82c723fa170c457',
-    )
-
-    codes['v8.3.3-cuda102'] = cudnn83x_base.format(
-        cudnn='cudnn-linux-x86_64-8.3.3.40_cuda10.2-archive',
-        cuda_ver='10.2',
-        cudnn_ver='v8.3.3',
-        sha256sum='d8554f2b32e6295d5fc8f3ac25e68f94058b018c801dab9c143e36812f8926ab',
-    )
-
-    codes['v8.3.3-cuda115'] = cudnn83x_base.format(
-        cudnn='cudnn-linux-x86_64-8.3.3.40_cuda11.5-archive',
-        cuda_ver='11.5',
-        cudnn_ver='v8.3.3',
-        sha256sum='eabe96c75cf03ea4f5379894d914f1f8ae14ceab121989e84b0836d927fb7731',
-    )
-
-    codes['v8.4.0-cuda102'] = cudnn83x_base.format(
-        cudnn='cudnn-linux-x86_64-8.4.0.27_cuda10.2-archive',
-        cuda_ver='10.2',
-        cudnn_ver='v8.4.0',
-        sha256sum='14c5e3ca4258271996d1fd959c42d17c582ce4d9aff451f84524469e784fd154',
-    )
-
-    codes['v8.4.0-cuda116'] = cudnn83x_base.format(
-        cudnn='cudnn-linux-x86_64-8.4.0.27_cuda11.6-archive',
-        cuda_ver='11.6',
-        cudnn_ver='v8.4.0',
-        sha256sum='d19bdafd9800c79d29e6f6fffa9f9e2c10d1132d6c2ff10b1593e057e74dd050',
-    )
-
-    codes['v71-cuda8'] = codes['v7.1.3-cuda8']
-    codes['v71-cuda9'] = codes['v7.1.4-cuda9']
-    codes['v71-cuda91'] = codes['v7.1.3-cuda91']
-    codes['v71-cuda92'] = codes['v7.1.4-cuda92']
-    codes['v72-cuda8'] = codes['v7.2.1-cuda8']
-    codes['v72-cuda9'] = codes['v7.2.1-cuda9']
-    codes['v72-cuda92'] = codes['v7.2.1-cuda92']
-    codes['v73-cuda9'] = codes['v7.3.0-cuda9']
-    codes['v73-cuda10'] = codes['v7.3.0-cuda10']
-    codes['v74-cuda9'] = codes['v7.4.2-cuda9']
-    codes['v74-cuda92'] = codes['v7.4.2-cuda92']
-    codes['v74-cuda10'] = codes['v7.4.2-cuda10']
-    codes['v75-cuda9'] = codes['v7.5.1-cuda9']
-    codes['v75-cuda92'] = codes['v7.5.1-cuda92']
-    codes['v75-cuda10'] = codes['v7.5.1-cuda10']
-    codes['v75-cuda101'] = codes['v7.5.1-cuda101']
-    codes['v76-cuda9'] = codes['v7.6.5-cuda9']
-    codes['v76-cuda92'] = codes['v7.6.5-cuda92']
-    codes['v76-cuda10'] = codes['v7.6.5-cuda10']
-    codes['v76-cuda101'] = codes['v7.6.5-cuda101']
-    codes['v76-cuda102'] = codes['v7.6.5-cuda102']
-    codes['v8-cuda101'] = codes['v8.0.5-cuda101']
-    codes['v8-cuda102'] = codes['v8.0.5-cuda102']
-    codes['v8-cuda11'] = codes['v8.0.5-cuda11']
-    codes['v8-cuda111'] = codes['v8.0.5-cuda111']
-    codes['v81-cuda102'] = codes['v8.1.1-cuda102']
-    codes['v81-cuda112'] = codes['v8.1.1-cuda112']
-    codes['v82-cuda102'] = codes['v8.2.4-cuda102']
-    codes['v82-cuda114'] = codes['v8.2.4-cuda114']
-    codes['v83-cuda102'] = codes['v8.3.3-cuda102']
-    codes['v83-cuda115'] = codes['v8.3.3-cuda115']
-    codes['v84-cuda102'] = codes['v8.4.0-cuda102']
-    codes['v84-cuda116'] = codes['v8.4.0-cuda116']
-
     LIBDIR = 'lib64'
-
 elif sys.platform == 'darwin':
-    cudnn2_base = '''
-curl -s -o {cudnn}.tgz https://developer.download.nvidia.com/compute/redist/cudnn/{cudnn_ver}/{cudnn}.tgz &&
-echo "{sha256sum}  {cudnn}.tgz" | shasum -a 256 -c - &&
-tar -xzf {cudnn}.tgz &&
-rm {cudnn}.tgz &&
-mkdir -p {{path}}/cuda/include &&
-mkdir -p {{path}}/cuda/lib &&
-mv {cudnn}/cudnn.h {{path}}/cuda/include/. &&
-mv {cudnn}/libcudnn.dylib {{path}}/cuda/lib/. &&
-mv {cudnn}/libcudnn.6.5.dylib {{path}}/cuda/lib/. &&
-mv {cudnn}/libcudnn_static.a {{path}}/cuda/lib/.
-'''
-
-    codes['v2'] = cudnn2_base.format(
-        cudnn='cudnn-6.5-osx-v2',
-        cudnn_ver='v2',
-        sha256sum='7dde2658e9861bb270c327fb3d806232579d48e77b6f495b26c17a4717af97c1',
-    )
-
-    cudnn_base = '''
-curl -o {cudnn}.tgz https://developer.download.nvidia.com/compute/redist/cudnn/{cudnn_ver}/{cudnn}.tgz &&
-echo "{sha256sum}  {cudnn}.tgz" | shasum -a 256 -c - &&
-tar -xzf {cudnn}.tgz -C {{path}} &&
-rm {cudnn}.tgz
-'''
-
-    codes['v3'] = cudnn_base.format(
-        cudnn='cudnn-7.0-osx-x64-v3.0-prod',
-        cudnn_ver='v3',
-        sha256sum='48cf77784bf0f833f3e52402aa6ff359aaca03e8d4aa48880ef2a00d91693633',
-    )
-
-    codes['v4'] = cudnn_base.format(
-        cudnn='cudnn-7.0-osx-x64-v4.0-prod',
-        cudnn_ver='v4',
-        sha256sum='675ed2bebe67fe317306fae3c44024ec9a848ee5b0e1fdcb14f9882a4d91aa4e',
-    )
-
-    codes['v5'] = cudnn_base.format(
-        cudnn='cudnn-7.5-osx-x64-v5.0-ga',
-        cudnn_ver='v5',
-        sha256sum='3008aa04b599650493c80daad802d893485af258fd503380e6fd5fa4569a3a73',
-    )
-
-    codes['v5-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-osx-x64-v5.0-ga',
-        cudnn_ver='v5',
-        sha256sum='25dea96077c1d90ba4cb0a34e7d6dc8e885b8d1437e4ce8c7bce80f66ca10252',
-    )
-
-    codes['v51'] = cudnn_base.format(
-        cudnn='cudnn-7.5-osx-x64-v5.1',
-        cudnn_ver='v5.1',
-        sha256sum='bfea8f20351fc5d6ecd26b55e5c06850726f68b3df2f9c74d9f4ec77cb467f89',
-    )
-
-    codes['v51-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-osx-x64-v5.1',
-        cudnn_ver='v5.1',
-        sha256sum='2528f09bfbfafc7397682308d0809f22609b57eea9faec51f320ce8aab2ebec6',
-    )
-
-    codes['v6'] = cudnn_base.format(
-        cudnn='cudnn-7.5-osx-x64-v6.0',
-        cudnn_ver='v6.0',
-        sha256sum='368fd7e197d735e84446d97da3e27c1c22934dfc960cca92a22160200a2f6d17',
-    )
-
-    codes['v6-cuda8'] = cudnn_base.format(
-        cudnn='cudnn-8.0-osx-x64-v6.0',
-        cudnn_ver='v6.0',
-        sha256sum='1f2842872ddae3ca61d5f5a89fe5f519f18ca538c28cc04c0c4bb3b5f3317dac'
-    )
-
-    codes['v7.0.1-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-osx-x64-v7',
-        cudnn_ver='v7.0.1',
-        sha256sum='b2c259fc6b47abd820397e37194b49ff538f03c07d0121a66475986e61d11c5d',
-    )
-
-    codes['v7.0.2-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-osx-x64-v7',
-        cudnn_ver='v7.0.2',
-        sha256sum='3c9dd6d17aad84678934c735f4a1a5a901a2c4c79cc45b3e2cb5599834fb1a2b',
-    )
-
-    codes['v7.0.3-cuda9'] = cudnn_base.format(
-        cudnn='cudnn-9.0-osx-x64-v7',
-        cudnn_ver='v7.0.3',
-        sha256sum='ea7e085af13de736e2727a21d2cd0162084afc12b17fdb08b124d0e5280bab11',
-    )
-
-    codes['v7.1.4-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-osx-x64-v7.1',
-        cudnn_ver='v7.1.4',
-        sha256sum='86d1354462cc893fafb6d0e04994ff3dcda5791ffef6b11de0f0f51d0c9ac7fc',
-    )
-
-    codes['v7.2.1-cuda92'] = cudnn_base.format(
-        cudnn='cudnn-9.2-osx-x64-v7.2.1.38',
-        cudnn_ver='v7.2.1',
-        sha256sum='62f92b4b70fa876715fcef062776046f9d2a4ff11d0b6d6eabddefa48626d34f',
-    )
-
-    codes['v7.3.0-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-osx-x64-v7.3.0.29',
-        cudnn_ver='v7.3.0',
-        sha256sum='a722448a4efa2448028543fdb563ea1b8c3bb8a99da53d041e668b1dfdc76099',
-    )
-
-    codes['v7.4.1-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-osx-x64-v7.4.1.5',
-        cudnn_ver='v7.4.1',
-        sha256sum='82cdd28ea38724e0be4cac8dd67cec5ec2936a662a992a8740682e837972ec2d',
-    )
-
-    codes['v7.4.2-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-osx-x64-v7.4.2.24',
-        cudnn_ver='v7.4.2',
-        sha256sum='4b1c53af7e50ff046ed53d4ba9129900da9bef0008b93cefad2e4195f1ee8ebb',
-    )
-
-    codes['v7.5.0-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-osx-x64-v7.5.0.56',
-        cudnn_ver='v7.5.0',
-        sha256sum='5f72e5776eef6a4c5fc5c677404511faabc929864bd0886b884560e5bcdc8f54',
-    )
-
-    codes['v7.5.0-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-osx-x64-v7.5.0.56',
-        cudnn_ver='v7.5.0',
-        sha256sum='58f7e5b51e3229cb294c1c134eef3ca1a0be1b3d12c3277d24d1912051f54840',
-    )
-
-    codes['v7.5.1-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-osx-x64-v7.5.1.10',
-        cudnn_ver='v7.5.1',
-        sha256sum='152aaaba608f1cb55bc84fa51b26bb7515ae9b791d2a847a542c48b57d52f540',
-    )
-
-    codes['v7.5.1-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-osx-x64-v7.5.1.10',
-        cudnn_ver='v7.5.1',
-        sha256sum='2035071b11ffd7da8473f47a63ffd6610cb73108e072ff44b708ec833c218b45',
-    )
-
-    codes['v7.6.0-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-osx-x64-v7.6.0.64',
-        cudnn_ver='v7.6.0',
-        sha256sum='30ea0ef517d1f8a2be29a13bdefa9abd71d952d0cddfb8b2c3fba36a48c46f0f',
-    )
-
-    codes['v7.6.0-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-osx-x64-v7.6.0.64',
-        cudnn_ver='v7.6.0',
-        sha256sum='8d1417e8f528cfda4e859cf41ecb843bad0a8920935ce0dadde5f7327d8427fb',
-    )
-
-    codes['v7.6.1-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-osx-x64-v7.6.1.34',
-        cudnn_ver='v7.6.1',
-        sha256sum='a8e18c9f0b9641e0d35369ce8be36ab22aa45b979275b55fce86a09918922bd5',
-    )
-
-    codes['v7.6.1-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-osx-x64-v7.6.1.34',
-        cudnn_ver='v7.6.1',
-        sha256sum='22f7783cf5a1c11f53d040e16fdf5210f9a4e7db0f610e9b4674651801a667bc',
-    )
-
-    codes['v7.6.2-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-osx-x64-v7.6.2.24',
-        cudnn_ver='v7.6.2',
-        sha256sum='412d3790c496e518bbcde56f6125b2cecc0c93ad87b91431f87b753b1d2f01df',
-    )
-
-    codes['v7.6.2-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-osx-x64-v7.6.2.24',
-        cudnn_ver='v7.6.2',
-        sha256sum='84c3298bad04b2944350001a9302b200846ccf3c41e01d7269027b52352608b9',
-    )
-
-    codes['v7.6.3-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-osx-x64-v7.6.3.30',
-        cudnn_ver='v7.6.3',
-        sha256sum='2b93e5c07345b08dec4b7bb5ed0c41b78ab39f413ae93edc881fbbfcba00976c',
-    )
-
-    codes['v7.6.3-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-osx-x64-v7.6.3.30',
-        cudnn_ver='v7.6.3',
-        sha256sum='081703baa7c117d93ab0c753e4029c5b3c6f9517cde2ce4f8bebd324a67900f0',
-    )
-
-    codes['v7.6.4-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-osx-x64-v7.6.4.38',
-        cudnn_ver='v7.6.4',
-        sha256sum='af01ab841caec25087776a6b8fc7782883da12e590e24825ad1031f9ae0ed4b1',
-    )
-
-    codes['v7.6.4-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-osx-x64-v7.6.4.38',
-        cudnn_ver='v7.6.4',
-        sha256sum='bfced062c3689ced2c1fb49c7d5052e6bc3da6974c1eb707e4dcf8cd209d4236',
-    )
-
-    codes['v7.6.5-cuda10'] = cudnn_base.format(
-        cudnn='cudnn-10.0-osx-x64-v7.6.5.32',
-        cudnn_ver='v7.6.5',
-        sha256sum='6fa0b819374da49102e285ecf7fcb8879df4d0b3cc430cc8b781cdeb41009b47',
-    )
-
-    codes['v7.6.5-cuda101'] = cudnn_base.format(
-        cudnn='cudnn-10.1-osx-x64-v7.6.5.32',
-        cudnn_ver='v7.6.5',
-        sha256sum='8ecce28a5ed388a2b9b2d239e08d7c550f53b79288e6d9e5eb4c152bfc711aff',
-    )
-
-    codes['v7-cuda9'] = codes['v7.0.3-cuda9']
-    codes['v71-cuda92'] = codes['v7.1.4-cuda92']
-    codes['v72-cuda92'] = codes['v7.2.1-cuda92']
-    codes['v73-cuda10'] = codes['v7.3.0-cuda10']
-    codes['v74-cuda10'] = codes['v7.4.2-cuda10']
-    codes['v75-cuda10'] = codes['v7.5.1-cuda10']
-    codes['v75-cuda101'] = codes['v7.5.1-cuda101']
-    codes['v76-cuda10'] = codes['v7.6.5-cuda10']
-    codes['v76-cuda101'] = codes['v7.6.5-cuda101']
-
     LIBDIR = 'lib'
-
 else:
     print('Unsupported platform: "%s"' % sys.platform)
     sys.exit(1)
 
+_catalog = None
+_index = None
 
-local_install_command = 'tar -xzf {file} -C {path}'
 
+# The catalog is loaded on first use so that subcommands which do not need it,
+# such as `version`, start quickly.
+def get_catalog():
+    global _catalog
+    if _catalog is None:
+        from cudnnenv import catalog
+        _catalog = catalog.load(
+            remote=catalog.read_cached(get_catalog_cache_path()))
+    return _catalog
 
-@contextlib.contextmanager
-def safe_temp_dir():
-    temp_dir = tempfile.mkdtemp()
+
+def get_catalog_cache_path():
+    return os.path.join(cudnn_home, 'catalog.json')
+
+
+def refresh_catalog(force=False):
+    """Fetches the remote catalog given by ``CUDNNENV_CATALOG_URL``.
+
+    Unless ``force`` is set, the cache is used without a request while it is
+    younger than ``CUDNNENV_CATALOG_TTL`` seconds.  Returns ``True`` when a
+    new catalog was downloaded.
+    """
+    global _catalog
+    from cudnnenv import remote
+
+    url = os.environ.get('CUDNNENV_CATALOG_URL')
+    if not url:
+        return False
+    path = get_catalog_cache_path()
+    ttl = float(os.environ.get('CUDNNENV_CATALOG_TTL', '86400'))
+    if not force and remote.is_fresh(path, url, ttl):
+        return False
+    makedirs(cudnn_home)
+    updated = remote.refresh(url, path)
+    if updated:
+        _catalog = None
+    return updated
+
+
+def try_refresh_catalog():
+    # A stale catalog is refreshed by commands which need the network
+    # anyway, but an unreachable server does not stop them
     try:
-        yield temp_dir
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        refresh_catalog()
+    except Exception as e:
+        print('failed to refresh the catalog (%s); using cached one' % e)
+
+
+def get_index():
+    # The index is rebuilt when the catalog is replaced, such as in tests
+    global _index
+    entries = get_catalog()
+    if _index is None or _index.entries is not entries:
+        from cudnnenv import catalog
+        _index = catalog.Index(entries)
+    return _index
+
+
+def resolve_version(spec, cuda=None):
+    """Returns the name of the version which ``spec`` refers to.
+
+    ``spec`` is a version name in the catalog, or a spec which
+    :meth:`cudnnenv.catalog.Index.resolve` accepts.  ``cuda`` is a CUDA
+    version prefix such as ``(11, 4)`` which the version must support.
+    Returns ``None`` when no version matches.
+    """
+    entries = get_catalog()
+    if spec in entries:
+        cuda_version = entries[spec].cuda_version or ()
+        if cuda is not None and cuda_version[:len(cuda)] != cuda:
+            return None
+        return spec
+    entry = get_index().resolve(spec, cuda)
+    if entry is None:
+        return None
+    return entry.name
+
+
+def makedirs(path):
+    # Other threads or processes may create the same directory concurrently
+    try:
+        os.makedirs(path)
+    except OSError:
+        if not os.path.isdir(path):
+            raise
 
 
 @contextlib.contextmanager
-def safe_dir(path):
-    os.makedirs(path)
+def safe_staging_dir(path):
+    # A hidden directory next to `path` is on the same filesystem, so it is
+    # promoted to `path` by a single rename once it is complete.
+    parent, name = os.path.split(path)
+    makedirs(parent)
+    staging = tempfile.mkdtemp(prefix='.%s.' % name, dir=parent)
     try:
-        yield path
+        yield staging
+        os.rename(staging, path)
     except BaseException:
-        shutil.rmtree(path, ignore_errors=True)
+        shutil.rmtree(staging, ignore_errors=True)
         raise
 
 
@@ -1028,58 +138,438 @@ def get_version_path(ver):
     return os.path.join(cudnn_home, 'versions', ver)
 
 
+def get_cache_path():
+    return os.path.join(cudnn_home, 'cache')
+
+
+def get_partial_path(sha256sum):
+    cache_path = get_cache_path()
+    makedirs(cache_path)
+    return os.path.join(cache_path, sha256sum + '.part')
+
+
 def get_active_path():
     return os.path.join(cudnn_home, 'active')
 
 
-def get_installed_versions():
-    version_dir = os.path.join(cudnn_home, 'versions')
+def get_lock_path(ver):
+    lock_dir = os.path.join(cudnn_home, 'locks')
+    makedirs(lock_dir)
+    return os.path.join(lock_dir, ver + '.lock')
+
+
+def replace_symlink(target, path):
+    # The new link is renamed over the old one, so that `path` is switched
+    # atomically even when other processes create the same link
+    from cudnnenv import trace
+
+    parent, name = os.path.split(path)
+    temp_path = os.path.join(parent, '.%s.%d.tmp' % (name, os.getpid()))
+    with trace.span('symlink', path=path):
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        os.symlink(target, temp_path)
+        os.rename(temp_path, path)
+
+
+def get_store_paths():
+    # Read-only stores shared by users, such as a site-wide NFS directory
+    stores = os.environ.get('CUDNNENV_STORES', '')
+    return [store for store in stores.split(os.pathsep) if store]
+
+
+def find_store_version(ver):
+    for store in get_store_paths():
+        path = os.path.join(store, 'versions', ver)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def link_store_version(ver):
+    store_path = find_store_version(ver)
+    if store_path is None:
+        return False
+    path = get_version_path(ver)
+    makedirs(os.path.dirname(path))
+    replace_symlink(os.path.abspath(store_path), path)
+    return True
+
+
+def get_installed_path(ver):
+    path = get_version_path(ver)
+    if os.path.exists(path):
+        return path
+    return find_store_version(ver)
+
+
+def list_versions(root):
+    version_dir = os.path.join(root, 'versions')
     if not os.path.isdir(version_dir):
         return []
-    return os.listdir(version_dir)
+    return [ver for ver in os.listdir(version_dir) if not ver.startswith('.')]
+
+
+def get_installed_versions():
+    versions = set(list_versions(cudnn_home))
+    for store in get_store_paths():
+        versions.update(list_versions(store))
+    return list(versions)
+
+
+def get_usage():
+    from cudnnenv import usage
+
+    return usage.Usage(os.path.join(cudnn_home, 'usage'))
+
+
+def get_layout(entry, selected=None):
+    from cudnnenv import archive
+    from cudnnenv import components
+
+    rename = None
+    if entry.flat:
+        rename = archive.flat_layout(LIBDIR)
+    if selected is not None:
+        rename = components.select(selected, rename)
+    return rename
+
+
+def get_archive_cache():
+    from cudnnenv import cache
 
+    max_size = parse_size(os.environ.get('CUDNNENV_CACHE_SIZE', '10G'))
+    return cache.ArchiveCache(
+        os.path.join(get_cache_path(), 'archives'), max_size)
+
+
+def get_archive_lock_path(sha256sum):
+    # Versions and aliases may share an archive, and `fetch` downloads one
+    # without locking any version
+    return get_lock_path('archive-%s' % sha256sum)
+
+
+def open_archive(entry, connections=1, segment_size=None):
+    """Returns the archive of ``entry`` opened from the cache.
+
+    The archive is downloaded to the cache first when it is missing.  It is
+    returned opened, so that eviction by another process cannot remove it
+    before it is read.
+    """
+    from cudnnenv import download
+
+    archive_cache = get_archive_cache()
+    f = archive_cache.open(entry.sha256sum)
+    if f is not None:
+        return f
+
+    archive_lock = acquire_lock(
+        get_archive_lock_path(entry.sha256sum),
+        'timed out waiting for another download of %s' % entry.url)
+    try:
+        f = archive_cache.open(entry.sha256sum)
+        if f is not None:
+            return f
+
+        # A partial download is kept in the cache directory so that the
+        # next install resumes it when this one is interrupted
+        partial_path = get_partial_path(entry.sha256sum)
+        if connections > 1:
+            download.remove_partial(partial_path)
+            download.download_segmented(
+                entry.url, partial_path, entry.sha256sum, connections,
+                segment_size or download.segment_size)
+        else:
+            download.download_resumable(
+                entry.url, partial_path, entry.sha256sum)
+        f = open(partial_path, 'rb')
+        try:
+            archive_cache.add(partial_path, entry.sha256sum)
+            download.remove_partial(partial_path)
+        except BaseException:
+            f.close()
+            raise
+    finally:
+        archive_lock.release()
+    return f
+
+
+def get_missing_components(ver, selected):
+    # Versions in stores are read-only and used as they are
+    from cudnnenv import components
+
+    target = get_alias_target(ver)
+    if target is not None and os.path.isabs(target):
+        return ()
+    return components.missing(get_version_path(ver), selected)
+
+
+@contextlib.contextmanager
+def version_tree(ver, selected):
+    """Yields a directory, a manifest and components to extract ``ver``.
+
+    A new version is extracted to a staging directory.  Components missing
+    in an installed version are added to its tree in place, because other
+    processes may be using it.  The manifest and the components are saved
+    when extraction completes.
+    """
+    from cudnnenv import components
+    from cudnnenv import manifest
 
-def download_cudnn(ver):
     path = get_version_path(ver)
+    if os.path.isdir(path):
+        installed = components.load(path)
+        files = manifest.Manifest.load(path) or manifest.Manifest()
+        marker = get_partial_marker(path)
+        makedirs(os.path.dirname(marker))
+        with open(marker, 'w'):
+            pass
+        yield path, files, components.missing(path, selected)
+        files.save(path)
+        components.save(path, installed + tuple(selected))
+        os.remove(marker)
+    else:
+        with safe_staging_dir(path) as staging:
+            files = manifest.Manifest()
+            yield staging, files, selected
+            files.save(staging)
+            components.save(staging, selected)
+
+
+def extract_cudnn(ver, f, selected):
+    from cudnnenv import archive
+
+    entry = get_catalog()[ver]
+    with version_tree(ver, selected) as (path, files, missing):
+        archive.extract(f, path, get_layout(entry, missing), files)
 
-    with safe_dir(path), safe_temp_dir() as temp_dir:
-        os.chdir(temp_dir)
-        cmd = codes[ver].format(path=path)
-        subprocess.check_call(cmd, shell=True)
 
+def download_cudnn(ver, selected, connections=1, segment_size=None):
+    with open_archive(get_catalog()[ver], connections, segment_size) as f:
+        extract_cudnn(ver, f, selected)
+    get_archive_cache().evict()
 
-def download_if_not_exist(ver):
+
+def stream_cudnn(ver, selected):
+    from cudnnenv import archive
+    from cudnnenv import download
+
+    # Components added to an installed tree are extracted in place, where
+    # other processes may already read them, so the archive is verified in
+    # the cache before any file is written
+    if os.path.isdir(get_version_path(ver)):
+        download_cudnn(ver, selected)
+        return
+
+    entry = get_catalog()[ver]
+    cached = get_archive_cache().open(entry.sha256sum)
+    with version_tree(ver, selected) as (path, files, missing):
+        layout = get_layout(entry, missing)
+        if cached is not None:
+            with cached as f:
+                archive.extract(f, path, layout, files)
+        else:
+            download.stream(
+                entry.url,
+                lambda f: archive.extract(f, path, layout, files),
+                entry.sha256sum)
+
+
+def get_alias_target(ver):
     path = get_version_path(ver)
-    if not os.path.exists(path):
-        download_cudnn(ver)
+    if os.path.islink(path):
+        return os.readlink(path)
+    return None
+
+
+def is_alias(ver):
+    # Links to stores are absolute, while aliases name a sibling version
+    target = get_alias_target(ver)
+    return target is not None and not os.path.isabs(target)
+
+
+def get_aliases(ver):
+    return [alias for alias in list_versions(cudnn_home)
+            if get_alias_target(alias) == ver]
+
+
+def link_alias(ver):
+    # An alias shares the tree of the version it refers to
+    replace_symlink(get_catalog()[ver].name, get_version_path(ver))
+
+
+def is_installed(ver):
+    # A tree is only renamed to its final name once it is complete, and
+    # components added later leave it complete for those it records
+    return os.path.exists(get_version_path(ver))
+
+
+def get_partial_marker(path):
+    from cudnnenv import manifest
+
+    return os.path.join(path, manifest.metadata_dir, 'partial')
+
+
+def remove_interrupted(ver):
+    # Only components added to an installed tree are extracted in place, and
+    # the marker is removed once the manifest records them.  Files which a
+    # killed extraction left are not in the manifest; the rest of the tree
+    # is still complete for the components it records.
+    from cudnnenv import manifest
+
+    path = get_version_path(ver)
+    marker = get_partial_marker(path)
+    if os.path.islink(path) or not os.path.exists(marker):
+        return
+    files = manifest.Manifest.load(path)
+    if files is not None:
+        for name, file_path in manifest.walk(path):
+            if name in files.files or name in files.links:
+                continue
+            if os.path.islink(file_path) or not os.path.isdir(file_path):
+                os.remove(file_path)
+    print('removed files left by an interrupted install of %s' % ver)
+    os.remove(marker)
+
+
+def acquire_lock(path, message):
+    from cudnnenv import lock
+
+    timeout = float(os.environ.get('CUDNNENV_LOCK_TIMEOUT', '3600'))
+    file_lock = lock.FileLock(path, timeout)
+    try:
+        file_lock.acquire()
+    except lock.LockTimeout:
+        raise lock.LockTimeout(message)
+    return file_lock
+
+
+def acquire_install_lock(ver, selected=None):
+    """Locks ``ver`` against concurrent installs by other processes.
+
+    Returns the held lock, or ``None`` when the version was installed with
+    ``selected`` components while waiting for it.  Files left by an install
+    of components which was killed are removed.
+    """
+    install_lock = acquire_lock(
+        get_lock_path(ver), 'timed out waiting for another install of %s' % ver)
+    remove_interrupted(ver)
+    if os.path.exists(get_version_path(ver)) and \
+            not get_missing_components(ver, selected or ()):
+        install_lock.release()
+        return None
+    return install_lock
+
+
+def download_if_not_exist(ver, stream=False, connections=1,
+                          segment_size=None, selected=None):
+    from cudnnenv import components
+    from cudnnenv import trace
+
+    if selected is None:
+        selected = components.components
+    path = get_version_path(ver)
+    if is_installed(ver) and not get_missing_components(ver, selected):
+        return
+    if not os.path.exists(path) and link_store_version(ver):
+        return
+
+    canonical = get_catalog()[ver].name
+    if canonical != ver:
+        download_if_not_exist(
+            canonical, stream, connections, segment_size, selected)
+        link_alias(ver)
+        return
+
+    install_lock = acquire_install_lock(ver, selected)
+    if install_lock is None:
+        return
+    try:
+        with trace.context(version=ver):
+            if stream:
+                stream_cudnn(ver, selected)
+            else:
+                download_cudnn(ver, selected, connections, segment_size)
+    finally:
+        install_lock.release()
 
 
 def ensure_exist(ver):
     path = get_version_path(ver)
-    if not os.path.exists(path):
+    if not os.path.exists(path) and find_store_version(ver) is None:
         print('version %s is not installed' % ver)
         sys.exit(2)
 
 
+def active_lock():
+    from cudnnenv import lock
+
+    makedirs(cudnn_home)
+    return lock.FileLock(os.path.join(cudnn_home, 'active.lock'))
+
+
+def write_env_snippet(target):
+    # Shell hooks installed by `init` read the snippet at every prompt, so it
+    # is replaced by a rename and never seen half written
+    from cudnnenv import shell
+
+    path = os.path.join(cudnn_home, shell.snippet_name)
+    temp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(temp_path, 'w') as f:
+        f.write(shell.render_snippet(cudnn_home, target))
+    os.rename(temp_path, path)
+
+
 def remove_link():
     symlink_path = get_active_path()
-    if os.path.lexists(symlink_path):
-        os.remove(symlink_path)
+    with active_lock():
+        if os.path.lexists(symlink_path):
+            os.remove(symlink_path)
+        write_env_snippet(None)
+
+
+def set_link(version_path):
+    # `active` always exists while it is switched.  `prune` removes versions
+    # under the same lock, so the version is checked again while it is held.
+    # Returns whether the version still exists.
+    with active_lock():
+        if not os.path.exists(os.path.join(cudnn_home, version_path)):
+            return False
+        replace_symlink(version_path, get_active_path())
+        write_env_snippet(version_path)
+    return True
 
 
 def select_cudnn(ver):
     ensure_exist(ver)
+    if not os.path.exists(get_version_path(ver)):
+        link_store_version(ver)
 
-    version_path = os.path.join('versions', ver)
-    remove_link()
-    symlink_path = get_active_path()
-    os.symlink(version_path, symlink_path)
+    if not set_link(os.path.join('versions', ver)):
+        print('version %s is not installed' % ver)
+        sys.exit(2)
+    get_usage().touch(ver, 'activated')
     print('Successfully installed %s' % ver)
     print('Set your environment variables:')
     print('')
-    print('  LD_LIBRARY_PATH=~/.cudnn/active/cuda/%s:$LD_LIBRARY_PATH' % LIBDIR)
-    print('  CPATH=~/.cudnn/active/cuda/include:$CPATH')
-    print('  LIBRARY_PATH=~/.cudnn/active/cuda/%s:$LIBRARY_PATH' % LIBDIR)
+    # The root may be moved by CUDNNENV_ROOT
+    cuda_path = os.path.join(get_active_path(), 'cuda')
+    for name, search_path in get_search_paths(cuda_path):
+        print('  %s=%s:$%s' % (name, search_path, name))
+
+
+def get_search_paths(cuda_path):
+    lib_path = os.path.join(cuda_path, LIBDIR)
+    return [
+        ('LD_LIBRARY_PATH', lib_path),
+        ('CPATH', os.path.join(cuda_path, 'include')),
+        ('LIBRARY_PATH', lib_path),
+    ]
+
+
+def prepend_path(env, name, path):
+    value = env.get(name)
+    env[name] = path + os.pathsep + value if value else path
 
 
 def yes_no_query(question):
@@ -1095,54 +585,500 @@ def uninstall_cudnn(ver):
     ensure_exist(ver)
 
     path = get_version_path(ver)
-    if yes_no_query('remove %s?' % path):
-        shutil.rmtree(path, ignore_errors=True)
+    if not os.path.lexists(path):
+        print('version %s is installed in a read-only store' % ver)
+        sys.exit(2)
+    if os.path.islink(path):
+        if yes_no_query('remove link %s?' % path):
+            os.remove(path)
+        return
+
+    aliases = get_aliases(ver)
+    question = 'remove %s?' % path
+    if aliases:
+        question = 'remove %s and its aliases %s?' % (
+            path, ', '.join(sorted(aliases)))
+    if yes_no_query(question):
+        remove_version(ver)
+
+
+def remove_version(ver):
+    # The tree is renamed to a hidden name before it is removed, so that a
+    # removal which is killed leaves a directory which `gc` removes
+    usage = get_usage()
+    for alias in get_aliases(ver):
+        os.remove(get_version_path(alias))
+        usage.remove(alias)
+    path = get_version_path(ver)
+    parent, name = os.path.split(path)
+    trash = os.path.join(parent, '.%s.%d' % (name, os.getpid()))
+    os.rename(path, trash)
+    shutil.rmtree(trash, ignore_errors=True)
+    usage.remove(ver)
+
+
+def install_versions(vers, jobs=4, extract_jobs=2, stream=False,
+                     connections=1, segment_size=None, selected=None):
+    from multiprocessing import pool as mp_pool
+
+    from cudnnenv import components
+    from cudnnenv import trace
+
+    if selected is None:
+        selected = components.components
+    catalog = get_catalog()
+    pending = []
+    for ver in vers:
+        canonical = catalog[ver].name
+        if canonical in pending:
+            continue
+        if is_installed(canonical) and \
+                not get_missing_components(canonical, selected):
+            continue
+        if os.path.exists(get_version_path(canonical)) or \
+                not link_store_version(canonical):
+            pending.append(canonical)
+
+    # The lock of a version is taken by its download worker and released
+    # by its extract worker
+    def fetch(ver):
+        try:
+            install_lock = acquire_install_lock(ver, selected)
+            if install_lock is None:
+                return ver, None, None, None
+            try:
+                with trace.context(version=ver):
+                    if stream:
+                        stream_cudnn(ver, selected)
+                        install_lock.release()
+                        return ver, None, None, None
+                    f = open_archive(catalog[ver], connections, segment_size)
+            except BaseException:
+                install_lock.release()
+                raise
+            return ver, f, install_lock, None
+        except Exception as e:
+            return ver, None, None, e
+
+    def extract(ver, f, install_lock):
+        try:
+            with f, trace.context(version=ver):
+                extract_cudnn(ver, f, selected)
+        finally:
+            install_lock.release()
+
+    # Archives are extracted by their own workers while the others are still
+    # downloading, so that network and CPU work overlap
+    errors = {}
+    download_pool = mp_pool.ThreadPool(jobs)
+    extract_pool = mp_pool.ThreadPool(extract_jobs)
+    try:
+        extractions = []
+        for ver, f, install_lock, error in \
+                download_pool.imap_unordered(fetch, pending):
+            if error is not None:
+                errors[ver] = error
+            elif f is not None:
+                extractions.append((ver, extract_pool.apply_async(
+                    extract, (ver, f, install_lock))))
+        for ver, result in extractions:
+            try:
+                result.get()
+            except Exception as e:
+                errors[ver] = e
+    finally:
+        download_pool.terminate()
+        extract_pool.terminate()
+        download_pool.join()
+        extract_pool.join()
+    get_archive_cache().evict()
+
+    results = []
+    for ver in vers:
+        canonical = catalog[ver].name
+        if canonical in errors:
+            results.append((ver, errors[canonical]))
+            continue
+        if canonical != ver and not os.path.exists(get_version_path(ver)):
+            link_alias(ver)
+        results.append((ver, None))
+    return results
+
+
+def read_versions_file(path):
+    with open(path) as f:
+        lines = [line.split('#')[0].strip() for line in f]
+    return [line for line in lines if line]
+
+
+def resolve_versions(args):
+    if not getattr(args, 'offline', False):
+        try_refresh_catalog()
+
+    specs = list(args.version)
+    if args.from_file:
+        specs += read_versions_file(args.from_file)
+    vers = []
+    unknown = []
+    for spec in specs:
+        ver = resolve_version(spec, args.cuda)
+        if ver is None:
+            unknown.append(spec)
+            continue
+        if ver != spec:
+            print('%s: resolved to %s' % (spec, ver))
+        vers.append(ver)
+    if unknown:
+        message = 'unknown versions: %s' % ', '.join(unknown)
+        if args.cuda is not None:
+            message += ' (for CUDA %s)' % '.'.join(map(str, args.cuda))
+        print(message)
+        sys.exit(2)
+    if not vers:
+        print('no version is given')
+        sys.exit(2)
+    return vers
+
+
+def needs_archive(ver, selected):
+    canonical = get_catalog()[ver].name
+    path = get_version_path(canonical)
+    if os.path.exists(path):
+        return bool(get_missing_components(canonical, selected))
+    return find_store_version(ver) is None and \
+        find_store_version(canonical) is None
 
 
 def install(args):
-    download_if_not_exist(args.version)
-    select_cudnn(args.version)
+    from cudnnenv import components
+    from cudnnenv import download
+
+    vers = resolve_versions(args)
+    activated = None
+    if args.activate:
+        # Resolved before anything is installed, like the versions
+        activated = resolve_version(args.activate, args.cuda)
+        if activated is None:
+            message = 'unknown version: %s' % args.activate
+            if args.cuda is not None:
+                message += ' (for CUDA %s)' % '.'.join(map(str, args.cuda))
+            print(message)
+            sys.exit(2)
+        if activated != args.activate:
+            print('%s: resolved to %s' % (args.activate, activated))
+    selected = components.profiles[args.profile]
+    if args.offline:
+        # Every request fails from here, so no install reaches the network
+        download.offline = True
+        archive_cache = get_archive_cache()
+        missing = []
+        for ver in vers:
+            sha256sum = get_catalog()[ver].sha256sum
+            if needs_archive(ver, selected) and \
+                    archive_cache.get(sha256sum) is None:
+                missing.append(ver)
+        if missing:
+            print('archives are not in the cache: %s' % ', '.join(
+                sorted(missing)))
+            print('run `cudnnenv fetch` while online first')
+            sys.exit(1)
+
+    failed = False
+    if len(vers) == 1:
+        download_if_not_exist(
+            vers[0], stream=args.stream, connections=args.connections,
+            segment_size=args.segment_size, selected=selected)
+    else:
+        installed = set(get_installed_versions())
+        results = install_versions(
+            vers, jobs=args.jobs, extract_jobs=args.extract_jobs,
+            stream=args.stream, connections=args.connections,
+            segment_size=args.segment_size, selected=selected)
+        for ver, error in results:
+            if error is not None:
+                failed = True
+                print('%s: failed (%s)' % (ver, error))
+            elif ver in installed:
+                print('%s: already installed' % ver)
+            else:
+                print('%s: installed' % ver)
+
+    usage = get_usage()
+    for ver in vers:
+        if os.path.lexists(get_version_path(ver)):
+            usage.touch(ver)
+
+    if args.dedupe:
+        targets = set(get_catalog()[ver].name for ver in vers)
+        linked, reclaimed, _ = dedupe_versions(targets)
+        if linked:
+            print('linked %d files and reclaimed %s' % (
+                linked, format_size(reclaimed)))
+
+    # Only a single version is activated without an explicit --activate
+    if activated is not None:
+        select_cudnn(activated)
+    elif len(vers) == 1:
+        select_cudnn(vers[0])
+
+    quota = os.environ.get('CUDNNENV_QUOTA')
+    if quota:
+        # Versions given to this install are kept even if they are over
+        # the quota by themselves
+        max_size = parse_size(quota)
+        keep = set(get_catalog()[ver].name for ver in vers)
+        evicted, total = prune_versions(max_size, keep)
+        print_pruned(max_size, evicted, total)
+    if failed:
+        sys.exit(1)
+
+
+def fetch_versions(vers, jobs=4, connections=1, segment_size=None):
+    """Downloads and verifies archives of ``vers`` to the cache.
+
+    Archives are not extracted, so that a later ``install`` needs no
+    network access.  Returns a list of triples of a version, whether its
+    archive was downloaded, and the error.
+    """
+    from multiprocessing import pool as mp_pool
+
+    from cudnnenv import trace
+
+    catalog = get_catalog()
+    archive_cache = get_archive_cache()
+
+    def fetch(ver):
+        entry = catalog[ver]
+        try:
+            if archive_cache.get(entry.sha256sum) is not None:
+                return ver, False, None
+            with trace.context(version=ver):
+                open_archive(entry, connections, segment_size).close()
+            return ver, True, None
+        except Exception as e:
+            return ver, False, e
+
+    # Aliases share an archive with the version they refer to
+    entries = {}
+    for ver in vers:
+        entries.setdefault(catalog[ver].sha256sum, ver)
+    pool = mp_pool.ThreadPool(jobs)
+    try:
+        fetched = dict((result[0], result) for result in pool.imap_unordered(
+            fetch, list(entries.values())))
+    finally:
+        pool.terminate()
+        pool.join()
+
+    # The cache may be too small for the archives which were just fetched
+    evicted = set(archive_cache.evict())
+    results = []
+    for ver in vers:
+        sha256sum = catalog[ver].sha256sum
+        _, downloaded, error = fetched[entries[sha256sum]]
+        if error is None and archive_cache.get_path(sha256sum) in evicted:
+            error = Exception(
+                'evicted from the cache; increase CUDNNENV_CACHE_SIZE')
+        results.append((ver, downloaded, error))
+    return results
+
+
+def fetch(args):
+    vers = resolve_versions(args)
+    failed = False
+    for ver, downloaded, error in fetch_versions(
+            vers, jobs=args.jobs, connections=args.connections,
+            segment_size=args.segment_size):
+        if error is not None:
+            failed = True
+            print('%s: failed (%s)' % (ver, error))
+        elif downloaded:
+            print('%s: fetched' % ver)
+        else:
+            print('%s: already cached' % ver)
+    if failed:
+        sys.exit(1)
 
 
 def activate(args):
+    if args.verify:
+        ensure_exist(args.version)
+        ok, problems = verify_version(args.version)
+        if not ok:
+            print_problems(args.version, ok, problems)
+            print('version %s is not activated' % args.version)
+            sys.exit(1)
     select_cudnn(args.version)
 
 
+@contextlib.contextmanager
+def open_install_file(name):
+    if name == '-':
+        # The archive is read as bytes, which is `sys.stdin` on Python 2
+        yield getattr(sys.stdin, 'buffer', sys.stdin)
+    else:
+        with open(name, 'rb') as f:
+            yield f
+
+
 def install_file(args):
+    import tarfile
+
+    from cudnnenv import archive
+    from cudnnenv import download
+    from cudnnenv import manifest
+    from cudnnenv import trace
+
+    if args.file != '-' and not os.path.isfile(args.file):
+        print('file %s does not exist' % args.file)
+        sys.exit(2)
     path = get_version_path(args.version)
     if os.path.exists(path):
         print('version %s already exists' % args.version)
         sys.exit(3)
 
-    path = get_version_path(args.version)
-    with safe_dir(path):
-        cmd = local_install_command.format(
-            file=args.file, path=path)
-        subprocess.check_call(cmd, shell=True)
+    install_lock = acquire_install_lock(args.version)
+    if install_lock is None:
+        print('version %s already exists' % args.version)
+        sys.exit(3)
+    name = '<stdin>' if args.file == '-' else args.file
+    try:
+        # The archive is extracted while it is read and hashed, so a pipe
+        # from object storage needs no temporary copy.  The staging
+        # directory is only promoted once the digest matches.
+        with safe_staging_dir(path) as staging, \
+                open_install_file(args.file) as f, \
+                trace.context(version=args.version):
+            files = manifest.Manifest()
+            reader = download.HashReader(f)
+            with trace.span('transfer', url=name) as phase:
+                archive.extract(reader, staging, manifest=files)
+                reader.drain()
+                phase.count(reader.size)
+            reader.check(name, args.sha256)
+            files.save(staging)
+    except (archive.ArchiveError, download.ChecksumError,
+            tarfile.TarError) as e:
+        print('failed to install %s: %s' % (name, e))
+        sys.exit(1)
+    finally:
+        install_lock.release()
 
     select_cudnn(args.version)
 
 
+def exec_command(args):
+    # This is run for every job launch, so it neither loads the catalog nor
+    # writes anything, including a link to a version in a store.  The time
+    # of the use is only recorded for `prune` when it is asked for.
+    path = get_installed_path(args.version)
+    if path is None:
+        print('version %s is not installed' % args.version)
+        sys.exit(2)
+    if os.environ.get('CUDNNENV_EXEC_USAGE'):
+        try:
+            get_usage().touch(args.version)
+        except (IOError, OSError):
+            # The root may be read-only for users of a shared installation
+            pass
+
+    command = args.command
+    if command[:1] == ['--']:
+        command = command[1:]
+    if not command:
+        print('no command is given')
+        sys.exit(2)
+
+    env = dict(os.environ)
+    cuda_path = os.path.join(os.path.abspath(path), 'cuda')
+    for name, search_path in get_search_paths(cuda_path):
+        prepend_path(env, name, search_path)
+    try:
+        os.execvpe(command[0], command, env)
+    except OSError as e:
+        print('cannot execute %s: %s' % (command[0], e.strerror))
+        sys.exit(127)
+
+
+def verify_version(ver, full=False, jobs=4):
+    """Verifies the tree of ``ver`` against its manifest.
+
+    Returns a pair of whether the tree is intact and the list of problems.
+    A tree without manifest, such as one installed by an older cudnnenv,
+    cannot be verified and is not intact.
+    """
+    from cudnnenv import manifest
+
+    path = get_installed_path(ver)
+    files = manifest.Manifest.load(path)
+    if files is None:
+        return False, [('', 'no manifest')]
+    problems = manifest.verify(path, files, full, jobs)
+    return not problems, problems
+
+
+def print_problems(ver, ok, problems):
+    if ok:
+        print('%s: ok' % ver)
+        return
+    print('%s: failed' % ver)
+    for name, problem in problems:
+        if name:
+            print('  %s: %s' % (name, problem))
+        else:
+            print('  %s' % problem)
+
+
+def verify(args):
+    vers = args.version
+    if vers:
+        for ver in vers:
+            ensure_exist(ver)
+    else:
+        # An alias shares the tree of the version it refers to
+        vers = sorted(ver for ver in get_installed_versions()
+                      if not is_alias(ver))
+    failed = False
+    for ver in vers:
+        ok, problems = verify_version(ver, args.full, args.jobs)
+        print_problems(ver, ok, problems)
+        failed = failed or not ok
+    if failed:
+        sys.exit(1)
+
+
 def uninstall(args):
     uninstall_cudnn(args.version)
 
 
-def get_version():
+def get_active_target():
     symlink_path = get_active_path()
     if os.path.islink(symlink_path):
-        path = os.readlink(symlink_path)
-        return os.path.split(path)[-1]
+        return os.readlink(symlink_path)
+    return None
+
+
+def get_version():
+    target = get_active_target()
+    if target is not None:
+        return os.path.split(target)[-1]
     else:
         return None
 
 
-def print_versions(versions, active):
+def print_versions(versions, active, targets=None, notes=None):
     for ver in sorted(versions):
+        if targets and ver in targets:
+            line = '%s -> %s' % (ver, targets[ver])
+        else:
+            line = ver
+        if notes and notes.get(ver):
+            line += ' (%s)' % ', '.join(notes[ver])
         if ver == active:
-            ver = '* ' + ver
+            line = '* ' + line
         else:
-            ver = '  ' + ver
-        print(ver)
+            line = '  ' + line
+        print(line)
 
 
 def version(args):
@@ -1154,48 +1090,571 @@ def version(args):
 
 
 def versions(args):
+    from cudnnenv import components
+
     active = get_version()
+    available = get_catalog().keys()
+    if args.cuda is not None:
+        supported = set(entry.name for entry in get_index().find(cuda=args.cuda))
+        available = [ver for ver, entry in get_catalog().items()
+                     if entry.name in supported]
     print('Available versions:')
-    print_versions(codes.keys(), active)
+    print_versions(available, active)
     print('')
     print('Installed versions:')
-    print_versions(get_installed_versions(), active)
+    installed = get_installed_versions()
+    usage = get_usage()
+    targets = {}
+    notes = {}
+    for ver in installed:
+        notes[ver] = []
+        target = get_alias_target(ver)
+        if target is not None:
+            targets[ver] = target
+        else:
+            # Only partial installs are marked
+            selected = components.load(get_installed_path(ver))
+            if selected != components.components:
+                notes[ver].append(components.describe(selected))
+        if usage.is_pinned(ver):
+            notes[ver].append('pinned')
+    print_versions(installed, active, targets, notes)
 
 
 def deactivate(args):
     remove_link()
 
 
+def update(args):
+    if not os.environ.get('CUDNNENV_CATALOG_URL'):
+        print('CUDNNENV_CATALOG_URL is not set')
+        sys.exit(2)
+    try:
+        updated = refresh_catalog(force=True)
+    except Exception as e:
+        print('failed to refresh the catalog: %s' % e)
+        sys.exit(1)
+    if updated:
+        print('catalog is updated: %d versions' % len(get_catalog()))
+    else:
+        print('catalog is up to date')
+
+
+def init(args):
+    from cudnnenv import shell
+
+    # The snippet is only written when the active version changes, but it
+    # may be missing when the version was activated by an older cudnnenv
+    snippet_path = os.path.join(cudnn_home, shell.snippet_name)
+    key = shell.get_key(get_active_target() or '(none)')
+    if shell.read_key(snippet_path) != key:
+        with active_lock():
+            write_env_snippet(get_active_target())
+    sys.stdout.write(shell.render_hook(args.shell, cudnn_home, LIBDIR))
+
+
+def mirror_archive(entry, url, root):
+    from cudnnenv import download
+
+    path = os.path.join(root, *entry.path.split('/'))
+    if os.path.exists(path):
+        return False
+    makedirs(os.path.dirname(path))
+    partial_path = path + '.part'
+    download.download_resumable(url, partial_path, entry.sha256sum)
+    os.rename(partial_path, path)
+    download.remove_partial(partial_path)
+    return True
+
+
+def mirror(args):
+    from multiprocessing import pool as mp_pool
+
+    from cudnnenv import catalog
+
+    if args.platform == 'all':
+        platforms = catalog.platforms
+    else:
+        platforms = (args.platform,)
+    # Versions of the remote catalog are mirrored too, for every platform
+    try_refresh_catalog()
+    tables = catalog.read_cached(get_catalog_cache_path())
+    entries = {}
+    found = set()
+    for platform in platforms:
+        for ver, entry in catalog.load(platform, tables).items():
+            if not args.version or ver in args.version:
+                found.add(ver)
+                # Aliases share an archive with the version they refer to
+                entries[entry.path] = entry
+    unknown = sorted(set(args.version) - found)
+    if unknown:
+        print('unknown versions: %s' % ', '.join(unknown))
+        sys.exit(2)
+
+    source = (args.source or catalog.base_url).rstrip('/')
+
+    def fetch(entry):
+        try:
+            url = '%s/%s' % (source, entry.path)
+            return entry, mirror_archive(entry, url, args.dir), None
+        except Exception as e:
+            return entry, False, e
+
+    failed = False
+    pool = mp_pool.ThreadPool(args.jobs)
+    try:
+        for entry, fetched, error in pool.imap(
+                fetch, [entries[path] for path in sorted(entries)]):
+            if error is not None:
+                failed = True
+                print('%s: failed (%s)' % (entry.path, error))
+            elif fetched:
+                print('%s: fetched' % entry.path)
+            else:
+                print('%s: exists' % entry.path)
+    finally:
+        pool.terminate()
+        pool.join()
+    if failed:
+        sys.exit(1)
+
+
+def try_install_lock(ver):
+    # Commands which only read or relink a tree, such as `gc`, `prune` and
+    # `dedupe`, hold the lock without cleaning up after a killed install
+    from cudnnenv import lock
+
+    install_lock = lock.FileLock(get_lock_path(ver))
+    if not install_lock.acquire(blocking=False):
+        return None
+    return install_lock
+
+
+def collect_garbage():
+    """Removes files left by interrupted installs.
+
+    They are staging directories of extractions and partial downloads.
+    Files of a version which is being installed by another process are kept.
+    Returns a list of removed paths.
+    """
+    from cudnnenv import lock
+
+    removed = []
+    version_dir = os.path.join(cudnn_home, 'versions')
+    if os.path.isdir(version_dir):
+        for name in sorted(os.listdir(version_dir)):
+            path = os.path.join(version_dir, name)
+            if not name.startswith('.') or os.path.islink(path) or \
+                    not os.path.isdir(path):
+                continue
+            # A staging directory is named `.<version>.<random suffix>`
+            install_lock = try_install_lock(name[1:].rsplit('.', 1)[0])
+            if install_lock is None:
+                continue
+            try:
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path)
+            finally:
+                install_lock.release()
+
+    cache_path = get_cache_path()
+    if os.path.isdir(cache_path):
+        for name in sorted(os.listdir(cache_path)):
+            if not name.endswith('.part'):
+                continue
+            sha256sum = name[:-len('.part')]
+            archive_lock = lock.FileLock(get_archive_lock_path(sha256sum))
+            if not archive_lock.acquire(blocking=False):
+                continue
+            try:
+                path = os.path.join(cache_path, name)
+                for p in (path, path + '.json'):
+                    if os.path.exists(p):
+                        os.remove(p)
+                        removed.append(p)
+            finally:
+                archive_lock.release()
+    return removed
+
+
+def gc(args):
+    removed = collect_garbage()
+    for path in removed:
+        print('removed %s' % path)
+    if not removed:
+        print('nothing to remove')
+
+
+def get_last_used(ver, names):
+    # A version which was never activated nor used since cudnnenv recorded
+    # usage was last used when it was installed
+    usage = get_usage()
+    times = [usage.last_used(name) for name in names]
+    times = [t for t in times if t is not None]
+    if times:
+        return max(times)
+    return os.stat(get_version_path(ver)).st_mtime
+
+
+def prune_versions(max_size, keep=(), dry_run=False):
+    """Removes least recently used versions until they fit in ``max_size``.
+
+    Sizes are of trees in ``versions``, counting files linked by `dedupe`
+    once.  The active version, pinned versions, versions in ``keep`` and
+    versions which are being installed are never removed, and neither are
+    the versions their aliases refer to.  An alias is removed with its
+    version.  Returns a list of pairs of a removed version and the bytes
+    freed, and the size of the remaining versions.
+    """
+    from cudnnenv import usage as usage_module
+
+    usage = get_usage()
+    names = {}
+    for ver in list_versions(cudnn_home):
+        path = get_version_path(ver)
+        if is_alias(ver):
+            names.setdefault(get_alias_target(ver), []).append(ver)
+        elif not os.path.islink(path) and os.path.isdir(path):
+            names.setdefault(ver, []).append(ver)
+    trees = dict((ver, get_version_path(ver)) for ver in names
+                 if os.path.isdir(get_version_path(ver)))
+
+    evicted = []
+    # `activate` waits while versions are removed, so the active version
+    # does not change under this
+    with active_lock():
+        protected = set(keep)
+        active = get_version()
+        for ver, aliases in names.items():
+            if active in aliases or any(
+                    usage.is_pinned(name) for name in aliases):
+                protected.add(ver)
+        candidates = sorted(
+            (get_last_used(ver, names[ver]), ver)
+            for ver in trees if ver not in protected)
+
+        sizes = usage_module.measure(trees.values())
+        remaining = set(trees)
+        total = usage_module.get_total_size(
+            sizes, [trees[ver] for ver in remaining])
+        for _, ver in candidates:
+            if total <= max_size:
+                break
+            install_lock = try_install_lock(ver)
+            if install_lock is None:
+                continue
+            try:
+                if not os.path.isdir(trees[ver]):
+                    continue
+                if not dry_run:
+                    remove_version(ver)
+            finally:
+                install_lock.release()
+            remaining.remove(ver)
+            new_total = usage_module.get_total_size(
+                sizes, [trees[v] for v in remaining])
+            evicted.append((ver, total - new_total))
+            total = new_total
+    return evicted, total
+
+
+def print_pruned(max_size, evicted, total, dry_run=False):
+    for ver, freed in evicted:
+        if dry_run:
+            print('would remove %s (%s)' % (ver, format_size(freed)))
+        else:
+            print('removed %s (%s)' % (ver, format_size(freed)))
+    if total > max_size:
+        print('versions use %s, which exceeds %s, but the others are active, '
+              'pinned or being installed' % (
+                  format_size(total), format_size(max_size)))
+        return False
+    return True
+
+
+def prune(args):
+    max_size = args.max_size
+    if max_size is None:
+        quota = os.environ.get('CUDNNENV_QUOTA')
+        if not quota:
+            print('--max-size is not given and CUDNNENV_QUOTA is not set')
+            sys.exit(2)
+        max_size = parse_size(quota)
+    evicted, total = prune_versions(max_size, dry_run=args.dry_run)
+    if not evicted and total <= max_size:
+        print('nothing to prune: versions use %s' % format_size(total))
+    if not print_pruned(max_size, evicted, total, args.dry_run):
+        sys.exit(1)
+
+
+def pin(args):
+    ensure_exist(args.version)
+    get_usage().pin(args.version)
+
+
+def unpin(args):
+    get_usage().unpin(args.version)
+
+
+def dedupe_versions(targets=None, jobs=4, dry_run=False):
+    """Replaces identical files across installed versions with hard links.
+
+    Only groups of identical files with a file of a version in ``targets``
+    are linked, unless ``targets`` is ``None``.  Aliases and versions in
+    stores are links to other trees, and versions which are being installed
+    are skipped.  Returns the number of files replaced, the number of bytes
+    reclaimed and the list of skipped versions.
+    """
+    from cudnnenv import dedupe
+
+    locks = []
+    skipped = []
+    try:
+        roots = {}
+        for ver in sorted(list_versions(cudnn_home)):
+            path = get_version_path(ver)
+            if os.path.islink(path):
+                continue
+            install_lock = try_install_lock(ver)
+            if install_lock is None or not os.path.isdir(path):
+                skipped.append(ver)
+                continue
+            locks.append(install_lock)
+            roots[ver] = path
+        target_roots = None
+        if targets is not None:
+            target_roots = set(roots[ver] for ver in targets if ver in roots)
+        linked, reclaimed = dedupe.dedupe(
+            list(roots.values()), target_roots, jobs, dry_run)
+    finally:
+        for install_lock in locks:
+            install_lock.release()
+    return linked, reclaimed, skipped
+
+
+def dedupe_command(args):
+    linked, reclaimed, skipped = dedupe_versions(
+        args.version or None, args.jobs, args.dry_run)
+    for ver in skipped:
+        print('%s: skipped (being installed)' % ver)
+    if not linked:
+        print('nothing to dedupe')
+    elif args.dry_run:
+        print('would link %d files and reclaim %s' % (
+            linked, format_size(reclaimed)))
+    else:
+        print('linked %d files and reclaimed %s' % (
+            linked, format_size(reclaimed)))
+
+
+_size_units = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def parse_size(size):
+    unit = size[-1:].upper()
+    if unit in _size_units:
+        number = size[:-1]
+    else:
+        number, unit = size, ''
+    try:
+        return int(float(number) * _size_units[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid size: %s' % size)
+
+
+def format_size(size):
+    for unit in ('T', 'G', 'M', 'K'):
+        if size >= _size_units[unit]:
+            return '%.1f%siB' % (size / float(_size_units[unit]), unit)
+    return '%d bytes' % size
+
+
+def cuda_version(version):
+    from cudnnenv import catalog
+
+    parsed = catalog.parse_version(version)
+    if parsed is None:
+        raise argparse.ArgumentTypeError('invalid CUDA version: %s' % version)
+    return parsed
+
+
+def run_traced(args):
+    from cudnnenv import trace
+
+    if args.trace_path:
+        trace.enable(args.trace_path)
+    command = trace.phase('command', command=args.command)
+    start = command.clock()
+    try:
+        if args.profile_path:
+            import cProfile
+
+            # Only the main thread is profiled, which runs a single install
+            # except for the writers of the extraction
+            profiler = cProfile.Profile()
+            try:
+                profiler.runcall(args.func, args)
+            finally:
+                profiler.dump_stats(args.profile_path)
+        else:
+            args.func(args)
+    finally:
+        command.add(start)
+        command.emit()
+        trace.disable()
+
+
 def main(args=None):
     parser = argparse.ArgumentParser()
     parser.add_argument(
         '--version', action='version', version='cudnnenv %s' % __version__)
-    subparsers = parser.add_subparsers(help='Subcommand')
+    parser.add_argument(
+        '--trace', metavar='FILE', dest='trace_path',
+        default=os.environ.get('CUDNNENV_TRACE'),
+        help='Append timing of each phase of the command, such as DNS, '
+        'transfer, hashing, decompression, writes and symlinks, to FILE as '
+        'JSON lines, or write it to the standard error for `-`')
+    # `install` has its own `profile` of components
+    parser.add_argument(
+        '--profile', metavar='FILE', dest='profile_path',
+        default=os.environ.get('CUDNNENV_PROFILE'),
+        help='Write cProfile statistics of the command to FILE')
+    subparsers = parser.add_subparsers(dest='command', help='Subcommand')
 
     sub = subparsers.add_parser('install', help='Install version')
-    vers = sorted(codes.keys())
     sub.add_argument(
-        'version', metavar='VERSION', choices=vers,
+        'version', metavar='VERSION', nargs='*',
         help='Version of cuDNN you want to install and activate. '
-        'Select from [%s]' % ', '.join(vers))
-    sub.set_defaults(func=install)
+        'Use `versions` subcommand to check the available versions. '
+        'A version can also be `latest`, a prefix such as `8.2`, or '
+        'constraints such as `>=8.1,<8.3`, which resolve to the newest '
+        'matching version. '
+        'When more than one version is given, they are installed in '
+        'parallel and only the version given by --activate is activated.')
+    sub.add_argument(
+        '--cuda', metavar='VERSION', type=cuda_version,
+        help='Only use versions for this CUDA version, such as 11.4')
+    sub.add_argument(
+        '--from-file', metavar='FILE',
+        help='Install versions listed in FILE, one version per line')
+    sub.add_argument(
+        '--activate', metavar='VERSION',
+        help='Version to activate after installation')
+    sub.add_argument(
+        '--jobs', metavar='N', type=int, default=4,
+        help='Number of archives downloaded in parallel (default: 4)')
+    sub.add_argument(
+        '--extract-jobs', metavar='N', type=int, default=2,
+        help='Number of archives extracted in parallel (default: 2)')
+    group = sub.add_mutually_exclusive_group()
+    group.add_argument(
+        '--stream', action='store_true',
+        help='Extract the archive while downloading it, without writing '
+        'the archive to a temporary file')
+    group.add_argument(
+        '--connections', metavar='N', type=int, default=1,
+        help='Download the archive in segments over N connections')
+    sub.add_argument(
+        '--segment-size', metavar='SIZE', type=parse_size,
+        help='Size of a segment downloaded over one connection, '
+        'such as 16M (default: 32M)')
+    group = sub.add_mutually_exclusive_group()
+    group.add_argument(
+        '--no-static', dest='profile', action='store_const',
+        const='no-static',
+        help='Install headers and shared libraries without static libraries')
+    group.add_argument(
+        '--headers-only', dest='profile', action='store_const',
+        const='headers-only',
+        help='Install only headers')
+    group.add_argument(
+        '--runtime-only', dest='profile', action='store_const',
+        const='runtime-only',
+        help='Install only shared libraries')
+    sub.add_argument(
+        '--dedupe', action='store_true',
+        help='Link files of the installed versions which are identical to '
+        'files of other versions')
+    sub.add_argument(
+        '--offline', action='store_true',
+        help='Install from archives fetched by `fetch` without any network '
+        'access')
+    sub.set_defaults(func=install, profile='full')
+
+    sub = subparsers.add_parser(
+        'fetch', help='Download archives to the cache without installing')
+    sub.add_argument(
+        'version', metavar='VERSION', nargs='*',
+        help='Versions of cuDNN whose archives are downloaded. '
+        'Specs such as `latest` and `>=8.1,<8.3` are accepted as in '
+        '`install`.')
+    sub.add_argument(
+        '--cuda', metavar='VERSION', type=cuda_version,
+        help='Only use versions for this CUDA version, such as 11.4')
+    sub.add_argument(
+        '--from-file', metavar='FILE',
+        help='Fetch versions listed in FILE, one version per line')
+    sub.add_argument(
+        '--jobs', metavar='N', type=int, default=4,
+        help='Number of archives downloaded in parallel (default: 4)')
+    sub.add_argument(
+        '--connections', metavar='N', type=int, default=1,
+        help='Download each archive in segments over N connections')
+    sub.add_argument(
+        '--segment-size', metavar='SIZE', type=parse_size,
+        help='Size of a segment downloaded over one connection, '
+        'such as 16M (default: 32M)')
+    sub.set_defaults(func=fetch)
 
     sub = subparsers.add_parser('install-file', help='Install local cuDNN file')
     sub.add_argument(
         'file', metavar='FILE',
-        help='Path to local cuDNN archive file to install')
+        help='Path to local cuDNN archive file to install, or `-` to read '
+        'it from the standard input')
     sub.add_argument(
         'version', metavar='VERSION',
         help='Version name of cuDNN you want to install')
+    sub.add_argument(
+        '--sha256', metavar='SHA256',
+        help='Expected SHA-256 digest of the archive. The version is not '
+        'installed when it does not match')
     sub.set_defaults(func=install_file)
 
     sub = subparsers.add_parser('activate', help='Activate installed version')
-    vers = sorted(codes.keys())
     sub.add_argument(
         'version', metavar='VERSION',
         help='Version of installed cuDNN you want to activate. ')
+    sub.add_argument(
+        '--verify', action='store_true',
+        help='Check sizes and modification times of the files before '
+        'activating the version, and fail if any of them has changed')
     sub.set_defaults(func=activate)
 
+    sub = subparsers.add_parser(
+        'verify', help='Check installed files against their manifests')
+    sub.add_argument(
+        'version', metavar='VERSION', nargs='*',
+        help='Versions to verify (default: all installed versions)')
+    sub.add_argument(
+        '--full', action='store_true',
+        help='Compare SHA-256 digests of the contents instead of sizes and '
+        'modification times')
+    sub.add_argument(
+        '--jobs', metavar='N', type=int, default=4,
+        help='Number of files hashed in parallel with --full (default: 4)')
+    sub.set_defaults(func=verify)
+
+    sub = subparsers.add_parser(
+        'exec', help='Run a command with a version without activating it')
+    sub.add_argument(
+        'version', metavar='VERSION',
+        help='Version of installed cuDNN the command uses')
+    sub.add_argument(
+        'command', metavar='COMMAND', nargs=argparse.REMAINDER,
+        help='Command and its arguments, given after `--`')
+    sub.set_defaults(func=exec_command)
+
     sub = subparsers.add_parser('uninstall', help='Uninstall version')
     sub.add_argument(
         'version', metavar='VERSION',
@@ -1206,14 +1665,97 @@ def main(args=None):
     sub.set_defaults(func=version)
 
     sub = subparsers.add_parser('versions', help='Show available versions')
+    sub.add_argument(
+        '--cuda', metavar='VERSION', type=cuda_version,
+        help='Only show available versions for this CUDA version')
     sub.set_defaults(func=versions)
 
     sub = subparsers.add_parser('deactivate', help='Deactivate cudnnenv')
     sub.set_defaults(func=deactivate)
 
+    sub = subparsers.add_parser(
+        'update', help='Fetch the remote catalog given by CUDNNENV_CATALOG_URL')
+    sub.set_defaults(func=update)
+
+    sub = subparsers.add_parser(
+        'init', help='Print shell integration which follows the active '
+        'version')
+    sub.add_argument(
+        'shell', choices=['bash', 'zsh'],
+        help='Shell to integrate with. Add `eval "$(cudnnenv init SHELL)"` '
+        'to its rc file')
+    sub.set_defaults(func=init)
+
+    sub = subparsers.add_parser(
+        'gc', help='Remove files left by interrupted installs')
+    sub.set_defaults(func=gc)
+
+    sub = subparsers.add_parser(
+        'prune', help='Remove least recently used versions')
+    sub.add_argument(
+        '--max-size', metavar='SIZE', type=parse_size,
+        help='Total size of versions to keep, such as 20G '
+        '(default: CUDNNENV_QUOTA)')
+    sub.add_argument(
+        '--dry-run', action='store_true',
+        help='Only report versions which would be removed')
+    sub.set_defaults(func=prune)
+
+    sub = subparsers.add_parser(
+        'pin', help='Protect version from `prune`')
+    sub.add_argument(
+        'version', metavar='VERSION',
+        help='Version of cuDNN you want to keep')
+    sub.set_defaults(func=pin)
+
+    sub = subparsers.add_parser(
+        'unpin', help='Allow `prune` to remove version')
+    sub.add_argument(
+        'version', metavar='VERSION',
+        help='Version of cuDNN pinned by `pin`')
+    sub.set_defaults(func=unpin)
+
+    sub = subparsers.add_parser(
+        'dedupe', help='Link identical files across installed versions')
+    sub.add_argument(
+        'version', metavar='VERSION', nargs='*',
+        help='Only link files shared with these versions '
+        '(default: all versions)')
+    sub.add_argument(
+        '--jobs', metavar='N', type=int, default=4,
+        help='Number of files hashed in parallel (default: 4)')
+    sub.add_argument(
+        '--dry-run', action='store_true',
+        help='Only report files which would be linked')
+    sub.set_defaults(func=dedupe_command)
+
+    sub = subparsers.add_parser(
+        'mirror', help='Download archives to a local mirror directory')
+    sub.add_argument(
+        'dir', metavar='DIR',
+        help='Directory of the mirror. Set its URL to CUDNNENV_MIRROR to '
+        'install from the mirror')
+    sub.add_argument(
+        'version', metavar='VERSION', nargs='*',
+        help='Versions to download (default: all versions)')
+    sub.add_argument(
+        '--platform', choices=['linux', 'darwin', 'all'], default='all',
+        help='Platform of archives to download (default: all)')
+    sub.add_argument(
+        '--source', metavar='URL',
+        help='Base URL to download archives from (default: NVIDIA\'s '
+        'server)')
+    sub.add_argument(
+        '--jobs', metavar='N', type=int, default=4,
+        help='Number of archives downloaded in parallel (default: 4)')
+    sub.set_defaults(func=mirror)
+
     args = parser.parse_args(args=args)
 
     if not hasattr(args, 'func'):
         parser.error('too few arguments')
 
-    args.func(args)
+    if args.trace_path or args.profile_path:
+        run_traced(args)
+    else:
+        args.func(args)
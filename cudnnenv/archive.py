@@ -0,0 +1,595 @@
+"""Extraction of cuDNN tar archives."""
+
+from __future__ import unicode_literals
+
+import hashlib
+import multiprocessing
+import os
+import posixpath
+import subprocess
+import tarfile
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    from shutil import which
+except ImportError:
+    from distutils.spawn import find_executable as which
+
+from cudnnenv import download
+from cudnnenv import trace
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def _normalize(name):
+    normalized = posixpath.normpath(name)
+    if posixpath.isabs(normalized) or normalized.split('/')[0] == '..':
+        raise ArchiveError('unsafe path in archive: %s' % name)
+    return normalized
+
+
+def _check_link(name, linkname):
+    target = posixpath.join(posixpath.dirname(name), linkname)
+    _normalize(target)
+
+
+class _Root(object):
+
+    """Checks that paths in the tree at ``path`` do not lead out of it.
+
+    Names in an archive are checked as text, but an earlier member may be a
+    symbolic link, such as ``cuda/a -> ..``, which makes a later name lead
+    somewhere else.  Paths are resolved on the file system.  Directories
+    found inside the tree are remembered until a link is replaced, because
+    a directory cannot be replaced by a link.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.realpath(path)
+        self.checked = set()
+
+    def check(self, name, dest):
+        """Raises :class:`ArchiveError` if ``dest`` resolves out of the tree."""
+        if dest in self.checked:
+            return
+        resolved = os.path.realpath(dest)
+        if resolved != self.path and \
+                not resolved.startswith(os.path.join(self.path, '')):
+            raise ArchiveError('path through a link out of the archive: %s'
+                               % name)
+        if os.path.isdir(dest) and not os.path.islink(dest):
+            self.checked.add(dest)
+
+    def check_parent(self, name, dest):
+        self.check(name, os.path.dirname(dest))
+
+    def forget(self):
+        self.checked.clear()
+
+
+def _makedirs(path):
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+
+def _remove(path):
+    # A link to a directory is removed, but not the directory
+    if os.path.islink(path) or \
+            os.path.exists(path) and not os.path.isdir(path):
+        os.remove(path)
+
+
+def flat_layout(libdir):
+    """Returns a rename function for archives without ``cuda`` directory.
+
+    cuDNN v2 archives contain files in a single top-level directory.  Headers
+    are moved to ``cuda/include`` and libraries to ``cuda/{libdir}``.
+    """
+    def rename(name):
+        base = posixpath.basename(name)
+        if name == base:
+            return None
+        elif base.endswith('.h'):
+            return posixpath.join('cuda', 'include', base)
+        else:
+            return posixpath.join('cuda', libdir, base)
+    return rename
+
+
+_magics = (
+    (b'\x1f\x8b', 'gz'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zst'),
+)
+_magic_size = max(len(magic) for magic, _ in _magics)
+
+
+def detect(head):
+    """Returns the compression of a stream which starts with ``head``.
+
+    The result is one of ``'gz'``, ``'bz2'``, ``'xz'`` and ``'zst'``, or
+    ``None`` for an uncompressed stream.
+    """
+    for magic, compression in _magics:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _read_head(fileobj, size):
+    # A pipe may return fewer bytes than requested before its end
+    head = b''
+    while len(head) < size:
+        data = fileobj.read(size - len(head))
+        if not data:
+            break
+        head += data
+    return head
+
+
+class _Prefixed(object):
+
+    """File-like object which reads ``head`` and then ``fileobj``."""
+
+    def __init__(self, head, fileobj):
+        self.head = head
+        self.fileobj = fileobj
+
+    def read(self, size=-1):
+        if not self.head:
+            return self.fileobj.read(size)
+        if size < 0:
+            data = self.head + self.fileobj.read()
+        else:
+            data = self.head[:size]
+        self.head = self.head[len(data):]
+        return data
+
+
+class _ProcessDecompressor(object):
+
+    """Decompresses a stream with an external command such as ``xz -dc``.
+
+    A thread feeds ``fileobj`` to the command while the caller reads the
+    decompressed data, so that reading, decompression and extraction run
+    in parallel.  The command is also much faster than the ``lzma`` module
+    on some builds of Python.
+    """
+
+    def __init__(self, command, fileobj):
+        self.name = os.path.basename(command[0])
+        self.process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.fileobj = fileobj
+        self.error = None
+        self.thread = threading.Thread(target=self._feed)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _feed(self):
+        try:
+            download.copy(self.fileobj, self.process.stdin)
+        except BaseException as e:
+            self.error = e
+        finally:
+            try:
+                self.process.stdin.close()
+            except (IOError, OSError):
+                pass
+
+    def read(self, size=-1):
+        return self.process.stdout.read(size)
+
+    def close(self, error=False):
+        if error:
+            self.process.kill()
+        else:
+            # The archive may end before the compressed stream, and the
+            # command exits only after its output is read
+            while self.process.stdout.read(download.chunk_size):
+                pass
+        self.thread.join()
+        self.process.stdout.close()
+        returncode = self.process.wait()
+        if error:
+            return
+        if self.error is not None:
+            raise self.error
+        if returncode != 0:
+            raise ArchiveError(
+                '%s exited with status %d' % (self.name, returncode))
+
+
+class _ThreadDecompressor(object):
+
+    """Decompresses a stream with the ``lzma`` module on its own thread.
+
+    The module releases the GIL while it decompresses, so reading,
+    decompression and extraction run in parallel as with
+    :class:`_ProcessDecompressor`, without the ``xz`` command.  Decompressed
+    chunks are passed through a bounded queue.  Concatenated streams are
+    decompressed one after another like ``xz -dc`` does.
+    """
+
+    def __init__(self, fileobj, queue_size=8):
+        import lzma
+
+        self.lzma = lzma
+        self.fileobj = fileobj
+        self.queue = queue.Queue(queue_size)
+        self.buffer = b''
+        self.eof = False
+        self.stopped = False
+        self.error = None
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        try:
+            decompressor = self.lzma.LZMADecompressor()
+            data = b''
+            while not self.stopped:
+                if not data:
+                    data = self.fileobj.read(download.chunk_size)
+                    if not data:
+                        break
+                if decompressor.eof:
+                    # Another stream may follow after null bytes of padding
+                    data = data.lstrip(b'\0')
+                    if not data:
+                        continue
+                    decompressor = self.lzma.LZMADecompressor()
+                output = decompressor.decompress(data)
+                data = decompressor.unused_data if decompressor.eof else b''
+                if output:
+                    self.queue.put(output)
+            if not self.stopped and not decompressor.eof:
+                raise ArchiveError('xz stream is truncated')
+        except self.lzma.LZMAError as e:
+            self.error = ArchiveError('xz stream is corrupted: %s' % e)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.queue.put(None)
+
+    def read(self, size=-1):
+        while not self.eof and (size < 0 or len(self.buffer) < size):
+            data = self.queue.get()
+            if data is None:
+                self.eof = True
+            else:
+                self.buffer += data
+        if self.error is not None:
+            raise self.error
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def close(self, error=False):
+        if error:
+            self.stopped = True
+        # The archive may end before the compressed stream, which is still
+        # read to the end to check it.  The queue is drained so that the
+        # thread is never blocked on it.
+        while not self.eof:
+            if self.queue.get() is None:
+                self.eof = True
+        self.thread.join()
+        if not error and self.error is not None:
+            raise self.error
+
+
+def get_xz_decompressor():
+    """Returns what decompresses ``xz`` streams, ``'xz'`` or ``'lzma'``.
+
+    ``CUDNNENV_XZ_DECOMPRESSOR`` chooses one of them.  By default it is the
+    ``xz`` command when it is installed, and the ``lzma`` module otherwise.
+    """
+    decompressor = os.environ.get('CUDNNENV_XZ_DECOMPRESSOR')
+    if decompressor in ('xz', 'lzma'):
+        return decompressor
+    return 'xz' if which('xz') is not None else 'lzma'
+
+
+def _has_lzma():
+    try:
+        import lzma  # NOQA
+    except ImportError:
+        return False
+    return True
+
+
+def _open_stream(fileobj, xz_decompressor=None):
+    # The format is detected from the magic bytes, because `fileobj` may not
+    # be seekable
+    head = _read_head(fileobj, _magic_size)
+    fileobj = _Prefixed(head, fileobj)
+    compression = detect(head)
+    if compression == 'xz':
+        if xz_decompressor is None:
+            xz_decompressor = get_xz_decompressor()
+        command = which('xz') if xz_decompressor == 'xz' else None
+        if command is not None:
+            return _ProcessDecompressor([command, '-dc'], fileobj), 'r|'
+        # Python 2 has no lzma module, and tarfile cannot read xz there
+        if _has_lzma():
+            return _ThreadDecompressor(fileobj), 'r|'
+    if compression == 'zst':
+        command = which('zstd')
+        if command is not None:
+            return _ProcessDecompressor([command, '-dc'], fileobj), 'r|'
+    if compression == 'zst':
+        # tarfile does not read zstd, which NVIDIA does not use but object
+        # stores often do
+        try:
+            import zstandard
+        except ImportError:
+            raise ArchiveError(
+                'zstd archives need the zstd command or the zstandard module')
+        decompressor = zstandard.ZstdDecompressor()
+        return decompressor.stream_reader(
+            fileobj, read_across_frames=True), 'r|'
+    if compression is None:
+        return fileobj, 'r|'
+    return fileobj, 'r|' + compression
+
+
+def get_writers():
+    # Writer threads only pay off when there is a core to run them on
+    return min(2, multiprocessing.cpu_count() - 1)
+
+
+class _FileWriter(object):
+
+    """Writes files in the order their chunks are given.
+
+    A file is opened by :meth:`open`, receives its content by :meth:`write`
+    and is completed by :meth:`close`, which sets its mode and records it to
+    the manifest.  The content is hashed here, so that hashing also runs off
+    the thread which decompresses the archive.  Time spent in hashing and
+    in the file system is added to ``phases``, a pair of
+    :class:`cudnnenv.trace.Phase`.
+    """
+
+    def __init__(self, manifest=None, phases=None):
+        self.manifest = manifest
+        self.file = None
+        if phases is None:
+            phases = (trace.phase('hash'), trace.phase('write'))
+        self.hash_phase, self.write_phase = phases
+
+    def open(self, name, dest, size):
+        start = self.write_phase.clock()
+        _remove(dest)
+        self.file = open(dest, 'wb')
+        self.name = name
+        self.dest = dest
+        self.sha256 = hashlib.sha256()
+        if size:
+            # Reserving the whole file at once keeps it contiguous on disk
+            download.preallocate(self.file, size)
+        self.write_phase.add(start)
+
+    def write(self, data):
+        start = self.hash_phase.clock()
+        self.sha256.update(data)
+        self.hash_phase.add(start, len(data))
+        start = self.write_phase.clock()
+        self.file.write(data)
+        self.write_phase.add(start, len(data))
+
+    def close(self, mode):
+        start = self.write_phase.clock()
+        self.file.close()
+        self.file = None
+        os.chmod(self.dest, mode)
+        self.write_phase.add(start)
+        if self.manifest is not None:
+            self.manifest.add_file(
+                self.name, self.dest, self.sha256.hexdigest())
+
+    def abort(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def check(self):
+        pass
+
+    def sync(self):
+        pass
+
+    def join(self):
+        self.abort()
+
+
+class _ThreadWriter(object):
+
+    """Runs the calls to a :class:`_FileWriter` on its own thread.
+
+    Calls are passed through a bounded queue, which limits the memory used by
+    chunks waiting to be written.  The first error is kept and raised by
+    :meth:`check` and :meth:`join`, and later calls are ignored.
+    """
+
+    def __init__(self, manifest=None, queue_size=16, phases=None):
+        self.writer = _FileWriter(manifest, phases)
+        self.queue = queue.Queue(queue_size)
+        self.error = None
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            call = self.queue.get()
+            try:
+                if call is None:
+                    break
+                if self.error is not None:
+                    continue
+                try:
+                    getattr(self.writer, call[0])(*call[1:])
+                except BaseException as e:
+                    self.error = e
+                    self.writer.abort()
+            finally:
+                self.queue.task_done()
+
+    def check(self):
+        if self.error is not None:
+            raise self.error
+
+    def open(self, *args):
+        self.check()
+        self.queue.put(('open',) + args)
+
+    def write(self, data):
+        self.check()
+        self.queue.put(('write', data))
+
+    def close(self, *args):
+        self.queue.put(('close',) + args)
+
+    def sync(self):
+        """Waits until the calls given so far are done."""
+        self.queue.join()
+
+    def join(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.writer.abort()
+
+
+def extract(fileobj, path, rename=None, manifest=None, writers=None,
+            xz_decompressor=None):
+    """Extracts a tar stream read from ``fileobj`` to ``path``.
+
+    The stream is read sequentially, so ``fileobj`` does not need to support
+    seeking.  gzip, bzip2, xz and zstd compression is detected from the
+    magic bytes.  ``rename`` maps a member
+    name to its destination name, or to ``None`` to skip the member.  Files
+    and links are recorded to ``manifest``, a
+    :class:`cudnnenv.manifest.Manifest`, while they are written.
+
+    An ``xz`` stream is decompressed by the ``xz`` command or on a thread by
+    the ``lzma`` module, as chosen by ``xz_decompressor`` (see
+    :func:`get_xz_decompressor`).  A ``zstd`` stream is decompressed by the
+    ``zstd`` command when it is installed.  The calling thread reads members and hands the contents of
+    files to ``writers`` threads, so that decompression, hashing and disk
+    writes overlap.  A file is always written by the same thread, chosen by
+    its path.  With ``writers=0`` files are written by the calling thread.
+    The default depends on the number of CPUs.
+
+    The time spent in reading and decompressing the archive, hashing,
+    writing files and making symbolic links is traced as phases of
+    :mod:`cudnnenv.trace`.
+    """
+    if writers is None:
+        writers = get_writers()
+    decompress_phase = trace.phase('decompress', path=path)
+    symlink_phase = trace.phase('symlink', path=path)
+    phases = (trace.phase('hash', path=path), trace.phase('write', path=path))
+    if writers:
+        pool = [_ThreadWriter(manifest, phases=phases)
+                for _ in range(writers)]
+    else:
+        pool = [_FileWriter(manifest, phases)]
+    hardlinks = []
+    root = _Root(path)
+    stream, mode = _open_stream(fileobj, xz_decompressor)
+    failed = True
+    try:
+        start = decompress_phase.clock()
+        tar = tarfile.open(
+            fileobj=stream, mode=mode, bufsize=download.chunk_size)
+        decompress_phase.add(start)
+        while True:
+            # Members are read from the archive as it is decompressed
+            start = decompress_phase.clock()
+            member = tar.next()
+            decompress_phase.add(start)
+            if member is None:
+                break
+            name = _normalize(member.name)
+            if rename is not None:
+                name = rename(name)
+                if name is None:
+                    continue
+            dest = os.path.join(path, name)
+            if member.isdir():
+                root.check(name, dest)
+                _makedirs(dest)
+                continue
+
+            root.check_parent(name, dest)
+            _makedirs(os.path.dirname(dest))
+            if member.isfile():
+                writer = pool[hash(name) % len(pool)]
+                writer.open(name, dest, member.size)
+                src = tar.extractfile(member)
+                while True:
+                    start = decompress_phase.clock()
+                    data = src.read(download.chunk_size)
+                    decompress_phase.add(start, len(data))
+                    if not data:
+                        break
+                    writer.write(data)
+                writer.close(member.mode & 0o777)
+            elif member.issym():
+                _check_link(name, member.linkname)
+                root.check(name, os.path.join(
+                    os.path.dirname(dest), member.linkname))
+                if os.path.islink(dest):
+                    # Replacing a link may redirect paths which went through
+                    # it, including those of files still being written
+                    for writer in pool:
+                        writer.sync()
+                    root.forget()
+                start = symlink_phase.clock()
+                _remove(dest)
+                os.symlink(member.linkname, dest)
+                symlink_phase.add(start)
+                if manifest is not None:
+                    manifest.add_link(name, member.linkname)
+            elif member.islnk():
+                target = _normalize(member.linkname)
+                if rename is not None:
+                    target = rename(target)
+                    if target is None:
+                        continue
+                hardlinks.append((name, dest, target))
+        tar.close()
+        failed = False
+    finally:
+        if isinstance(stream, (_ProcessDecompressor, _ThreadDecompressor)):
+            stream.close(error=failed)
+        for writer in pool:
+            writer.join()
+    for writer in pool:
+        writer.check()
+
+    # Hard links are made after their targets are completely written
+    write_phase = phases[1]
+    for name, dest, target in hardlinks:
+        root.check_parent(name, dest)
+        root.check(name, os.path.join(path, target))
+        start = write_phase.clock()
+        _remove(dest)
+        os.link(os.path.join(path, target), dest)
+        write_phase.add(start)
+        if manifest is not None:
+            manifest.add_file(name, dest, manifest.files[target]['sha256'])
+
+    for phase in (decompress_phase,) + phases + (symlink_phase,):
+        phase.emit()
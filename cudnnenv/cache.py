@@ -0,0 +1,96 @@
+"""Content-addressed store of verified archives."""
+
+from __future__ import unicode_literals
+
+import errno
+import os
+import shutil
+
+
+class ArchiveCache(object):
+
+    """Store of archives keyed by their SHA-256 digests.
+
+    Only verified archives are added, so an archive found in the store can be
+    used without network access.  The store is kept under ``max_size`` bytes
+    by evicting the least recently used archives.
+    """
+
+    def __init__(self, root, max_size=None):
+        self.root = root
+        self.max_size = max_size
+
+    def get_path(self, sha256sum):
+        return os.path.join(self.root, sha256sum[:2], sha256sum)
+
+    def get(self, sha256sum):
+        """Returns the path to the archive, or ``None`` when it is missing."""
+        path = self.get_path(sha256sum)
+        if not os.path.isfile(path):
+            return None
+        # The modification time records the last use for LRU eviction
+        os.utime(path, None)
+        return path
+
+    def open(self, sha256sum):
+        """Opens the archive, or returns ``None`` when it is missing.
+
+        Unlike a path from :meth:`get`, an opened archive stays readable
+        when another process evicts it before it is extracted.
+        """
+        path = self.get_path(sha256sum)
+        try:
+            f = open(path, 'rb')
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            # Evicted since it was opened, which does not matter to ``f``
+            pass
+        return f
+
+    def add(self, src, sha256sum):
+        """Moves a verified archive at ``src`` into the store."""
+        path = self.get_path(sha256sum)
+        parent = os.path.dirname(path)
+        try:
+            os.makedirs(parent)
+        except OSError:
+            if not os.path.isdir(parent):
+                raise
+        shutil.move(src, path)
+        os.utime(path, None)
+        return path
+
+    def list(self):
+        """Returns a list of ``(mtime, size, path)`` of archives in the store."""
+        archives = []
+        if not os.path.isdir(self.root):
+            return archives
+        for prefix in os.listdir(self.root):
+            prefix_dir = os.path.join(self.root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                path = os.path.join(prefix_dir, name)
+                st = os.stat(path)
+                archives.append((st.st_mtime, st.st_size, path))
+        return archives
+
+    def evict(self):
+        """Removes least recently used archives until the store fits."""
+        if self.max_size is None:
+            return []
+        archives = sorted(self.list())
+        total = sum(size for _, size, _ in archives)
+        removed = []
+        for _, size, path in archives:
+            if total <= self.max_size:
+                break
+            os.remove(path)
+            total -= size
+            removed.append(path)
+        return removed
@@ -0,0 +1,110 @@
+"""Components of cuDNN archives selected by install profiles.
+
+An archive contains headers, shared libraries and static libraries.  A
+profile selects some of them, so that the others are skipped while the
+archive is extracted and never written.  The installed components are
+recorded in ``.cudnnenv/components.json`` in the tree, and a later install
+with another profile only extracts the missing ones.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import json
+import os
+
+from cudnnenv import manifest
+
+
+components = ('headers', 'shared', 'static')
+
+profiles = collections.OrderedDict([
+    ('full', components),
+    ('no-static', ('headers', 'shared')),
+    ('headers-only', ('headers',)),
+    ('runtime-only', ('shared',)),
+])
+
+components_name = 'components.json'
+
+
+def get_path(root):
+    return os.path.join(root, manifest.metadata_dir, components_name)
+
+
+def get_component(name):
+    """Returns the component of a member named ``name``.
+
+    Files outside ``include`` and library directories, such as license
+    files, belong to no component and are always extracted.
+    """
+    parts = name.split('/')
+    base = parts[-1]
+    dirs = parts[:-1]
+    if base.endswith('.h') or 'include' in dirs:
+        return 'headers'
+    if 'lib' in dirs or 'lib64' in dirs:
+        if base.endswith('.a'):
+            return 'static'
+        return 'shared'
+    return None
+
+
+def select(selected, rename=None):
+    """Returns a rename function which skips members of other components.
+
+    ``rename`` is applied first, so that components are decided by the
+    destination names.  See :func:`cudnnenv.archive.extract`.
+    """
+    if set(selected) >= set(components):
+        return rename
+
+    def select_rename(name):
+        if rename is not None:
+            name = rename(name)
+            if name is None:
+                return None
+        component = get_component(name)
+        if component is not None and component not in selected:
+            return None
+        return name
+    return select_rename
+
+
+def normalize(selected):
+    return tuple(c for c in components if c in selected)
+
+
+def describe(selected):
+    """Returns the name of the profile of ``selected`` components."""
+    selected = normalize(selected)
+    for name, profile in profiles.items():
+        if profile == selected:
+            return name
+    return ', '.join(selected) or 'none'
+
+
+def load(root):
+    """Returns components installed in the tree at ``root``.
+
+    A tree installed before profiles were introduced has every component.
+    """
+    try:
+        with open(get_path(root)) as f:
+            return normalize(json.load(f)['components'])
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        return components
+
+
+def save(root, selected):
+    path = get_path(root)
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as f:
+        json.dump({'components': list(normalize(selected))}, f)
+
+
+def missing(root, selected):
+    """Returns components in ``selected`` not installed at ``root``."""
+    installed = load(root)
+    return tuple(c for c in normalize(selected) if c not in installed)
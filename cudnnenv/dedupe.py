@@ -0,0 +1,168 @@
+"""Deduplication of identical files across installed trees.
+
+Versions often share byte-identical files, such as builds of the same
+release for different CUDA versions.  Duplicates are replaced by hard links
+to a single file, so that they share one copy on disk.
+
+Removing a tree only removes its links, so the other trees keep their
+files.  Files of installed trees are never written in place: an extraction
+removes a file before writing it again, which gives it a new inode and
+leaves the other links untouched.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+from multiprocessing import pool as mp_pool
+import os
+import stat
+
+from cudnnenv import manifest
+
+
+class _File(object):
+
+    def __init__(self, root, name, path, st, record):
+        self.root = root
+        self.name = name
+        self.path = path
+        self.st = st
+        self.record = record
+        self.sha256 = None
+
+    @property
+    def inode(self):
+        return self.st.st_dev, self.st.st_ino
+
+
+def _is_intact(f):
+    # A file which differs from its manifest is left alone, so that
+    # `verify` still reports it
+    record = f.record
+    if record is None:
+        return True
+    return record['size'] == f.st.st_size and \
+        record['mode'] == stat.S_IMODE(f.st.st_mode) and \
+        record['mtime'] == f.st.st_mtime and \
+        record['sha256'] == f.sha256
+
+
+def _hash(f):
+    f.sha256 = manifest.hash_file(f.path)
+    return f
+
+
+def find_duplicates(roots, targets=None, jobs=4):
+    """Returns groups of identical files in the trees at ``roots``.
+
+    Files are compared by size first, and only files whose size is shared
+    with a file of another inode are hashed with ``jobs`` threads.  When
+    ``targets`` is given, only groups with a file in one of those trees are
+    returned.  Each group is a list of files on one device with the same
+    size, permission bits and SHA-256 digest, and spans more than one inode.
+    """
+    manifests = {}
+    by_size = collections.defaultdict(list)
+    for root in roots:
+        files = manifest.Manifest.load(root)
+        manifests[root] = files
+        records = files.files if files is not None else {}
+        for name, path in manifest.walk(root):
+            st = os.lstat(path)
+            if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+                continue
+            by_size[st.st_dev, st.st_size].append(
+                _File(root, name, path, st, records.get(name)))
+
+    candidates = []
+    for group in by_size.values():
+        if len(set(f.inode for f in group)) < 2:
+            continue
+        if targets is not None and \
+                not any(f.root in targets for f in group):
+            continue
+        candidates.extend(group)
+
+    pool = mp_pool.ThreadPool(jobs)
+    try:
+        hashed = pool.map(_hash, candidates, 1)
+    finally:
+        pool.terminate()
+        pool.join()
+
+    by_digest = collections.defaultdict(list)
+    for f in hashed:
+        if _is_intact(f):
+            key = (f.st.st_dev, f.st.st_size, stat.S_IMODE(f.st.st_mode),
+                   f.sha256)
+            by_digest[key].append(f)
+    groups = []
+    for key in sorted(by_digest):
+        group = by_digest[key]
+        if len(set(f.inode for f in group)) < 2:
+            continue
+        if targets is not None and \
+                not any(f.root in targets for f in group):
+            continue
+        groups.append(sorted(group, key=lambda f: f.path))
+    return groups, manifests
+
+
+def _replace(src, dest):
+    # The link is made under a temporary name and renamed over the
+    # duplicate, so the path always names a complete file
+    temp_path = os.path.join(
+        os.path.dirname(dest),
+        '.%s.%d.tmp' % (os.path.basename(dest), os.getpid()))
+    os.link(src, temp_path)
+    try:
+        os.rename(temp_path, dest)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def link(groups, manifests, dry_run=False):
+    """Replaces files in ``groups`` with hard links to one of them.
+
+    The file whose inode already has the most links is kept.  Manifests in
+    ``manifests`` are updated with the modification times of the links.
+    Returns the number of files replaced and the number of bytes
+    reclaimed.  An inode is only counted as reclaimed when all of its links
+    are replaced.
+    """
+    linked = 0
+    reclaimed = 0
+    changed = set()
+    for group in groups:
+        keeper = min(group, key=lambda f: -f.st.st_nlink)
+        replaced = collections.Counter()
+        for f in group:
+            if f.inode == keeper.inode:
+                continue
+            if not dry_run:
+                try:
+                    _replace(keeper.path, f.path)
+                except OSError:
+                    # Such as too many links to the file
+                    continue
+                if f.record is not None:
+                    f.record['mtime'] = keeper.st.st_mtime
+                    changed.add(f.root)
+            linked += 1
+            replaced[f.inode] += 1
+        for f in group:
+            if replaced.pop(f.inode, 0) == f.st.st_nlink:
+                reclaimed += f.st.st_size
+    for root in changed:
+        manifests[root].save(root)
+    return linked, reclaimed
+
+
+def dedupe(roots, targets=None, jobs=4, dry_run=False):
+    """Links identical files in the trees at ``roots``.
+
+    See :func:`find_duplicates` and :func:`link`.
+    """
+    groups, manifests = find_duplicates(roots, targets, jobs)
+    return link(groups, manifests, dry_run)
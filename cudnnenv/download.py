@@ -0,0 +1,342 @@
+"""Streaming downloader which verifies SHA-256 while data arrives."""
+
+from __future__ import unicode_literals
+
+import contextlib
+import hashlib
+import json
+from multiprocessing import pool as mp_pool
+import os
+import re
+import socket
+
+try:
+    from urllib.error import HTTPError
+    from urllib.parse import urlsplit
+    from urllib.request import Request
+    from urllib.request import urlopen as _urlopen
+except ImportError:
+    from urllib2 import HTTPError
+    from urllib2 import Request
+    from urllib2 import urlopen as _urlopen
+    from urlparse import urlsplit
+
+from cudnnenv import trace
+
+
+chunk_size = 1 << 20
+segment_size = 32 << 20
+
+# When set, every request raises OfflineError instead of reaching the network
+offline = False
+
+
+class DownloadError(Exception):
+    pass
+
+
+class ChecksumError(DownloadError):
+
+    def __init__(self, url, expected, actual):
+        super(ChecksumError, self).__init__(
+            'sha256sum of %s does not match: expected %s, got %s' % (
+                url, expected, actual))
+        self.url = url
+        self.expected = expected
+        self.actual = actual
+
+
+class OfflineError(DownloadError):
+    pass
+
+
+def _resolve(url):
+    # urllib resolves the host while it connects, so it is resolved here
+    # beforehand to time the lookup on its own.  The result is cached by
+    # the resolver of the system, if any.
+    parts = urlsplit(url)
+    if not parts.hostname:
+        return
+    port = parts.port or {'https': 443}.get(parts.scheme, 80)
+    try:
+        with trace.span('dns', host=parts.hostname):
+            socket.getaddrinfo(parts.hostname, port, 0, socket.SOCK_STREAM)
+    except socket.error:
+        # urllib reports the error with the URL
+        pass
+
+
+def urlopen(request, *args, **kwargs):
+    """Opens ``request`` like ``urllib``, unless :data:`offline` is set."""
+    url = request.get_full_url() if isinstance(request, Request) \
+        else request
+    if offline:
+        raise OfflineError('cannot download %s while offline' % url)
+    if not trace.is_enabled():
+        return _urlopen(request, *args, **kwargs)
+    _resolve(url)
+    with trace.span('connect', url=url):
+        return _urlopen(request, *args, **kwargs)
+
+
+class HashReader(object):
+
+    """File-like object which hashes everything read through it."""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.phase = trace.phase('hash')
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        start = self.phase.clock()
+        self.sha256.update(data)
+        self.phase.add(start, len(data))
+        self.size += len(data)
+        return data
+
+    def drain(self, size=chunk_size):
+        """Reads and hashes the rest of the stream."""
+        while self.read(size):
+            pass
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+    def check(self, url, sha256sum):
+        """Raises :class:`ChecksumError` unless the digest is ``sha256sum``."""
+        self.phase.emit(url=url)
+        actual = self.hexdigest()
+        if sha256sum is not None and actual != sha256sum:
+            raise ChecksumError(url, sha256sum, actual)
+
+
+def copy(src, dst, size=chunk_size):
+    while True:
+        data = src.read(size)
+        if not data:
+            break
+        dst.write(data)
+
+
+def stream(url, consume, sha256sum=None):
+    """Passes the content of ``url`` to ``consume`` as a file-like object.
+
+    ``consume`` reads the response sequentially, and whatever it leaves
+    unread is drained afterwards so that the whole content is hashed.
+    Raises :class:`ChecksumError` when ``sha256sum`` is given and does not
+    match.  Returns the hex digest of the content.
+    """
+    response = urlopen(url)
+    try:
+        reader = HashReader(response)
+        with trace.span('transfer', url=url) as phase:
+            consume(reader)
+            reader.drain()
+            phase.count(reader.size)
+    finally:
+        response.close()
+    reader.check(url, sha256sum)
+    return reader.hexdigest()
+
+
+def download(url, fileobj, sha256sum=None, size=chunk_size):
+    """Writes the content of ``url`` to ``fileobj``.
+
+    The content is read in chunks of at most ``size`` bytes and hashed as it
+    arrives, so memory use does not depend on the archive size and no extra
+    pass over the written file is needed.
+    """
+    return stream(url, lambda reader: copy(reader, fileobj, size), sha256sum)
+
+
+_content_range = re.compile(r'bytes (\d+)-(\d+)/(\d+)')
+
+
+def open_range(url, start, end=None):
+    """Requests bytes from ``start`` to ``end`` (inclusive) of ``url``.
+
+    Returns a pair of the response and the total size of the content.  The
+    size is ``None`` when the server ignored the range and sent everything.
+    """
+    byte_range = 'bytes=%d-%s' % (start, '' if end is None else end)
+    response = urlopen(Request(url, headers={'Range': byte_range}))
+    match = _content_range.match(response.info().get('Content-Range') or '')
+    if response.getcode() != 206 or match is None:
+        return response, None
+    if int(match.group(1)) != start:
+        response.close()
+        raise DownloadError(
+            'unexpected Content-Range from %s: %s' % (url, match.group(0)))
+    return response, int(match.group(3))
+
+
+def preallocate(f, size):
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError:
+            # Some filesystems do not support fallocate
+            pass
+    f.truncate(size)
+
+
+def _fetch_segment(url, path, start, end):
+    response, total = open_range(url, start, end)
+    with contextlib.closing(response), open(path, 'r+b') as f:
+        if total is None:
+            raise DownloadError('%s does not support range requests' % url)
+        # Each segment has its own file object, so writes go to their own
+        # offsets without sharing a file position between threads
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining:
+            data = response.read(min(chunk_size, remaining))
+            if not data:
+                raise DownloadError(
+                    'segment %d-%d of %s is truncated' % (start, end, url))
+            f.write(data)
+            remaining -= len(data)
+
+
+def _segments(total, size):
+    return [(start, min(start + size, total) - 1)
+            for start in range(0, total, size)]
+
+
+def download_segmented(url, path, sha256sum=None, connections=4,
+                       size=segment_size):
+    """Downloads ``url`` to ``path`` over several connections.
+
+    The file is preallocated and split into segments of ``size`` bytes,
+    which are fetched with HTTP range requests by ``connections`` threads and
+    written at their own offsets.  Completed segments are hashed in order
+    while later ones are still downloading.  When the server ignores range
+    requests, this falls back to a single stream.
+    """
+    response, total = open_range(url, 0, 0)
+    response.close()
+    if total is None:
+        with open(path, 'wb') as f:
+            return download(url, f, sha256sum)
+
+    with open(path, 'wb') as f:
+        preallocate(f, total)
+
+    def fetch(segment):
+        _fetch_segment(url, path, *segment)
+        return segment
+
+    pool = mp_pool.ThreadPool(connections)
+    try:
+        # The file is read without buffering because a read-ahead buffer
+        # would hold bytes of segments that are not written yet
+        with open(path, 'rb', 0) as f, \
+                trace.span('transfer', url=url,
+                           connections=connections) as phase:
+            reader = HashReader(f)
+            # `imap` yields segments in order, so the file is hashed
+            # sequentially up to the last completed segment
+            for start, end in pool.imap(fetch, _segments(total, size)):
+                remaining = end - start + 1
+                while remaining:
+                    remaining -= len(reader.read(min(chunk_size, remaining)))
+            phase.count(total)
+    finally:
+        pool.terminate()
+        pool.join()
+    reader.check(url, sha256sum)
+    return reader.hexdigest()
+
+
+def _read_metadata(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _write_metadata(path, metadata):
+    with open(path, 'w') as f:
+        json.dump(metadata, f)
+
+
+def _validator(metadata):
+    return metadata.get('etag') or metadata.get('last_modified')
+
+
+def remove_partial(path):
+    for p in (path, path + '.json'):
+        if os.path.exists(p):
+            os.remove(p)
+
+
+def download_resumable(url, path, sha256sum=None):
+    """Downloads ``url`` to ``path``, resuming a previous partial download.
+
+    Metadata of the download is kept in ``path + '.json'``: the URL, the
+    expected digest and the validator headers of the response.  When ``path``
+    already exists and was started for the same URL and digest, only the
+    rest of the content is requested with a range request.  ``If-Range``
+    makes the server send the whole content instead when it has changed.  A
+    partial file which fails verification is removed.
+    """
+    meta_path = path + '.json'
+    metadata = _read_metadata(meta_path)
+    reader = HashReader(None)
+    offset = 0
+    resumable = metadata is not None and os.path.exists(path)
+    if resumable and (metadata.get('url'), metadata.get('sha256sum')) == (
+            url, sha256sum):
+        with open(path, 'rb') as f:
+            reader.fileobj = f
+            reader.drain()
+        offset = reader.size
+
+    headers = {}
+    if offset:
+        headers['Range'] = 'bytes=%d-' % offset
+        if _validator(metadata):
+            headers['If-Range'] = _validator(metadata)
+    try:
+        response = urlopen(Request(url, headers=headers))
+    except HTTPError as e:
+        # 416 means that the previous download had already completed
+        if e.code != 416 or not offset:
+            raise
+        response = None
+
+    if response is not None:
+        with contextlib.closing(response):
+            info = response.info()
+            if response.getcode() == 206:
+                match = _content_range.match(info.get('Content-Range') or '')
+                if match is None or int(match.group(1)) != offset:
+                    raise DownloadError(
+                        'unexpected Content-Range from %s: %s' % (
+                            url, info.get('Content-Range')))
+            else:
+                reader = HashReader(None)
+                _write_metadata(meta_path, {
+                    'url': url,
+                    'sha256sum': sha256sum,
+                    'etag': info.get('ETag'),
+                    'last_modified': info.get('Last-Modified'),
+                })
+            resumed = reader.size
+            with open(path, 'ab' if resumed else 'wb') as f, \
+                    trace.span('transfer', url=url, offset=resumed) as phase:
+                reader.fileobj = response
+                copy(reader, f)
+                phase.count(reader.size - resumed)
+
+    try:
+        reader.check(url, sha256sum)
+    except ChecksumError:
+        remove_partial(path)
+        raise
+    return reader.hexdigest()
@@ -0,0 +1,92 @@
+"""Advisory file locks shared between cudnnenv processes."""
+
+from __future__ import unicode_literals
+
+import errno
+import fcntl
+import os
+import time
+
+
+class LockTimeout(Exception):
+    pass
+
+
+def get_owner():
+    return '%s:%d' % (os.uname()[1], os.getpid())
+
+
+def read_owner(path):
+    """Returns the owner recorded in a lock file, or ``None``.
+
+    A lock file names an owner while the lock is held, or after its holder
+    crashed.
+    """
+    try:
+        with open(path) as f:
+            return f.read() or None
+    except (IOError, OSError):
+        return None
+
+
+class FileLock(object):
+
+    """Exclusive lock on a file with ``flock``.
+
+    The lock is released by the kernel when the process exits, so a crashed
+    process never leaves it held.  ``timeout`` is the number of seconds to
+    wait for the lock, or ``None`` to wait forever.
+
+    The holder writes its host name and process ID to the file and clears it
+    on release.  When the file still names an owner after the lock is
+    acquired, that owner exited without releasing it, and ``stale_owner`` is
+    set so that the caller can clean up after it.
+    """
+
+    def __init__(self, path, timeout=None, interval=0.05):
+        self.path = path
+        self.timeout = timeout
+        self.interval = interval
+        self.fd = None
+        self.stale_owner = None
+
+    def acquire(self, blocking=True):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        start = time.time()
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except (IOError, OSError) as e:
+                if e.errno not in (errno.EAGAIN, errno.EACCES):
+                    os.close(fd)
+                    raise
+            if not blocking:
+                os.close(fd)
+                return False
+            if self.timeout is not None and \
+                    time.time() - start >= self.timeout:
+                os.close(fd)
+                raise LockTimeout(
+                    'timed out waiting for lock %s' % self.path)
+            time.sleep(self.interval)
+        self.fd = fd
+        self.stale_owner = os.read(fd, 1024).decode('utf-8') or None
+        os.ftruncate(fd, 0)
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, get_owner().encode('utf-8'))
+        return True
+
+    def release(self):
+        if self.fd is not None:
+            os.ftruncate(self.fd, 0)
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
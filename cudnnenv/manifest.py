@@ -0,0 +1,164 @@
+"""Manifests of installed trees, used to verify them later.
+
+A manifest records the size, permission bits, modification time and SHA-256
+digest of every regular file in a tree, and the target of every symbolic
+link.  It is written to ``.cudnnenv/manifest.json`` in the tree when the
+tree is installed.
+"""
+
+from __future__ import unicode_literals
+
+import hashlib
+import json
+from multiprocessing import pool as mp_pool
+import os
+import stat
+
+from cudnnenv import download
+
+
+metadata_dir = '.cudnnenv'
+manifest_name = 'manifest.json'
+
+
+def get_path(root):
+    return os.path.join(root, metadata_dir, manifest_name)
+
+
+def hash_file(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(download.chunk_size)
+            if not data:
+                break
+            sha256.update(data)
+    return sha256.hexdigest()
+
+
+class Manifest(object):
+
+    """Files and links of a tree keyed by their paths relative to the root.
+
+    Paths use ``/`` as the separator on every platform.
+    """
+
+    def __init__(self, files=None, links=None):
+        self.files = files or {}
+        self.links = links or {}
+
+    def add_file(self, name, path, sha256sum):
+        st = os.lstat(path)
+        self.files[name] = {
+            'size': st.st_size,
+            'mode': stat.S_IMODE(st.st_mode),
+            'mtime': st.st_mtime,
+            'sha256': sha256sum,
+        }
+
+    def add_link(self, name, target):
+        self.links[name] = target
+
+    def save(self, root):
+        path = get_path(root)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            json.dump({'files': self.files, 'links': self.links}, f,
+                      sort_keys=True)
+
+    @classmethod
+    def load(cls, root):
+        """Returns the manifest of the tree at ``root``, or ``None``."""
+        try:
+            with open(get_path(root)) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        return cls(data.get('files'), data.get('links'))
+
+
+def walk(root):
+    """Yields relative names and paths in the tree at ``root``."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        if dirpath == root and metadata_dir in dirnames:
+            dirnames.remove(metadata_dir)
+        for name in dirnames + filenames:
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, root).replace(os.sep, '/')
+            yield rel, path
+
+
+def build(root, jobs=4):
+    """Creates a manifest of the tree at ``root`` by hashing its files."""
+    manifest = Manifest()
+    files = []
+    for name, path in walk(root):
+        if os.path.islink(path):
+            manifest.add_link(name, os.readlink(path))
+        elif os.path.isfile(path):
+            files.append((name, path))
+    pool = mp_pool.ThreadPool(jobs)
+    try:
+        digests = pool.map(hash_file, [path for _, path in files], 1)
+    finally:
+        pool.terminate()
+        pool.join()
+    for (name, path), digest in zip(files, digests):
+        manifest.add_file(name, path, digest)
+    return manifest
+
+
+def _check_file(args):
+    name, path, record, full = args
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return name, 'missing'
+    if not stat.S_ISREG(st.st_mode):
+        return name, 'not a regular file'
+    if st.st_size != record['size']:
+        return name, 'size changed from %d to %d' % (
+            record['size'], st.st_size)
+    if stat.S_IMODE(st.st_mode) != record['mode']:
+        return name, 'mode changed from %o to %o' % (
+            record['mode'], stat.S_IMODE(st.st_mode))
+    if full:
+        if hash_file(path) != record['sha256']:
+            return name, 'checksum mismatch'
+    elif st.st_mtime != record['mtime']:
+        return name, 'modified'
+    return None
+
+
+def verify(root, manifest, full=False, jobs=4):
+    """Checks the tree at ``root`` against ``manifest``.
+
+    The fast mode compares sizes, modes and modification times with
+    ``lstat``.  The full mode compares SHA-256 digests of the contents
+    instead of modification times, hashing files with ``jobs`` threads.
+    Returns a sorted list of pairs of a path and the problem found.
+    """
+    problems = []
+    for name, target in manifest.links.items():
+        path = os.path.join(root, *name.split('/'))
+        if not os.path.islink(path):
+            problems.append((name, 'missing'))
+        elif os.readlink(path) != target:
+            problems.append((name, 'link target changed'))
+
+    tasks = [(name, os.path.join(root, *name.split('/')), record, full)
+             for name, record in manifest.files.items()]
+    if full:
+        pool = mp_pool.ThreadPool(jobs)
+        try:
+            # Larger files first, so that a big library does not start last
+            tasks.sort(key=lambda task: -task[2]['size'])
+            results = pool.map(_check_file, tasks, 1)
+        finally:
+            pool.terminate()
+            pool.join()
+    else:
+        results = [_check_file(task) for task in tasks]
+    problems.extend(result for result in results if result is not None)
+    return sorted(problems)
@@ -0,0 +1,132 @@
+"""Catalog published at a URL and cached on disk.
+
+A remote catalog adds versions released after this version of cudnnenv.  It
+is a JSON document with the same tables as :mod:`cudnnenv.catalog`::
+
+    {"linux": {"versions": [[version, directory, archive, sha256sum], ...],
+               "aliases": [[alias, version], ...]},
+     "darwin": {...}}
+
+The document is cached with its ``ETag`` and ``Last-Modified`` headers, so
+that a refresh sends a conditional request and usually receives only
+``304 Not Modified``.  Lookups read the cache and never wait for the network.
+"""
+
+from __future__ import unicode_literals
+
+import contextlib
+import json
+import os
+import re
+import time
+
+from cudnnenv import catalog
+from cudnnenv import download
+
+
+class CatalogError(Exception):
+    pass
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _write(path, cached):
+    # Other processes read the cache at any time, so it is replaced by a
+    # rename
+    temp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(temp_path, 'w') as f:
+        json.dump(cached, f)
+    os.rename(temp_path, path)
+
+
+_sha256_pattern = re.compile(r'[0-9a-f]{64}$')
+
+
+def _is_name(name):
+    # Names of versions and aliases become directories under ``versions``,
+    # next to staging directories which start with a dot
+    return isinstance(name, type('')) and name != '' and \
+        '/' not in name and not name.startswith('.')
+
+
+def _is_relative_path(path):
+    # Directories and archives are joined to base URLs and mirror
+    # directories, so they must stay under them
+    return isinstance(path, type('')) and all(
+        part not in ('', '.', '..') for part in path.split('/'))
+
+
+def validate(tables):
+    """Raises :class:`CatalogError` unless ``tables`` is a valid catalog."""
+    try:
+        for platform, table in tables.items():
+            if platform not in catalog.platforms:
+                continue
+            for row in table['versions']:
+                if len(row) != 4 or not _is_name(row[0]) or \
+                        not _is_relative_path(row[1]) or \
+                        not _is_relative_path(row[2]) or \
+                        not isinstance(row[3], type('')) or \
+                        not _sha256_pattern.match(row[3]):
+                    raise CatalogError('invalid version: %r' % (row,))
+            for alias in table.get('aliases', ()):
+                if len(alias) != 2 or not _is_name(alias[0]) or \
+                        not isinstance(alias[1], type('')):
+                    raise CatalogError('invalid alias: %r' % (alias,))
+    except (AttributeError, KeyError, TypeError) as e:
+        raise CatalogError('invalid catalog: %s' % e)
+
+
+def is_fresh(path, url, ttl):
+    """Returns ``True`` if ``url`` was fetched less than ``ttl`` seconds ago."""
+    cached = _read(path)
+    if cached is None or cached.get('url') != url:
+        return False
+    return time.time() - cached.get('fetched', 0) < ttl
+
+
+def refresh(url, path, timeout=10):
+    """Fetches the catalog at ``url`` to ``path`` unless it is unchanged.
+
+    Returns ``True`` when a new catalog was downloaded, and ``False`` when
+    the server answered that the cached one is up to date.
+    """
+    cached = _read(path)
+    headers = {}
+    if cached is not None and cached.get('url') == url:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+    try:
+        response = download.urlopen(
+            download.Request(url, headers=headers), timeout=timeout)
+    except download.HTTPError as e:
+        if e.code != 304 or not headers:
+            raise
+        cached['fetched'] = time.time()
+        _write(path, cached)
+        return False
+
+    with contextlib.closing(response):
+        info = response.info()
+        try:
+            tables = json.loads(response.read().decode('utf-8'))
+        except ValueError as e:
+            raise CatalogError('invalid catalog at %s: %s' % (url, e))
+    validate(tables)
+    _write(path, {
+        'url': url,
+        'etag': info.get('ETag'),
+        'last_modified': info.get('Last-Modified'),
+        'fetched': time.time(),
+        'catalog': tables,
+    })
+    return True
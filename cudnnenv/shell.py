@@ -0,0 +1,118 @@
+"""Shell integration which follows the active version without Python.
+
+``cudnnenv init`` prints a hook which the shell runs before every prompt.
+The hook reads the first line of an environment snippet which cudnnenv
+rewrites whenever the active version changes, and sources the snippet only
+when that line differs from the one it loaded last.  A prompt therefore
+costs one ``read`` builtin unless the active version has changed.
+"""
+
+from __future__ import unicode_literals
+
+import os
+
+try:
+    from shlex import quote
+except ImportError:
+    from pipes import quote
+
+
+shells = ('bash', 'zsh')
+
+snippet_name = 'env.sh'
+
+# `${var//pattern/replacement}` and `local` are available in both bash and
+# zsh, so one hook serves them.  Entries which the previous snippet added are
+# removed from the search paths before the new ones are prepended.
+_hook = '''\
+_cudnnenv_strip() {
+  local value=":$1:"
+  value="${value//:"$2":/:}"
+  value="${value#:}"
+  _cudnnenv_value="${value%:}"
+}
+
+_cudnnenv_prepend() {
+  _cudnnenv_strip "$1" "$2"
+  _cudnnenv_value="$2${_cudnnenv_value:+:$_cudnnenv_value}"
+}
+
+_cudnnenv_hook() {
+  local line=
+  { read -r line < @SNIPPET@; } 2>/dev/null
+  [ "$line" = "$_cudnnenv_loaded" ] && return 0
+  _cudnnenv_loaded=$line
+  local old=$_cudnnenv_cuda
+  _cudnnenv_cuda=
+  CUDNNENV_VERSION=
+  [ -n "$line" ] && . @SNIPPET@
+  local new=$_cudnnenv_cuda
+  local name dir
+  for name in LD_LIBRARY_PATH:@LIBDIR@ CPATH:include LIBRARY_PATH:@LIBDIR@
+  do
+    dir=${name#*:}
+    name=${name%%:*}
+    eval "_cudnnenv_value=\\${$name}"
+    [ -n "$old" ] && _cudnnenv_strip "$_cudnnenv_value" "$old/$dir"
+    [ -n "$new" ] && _cudnnenv_prepend "$_cudnnenv_value" "$new/$dir"
+    if [ -n "$_cudnnenv_value" ]; then
+      export "$name=$_cudnnenv_value"
+    else
+      unset "$name"
+    fi
+  done
+  if [ -n "$CUDNNENV_VERSION" ]; then
+    export CUDNNENV_VERSION
+  else
+    unset CUDNNENV_VERSION
+  fi
+  unset _cudnnenv_value
+}
+'''
+
+_register = {
+    'bash': '''\
+case ";$PROMPT_COMMAND;" in
+  *";_cudnnenv_hook;"*) ;;
+  *) PROMPT_COMMAND="_cudnnenv_hook${PROMPT_COMMAND:+;$PROMPT_COMMAND}" ;;
+esac
+_cudnnenv_hook
+''',
+    'zsh': '''\
+autoload -Uz add-zsh-hook
+add-zsh-hook precmd _cudnnenv_hook
+_cudnnenv_hook
+''',
+}
+
+
+def get_key(target):
+    return '# active: %s' % target
+
+
+def render_hook(shell, home, libdir):
+    """Returns the script which ``eval "$(cudnnenv init SHELL)"`` runs."""
+    snippet = quote(os.path.join(home, snippet_name))
+    hook = _hook.replace('@SNIPPET@', snippet).replace('@LIBDIR@', libdir)
+    return hook + _register[shell]
+
+
+def render_snippet(home, target):
+    """Returns the snippet for an active link to ``target``.
+
+    ``target`` is ``None`` when no version is active.
+    """
+    if target is None:
+        return get_key('(none)') + '\n'
+    cuda_path = os.path.join(home, target, 'cuda')
+    return '%s\n_cudnnenv_cuda=%s\nCUDNNENV_VERSION=%s\n' % (
+        get_key(target), quote(cuda_path),
+        quote(os.path.basename(target)))
+
+
+def read_key(path):
+    try:
+        with open(path) as f:
+            return f.readline().rstrip('\n')
+    except (IOError, OSError):
+        return None
@@ -0,0 +1,181 @@
+"""Timing trace of the phases of a command.
+
+When a trace is enabled by ``--trace`` or ``CUDNNENV_TRACE``, every phase
+of an install is written to the trace as a line of JSON, such as::
+
+    {"bytes": 1048576, "duration": 0.5, "end": 1634000000.5,
+     "phase": "transfer", "start": 1634000000.0, "throughput": 2097152.0,
+     "url": "https://...", "version": "v8.2.4-cuda114"}
+
+``start`` and ``end`` are the times of the first and the last work of the
+phase, and ``duration`` is the time actually spent in it.  Phases which run
+in the same pipeline, such as the transfer and the decompression of a
+streamed archive, overlap in time, and the duration of a phase run by more
+than one thread is their total.  ``throughput`` is ``bytes`` per second of
+``duration``.
+
+Phases cost two method calls per chunk while no trace is enabled.
+"""
+
+from __future__ import unicode_literals
+
+import contextlib
+import json
+import sys
+import threading
+import time
+
+
+_output = None
+_write_lock = threading.Lock()
+_context = threading.local()
+
+
+def enable(path):
+    """Writes the trace to ``path``, or to the standard error for ``-``."""
+    global _output
+    disable()
+    if path == '-':
+        _output = sys.stderr
+    else:
+        _output = open(path, 'a')
+
+
+def disable():
+    global _output
+    output, _output = _output, None
+    if output is not None and output is not sys.stderr:
+        output.close()
+
+
+def is_enabled():
+    return _output is not None
+
+
+def get_context():
+    return getattr(_context, 'fields', {})
+
+
+@contextlib.contextmanager
+def context(**fields):
+    """Adds ``fields`` to phases started by this thread in the block."""
+    original = get_context()
+    _context.fields = dict(original, **fields)
+    try:
+        yield
+    finally:
+        _context.fields = original
+
+
+def emit(event):
+    output = _output
+    if output is None:
+        return
+    line = json.dumps(event, sort_keys=True)
+    with _write_lock:
+        output.write(line + '\n')
+        output.flush()
+
+
+class Phase(object):
+
+    """Time spent in a phase and bytes processed by it.
+
+    Each piece of work is measured with :meth:`clock` and :meth:`add`, which
+    may be called from several threads::
+
+        start = phase.clock()
+        f.write(data)
+        phase.add(start, len(data))
+
+    The phase is written to the trace by :meth:`emit`, unless it did no
+    work at all.
+    """
+
+    def __init__(self, name, **fields):
+        self.name = name
+        self.fields = dict(get_context(), **fields)
+        self.start = None
+        self.end = None
+        self.duration = 0.0
+        self.size = None
+        self._lock = threading.Lock()
+
+    def clock(self):
+        return time.time()
+
+    def add(self, start, size=None):
+        end = time.time()
+        with self._lock:
+            if self.start is None:
+                self.start = start
+            self.end = end
+            self.duration += end - start
+            if size is not None:
+                self.size = (self.size or 0) + size
+
+    def count(self, size):
+        """Adds ``size`` bytes without adding time."""
+        with self._lock:
+            self.size = (self.size or 0) + size
+
+    def emit(self, **fields):
+        if self.start is None:
+            return
+        event = dict(self.fields, **fields)
+        event.update({
+            'phase': self.name,
+            'start': self.start,
+            'end': self.end,
+            'duration': self.duration,
+        })
+        if self.size is not None:
+            event['bytes'] = self.size
+            if self.duration > 0:
+                event['throughput'] = self.size / self.duration
+        emit(event)
+
+
+class _NullPhase(object):
+
+    def clock(self):
+        return 0
+
+    def add(self, start, size=None):
+        pass
+
+    def count(self, size):
+        pass
+
+    def emit(self, **fields):
+        pass
+
+
+_null_phase = _NullPhase()
+
+
+def phase(name, **fields):
+    """Returns a :class:`Phase`, or one which does nothing without a trace."""
+    if _output is None:
+        return _null_phase
+    return Phase(name, **fields)
+
+
+@contextlib.contextmanager
+def span(name, **fields):
+    """Traces the block as a single piece of work of a phase.
+
+    The phase is yielded, so that the block can count the bytes it
+    processed with :meth:`Phase.count`.  The phase is written even when
+    the block fails, with its error.
+    """
+    p = phase(name, **fields)
+    start = p.clock()
+    try:
+        yield p
+    except BaseException as e:
+        p.add(start)
+        p.emit(error=str(e) or type(e).__name__)
+        raise
+    p.add(start)
+    p.emit()
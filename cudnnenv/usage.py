@@ -0,0 +1,94 @@
+"""Usage records of installed versions for eviction.
+
+Each record is an empty file under ``usage`` in the cudnnenv root, and its
+modification time is the time of the event, like archives in
+:mod:`cudnnenv.cache`.  Touching a file is cheap enough for every ``exec``,
+and concurrent processes never corrupt a record.
+"""
+
+from __future__ import unicode_literals
+
+import os
+import stat
+
+
+events = ('activated', 'used')
+
+
+class Usage(object):
+
+    """Last activation and use, and pins, of versions."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def get_path(self, ver, event):
+        return os.path.join(self.root, '%s.%s' % (ver, event))
+
+    def touch(self, ver, event='used'):
+        path = self.get_path(ver, event)
+        try:
+            os.utime(path, None)
+        except OSError:
+            if not os.path.isdir(self.root):
+                os.makedirs(self.root)
+            with open(path, 'a'):
+                pass
+
+    def get(self, ver, event='used'):
+        """Returns the last time of ``event``, or ``None``."""
+        try:
+            return os.stat(self.get_path(ver, event)).st_mtime
+        except OSError:
+            return None
+
+    def last_used(self, ver):
+        """Returns the last time ``ver`` was activated or used, or ``None``."""
+        times = [self.get(ver, event) for event in events]
+        times = [t for t in times if t is not None]
+        return max(times) if times else None
+
+    def pin(self, ver):
+        self.touch(ver, 'pinned')
+
+    def unpin(self, ver):
+        path = self.get_path(ver, 'pinned')
+        if os.path.exists(path):
+            os.remove(path)
+
+    def is_pinned(self, ver):
+        return os.path.exists(self.get_path(ver, 'pinned'))
+
+    def remove(self, ver):
+        """Removes every record of ``ver``, such as when it is uninstalled."""
+        for event in events + ('pinned',):
+            path = self.get_path(ver, event)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def measure(roots):
+    """Returns sizes of regular files in the trees at ``roots``.
+
+    The result maps each root to a dictionary from ``(st_dev, st_ino)`` to
+    the size of the file, so that files linked by ``dedupe`` are counted
+    once by :func:`get_total_size`.
+    """
+    sizes = {}
+    for root in roots:
+        files = {}
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                st = os.lstat(os.path.join(dirpath, name))
+                if stat.S_ISREG(st.st_mode):
+                    files[st.st_dev, st.st_ino] = st.st_size
+        sizes[root] = files
+    return sizes
+
+
+def get_total_size(sizes, roots):
+    """Returns the size of the trees at ``roots`` measured in ``sizes``."""
+    files = {}
+    for root in roots:
+        files.update(sizes[root])
+    return sum(files.values())
@@ -0,0 +1,119 @@
+from __future__ import unicode_literals
+
+import hashlib
+import io
+import re
+import tarfile
+import threading
+
+try:
+    from http import server as http_server
+    import socketserver
+except ImportError:
+    import BaseHTTPServer as http_server
+    import SocketServer as socketserver
+
+
+def make_archive(files, mode='w:gz', symlinks=None):
+    """Returns bytes of a tar archive which contains ``files``.
+
+    ``files`` maps member names to their contents, and ``symlinks`` maps
+    member names to link targets.
+    """
+    buf = io.BytesIO()
+    tar = tarfile.open(fileobj=buf, mode=mode)
+    for name in sorted(files):
+        data = files[name]
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mode = 0o644
+        tar.addfile(info, io.BytesIO(data))
+    for name in sorted(symlinks or {}):
+        info = tarfile.TarInfo(name)
+        info.type = tarfile.SYMTYPE
+        info.linkname = symlinks[name]
+        tar.addfile(info)
+    tar.close()
+    return buf.getvalue()
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class _Handler(http_server.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        # Python 2 gives header names in lower case
+        headers = dict((name.title(), value)
+                       for name, value in self.headers.items())
+        self.server.requests.append((self.path, headers))
+        data = self.server.files.get(self.path.lstrip('/'))
+        if data is None:
+            self.send_error(404)
+            return
+
+        etag = '"%s"' % sha256(data)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        match = re.match(r'bytes=(\d+)-(\d*)$', self.headers.get('Range', ''))
+        if self.headers.get('If-Range', etag) != etag:
+            match = None
+        if match and self.server.support_range:
+            start = int(match.group(1))
+            end = int(match.group(2) or len(data) - 1)
+            if start >= len(data):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes %d-%d/%d' % (
+                start, end, len(data)))
+            data = data[start:end + 1]
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(socketserver.ThreadingMixIn, http_server.HTTPServer):
+
+    daemon_threads = True
+
+
+class ArchiveServer(object):
+
+    """HTTP server which serves in-memory files from a background thread."""
+
+    def __init__(self, files, support_range=True):
+        self.files = files
+        self.support_range = support_range
+
+    def __enter__(self):
+        self.server = _Server(('127.0.0.1', 0), _Handler)
+        self.server.files = self.files
+        self.server.support_range = self.support_range
+        self.server.requests = []
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.01,))
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def url(self, path):
+        return 'http://127.0.0.1:%d/%s' % (self.server.server_port, path)
@@ -0,0 +1,290 @@
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import unittest
+
+import mock
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+from cudnnenv import archive
+from cudnnenv import download
+from cudnnenv import manifest
+from test import fixtures
+
+
+class ByteReader(object):
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+
+    def read(self, size=-1):
+        if size < 0:
+            return self.fileobj.read()
+        return self.fileobj.read(min(size, 1))
+
+
+class TestExtract(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def read(self, *names):
+        with open(os.path.join(self.path, *names), 'rb') as f:
+            return f.read()
+
+    def check_extract(self, mode, **kwargs):
+        data = fixtures.make_archive(
+            {'cuda/include/cudnn.h': b'header',
+             'cuda/lib64/libcudnn.so.8.0.0': b'library'},
+            mode=mode,
+            symlinks={'cuda/lib64/libcudnn.so': 'libcudnn.so.8.0.0'})
+        archive.extract(io.BytesIO(data), self.path, **kwargs)
+        self.assertEqual(self.read('cuda', 'include', 'cudnn.h'), b'header')
+        self.assertEqual(self.read('cuda', 'lib64', 'libcudnn.so'), b'library')
+        self.assertEqual(
+            os.readlink(os.path.join(self.path, 'cuda', 'lib64', 'libcudnn.so')),
+            'libcudnn.so.8.0.0')
+
+    def test_extract_gz(self):
+        self.check_extract('w:gz')
+
+    def test_extract_xz(self):
+        self.check_extract('w:xz')
+
+    @unittest.skipIf(lzma is None, 'lzma is not available')
+    def test_extract_xz_lzma(self):
+        with mock.patch.object(archive, 'which', side_effect=AssertionError):
+            self.check_extract('w:xz', xz_decompressor='lzma')
+
+    @unittest.skipIf(lzma is None, 'lzma is not available')
+    def test_extract_xz_lzma_concatenated(self):
+        # `xz -dc` reads streams one after another, with padding between
+        data = fixtures.make_archive(
+            {'cuda/include/cudnn.h': b'header'}, mode='w')
+        half = len(data) // 2
+        data = lzma.compress(data[:half]) + b'\0' * 8 + \
+            lzma.compress(data[half:])
+        archive.extract(io.BytesIO(data), self.path, xz_decompressor='lzma')
+        self.assertEqual(self.read('cuda', 'include', 'cudnn.h'), b'header')
+
+    @unittest.skipIf(lzma is None, 'lzma is not available')
+    def test_extract_xz_lzma_truncated(self):
+        data = fixtures.make_archive(
+            {'cuda/include/cudnn.h': os.urandom(100000)}, mode='w:xz')
+        with self.assertRaises((archive.ArchiveError, tarfile.TarError)):
+            archive.extract(io.BytesIO(data[:-100]), self.path,
+                            xz_decompressor='lzma')
+
+    @unittest.skipIf(lzma is None, 'lzma is not available')
+    def test_extract_xz_lzma_corrupted(self):
+        self.check_corrupted('lzma')
+
+    def test_xz_decompressor(self):
+        with mock.patch.dict(os.environ,
+                             {'CUDNNENV_XZ_DECOMPRESSOR': 'lzma'}):
+            self.assertEqual(archive.get_xz_decompressor(), 'lzma')
+        with mock.patch.dict(os.environ, {'CUDNNENV_XZ_DECOMPRESSOR': ''}), \
+                mock.patch.object(archive, 'which', return_value=None):
+            self.assertEqual(archive.get_xz_decompressor(), 'lzma')
+
+    def test_extract_bz2(self):
+        self.check_extract('w:bz2')
+
+    def test_extract_uncompressed(self):
+        self.check_extract('w')
+
+    def check_extract_zstd(self):
+        data = fixtures.make_archive(
+            {'cuda/include/cudnn.h': b'header'}, mode='w')
+        process = subprocess.Popen(
+            ['zstd', '-c'], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        data, _ = process.communicate(data)
+        archive.extract(io.BytesIO(data), self.path)
+        self.assertEqual(self.read('cuda', 'include', 'cudnn.h'), b'header')
+
+    @unittest.skipIf(archive.which('zstd') is None, 'zstd is not installed')
+    def test_extract_zstd(self):
+        self.check_extract_zstd()
+
+    @unittest.skipIf(archive.which('zstd') is None, 'zstd is not installed')
+    def test_extract_zstd_without_support(self):
+        which = archive.which
+
+        def which_except_zstd(name):
+            return None if name == 'zstd' else which(name)
+
+        with mock.patch.object(archive, 'which', new=which_except_zstd), \
+                mock.patch.dict('sys.modules', {'zstandard': None}):
+            with self.assertRaises(archive.ArchiveError):
+                self.check_extract_zstd()
+
+    def test_extract_short_reads(self):
+        # A pipe may return the magic bytes over more than one read
+        data = fixtures.make_archive(
+            {'cuda/include/cudnn.h': b'header'}, mode='w:xz')
+        archive.extract(ByteReader(io.BytesIO(data)), self.path)
+        self.assertEqual(self.read('cuda', 'include', 'cudnn.h'), b'header')
+
+    def test_detect(self):
+        for mode, compression in (('w:gz', 'gz'), ('w:bz2', 'bz2'),
+                                  ('w:xz', 'xz'), ('w', None)):
+            data = fixtures.make_archive({'a': b'a'}, mode=mode)
+            self.assertEqual(archive.detect(data[:8]), compression)
+        self.assertEqual(archive.detect(b'\x28\xb5\x2f\xfd\x00'), 'zst')
+
+    def test_extract_manifest(self):
+        data = fixtures.make_archive(
+            {'cuda/lib64/libcudnn.so.8': b'library'},
+            symlinks={'cuda/lib64/libcudnn.so': 'libcudnn.so.8'})
+        files = manifest.Manifest()
+        archive.extract(io.BytesIO(data), self.path, manifest=files)
+        record = files.files['cuda/lib64/libcudnn.so.8']
+        self.assertEqual(record['sha256'], fixtures.sha256(b'library'))
+        self.assertEqual(record['size'], 7)
+        self.assertEqual(record['mode'], 0o644)
+        self.assertEqual(
+            files.links, {'cuda/lib64/libcudnn.so': 'libcudnn.so.8'})
+        self.assertEqual(manifest.verify(self.path, files, full=True), [])
+
+    def test_extract_xz_without_command(self):
+        with mock.patch.object(archive, 'which', return_value=None):
+            self.check_extract('w:xz')
+
+    def check_corrupted(self, xz_decompressor):
+        data = fixtures.make_archive(
+            {'cuda/include/cudnn.h': os.urandom(100000)}, mode='w:xz')
+        data = data[:len(data) // 2] + b'x' * 100 + data[len(data) // 2:]
+        with self.assertRaises((archive.ArchiveError, tarfile.TarError)):
+            archive.extract(io.BytesIO(data), self.path,
+                            xz_decompressor=xz_decompressor)
+
+    @unittest.skipIf(archive.which('xz') is None, 'xz is not installed')
+    def test_extract_xz_corrupted(self):
+        self.check_corrupted('xz')
+
+    def check_writers(self, writers):
+        files = dict(('cuda/lib64/libcudnn_%d.so' % i, os.urandom(1000) * 50)
+                     for i in range(8))
+        data = fixtures.make_archive(files, mode='w:xz')
+        manifest_files = manifest.Manifest()
+        # Small chunks make each file pass through the queues many times.
+        # The lzma module is used so that this does not depend on the host.
+        with mock.patch.object(download, 'chunk_size', 4096):
+            archive.extract(io.BytesIO(data), self.path,
+                            manifest=manifest_files, writers=writers,
+                            xz_decompressor='lzma')
+        for name, content in files.items():
+            self.assertEqual(self.read(*name.split('/')), content)
+            self.assertEqual(manifest_files.files[name]['sha256'],
+                             fixtures.sha256(content))
+
+    def test_extract_writers(self):
+        self.check_writers(3)
+
+    def test_extract_without_writers(self):
+        self.check_writers(0)
+
+    def test_extract_hardlink(self):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode='w:gz') as tar:
+            info = tarfile.TarInfo('cuda/lib64/libcudnn.so.8')
+            info.size = 7
+            tar.addfile(info, io.BytesIO(b'library'))
+            info = tarfile.TarInfo('cuda/lib64/libcudnn.so')
+            info.type = tarfile.LNKTYPE
+            info.linkname = 'cuda/lib64/libcudnn.so.8'
+            tar.addfile(info)
+        files = manifest.Manifest()
+        archive.extract(io.BytesIO(buf.getvalue()), self.path, manifest=files)
+        self.assertEqual(self.read('cuda', 'lib64', 'libcudnn.so'), b'library')
+        self.assertEqual(
+            files.files['cuda/lib64/libcudnn.so']['sha256'],
+            fixtures.sha256(b'library'))
+
+    def test_extract_write_error(self):
+        # A directory is in the way of a file
+        os.makedirs(os.path.join(self.path, 'cuda', 'include', 'cudnn.h'))
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.assertRaises(EnvironmentError):
+            archive.extract(io.BytesIO(data), self.path)
+
+    def test_flat_layout(self):
+        data = fixtures.make_archive(
+            {'cudnn-6.5-linux-x64-v2/cudnn.h': b'header',
+             'cudnn-6.5-linux-x64-v2/libcudnn.so': b'library'})
+        archive.extract(io.BytesIO(data), self.path,
+                        archive.flat_layout('lib64'))
+        self.assertEqual(self.read('cuda', 'include', 'cudnn.h'), b'header')
+        self.assertEqual(self.read('cuda', 'lib64', 'libcudnn.so'), b'library')
+
+    def test_unsafe_path(self):
+        data = fixtures.make_archive({'../evil': b''})
+        with self.assertRaises(archive.ArchiveError):
+            archive.extract(io.BytesIO(data), self.path)
+
+    def test_unsafe_symlink(self):
+        data = fixtures.make_archive({}, symlinks={'a/b': '../../evil'})
+        with self.assertRaises(archive.ArchiveError):
+            archive.extract(io.BytesIO(data), self.path)
+
+    def make_ordered_archive(self, members):
+        # Members are added in the given order, unlike make_archive
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode='w') as tar:
+            for name, data in members:
+                info = tarfile.TarInfo(name)
+                if isinstance(data, bytes):
+                    info.size = len(data)
+                    tar.addfile(info, io.BytesIO(data))
+                else:
+                    info.type = tarfile.SYMTYPE
+                    info.linkname = data[0]
+                    tar.addfile(info)
+        return buf.getvalue()
+
+    def check_escape(self, members):
+        root = os.path.join(self.path, 'root')
+        data = self.make_ordered_archive(members)
+        with self.assertRaises(archive.ArchiveError):
+            archive.extract(io.BytesIO(data), root, writers=1)
+        self.assertEqual(sorted(os.listdir(self.path)), ['root'])
+
+    def test_symlink_chain(self):
+        self.check_escape([
+            ('cuda/a', ('..',)),
+            ('cuda/a/b', ('..',)),
+            ('cuda/a/b/escaped', b'x'),
+        ])
+
+    def test_replaced_symlink(self):
+        # `cuda/m` resolves in the tree until `cuda/l` is replaced
+        self.check_escape([
+            ('cuda/d/e/f', b'x'),
+            ('cuda/l', ('d/e',)),
+            ('cuda/m', ('l/../..',)),
+            ('cuda/m/inside', b'x'),
+            ('cuda/l', ('.',)),
+            ('cuda/m/escaped', b'x'),
+        ])
+
+    def test_file_through_symlink(self):
+        data = self.make_ordered_archive([
+            ('cuda/lib64/libcudnn.so.8', b'library'),
+            ('cuda/lib', ('lib64',)),
+            ('cuda/lib/libcudnn.so.8.0', b'library'),
+        ])
+        archive.extract(io.BytesIO(data), self.path)
+        self.assertEqual(self.read('cuda', 'lib64', 'libcudnn.so.8.0'),
+                         b'library')
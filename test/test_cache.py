@@ -0,0 +1,62 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cudnnenv import cache
+
+
+class TestArchiveCache(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.cache = cache.ArchiveCache(
+            os.path.join(self.path, 'archives'), max_size=250)
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def add(self, sha256sum, size, mtime):
+        src = os.path.join(self.path, 'src')
+        with open(src, 'wb') as f:
+            f.write(b'x' * size)
+        path = self.cache.add(src, sha256sum)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_add_get(self):
+        self.assertIsNone(self.cache.get('ab' * 32))
+        path = self.add('ab' * 32, 10, 0)
+        self.assertEqual(self.cache.get('ab' * 32), path)
+        self.assertEqual(
+            path, os.path.join(self.path, 'archives', 'ab', 'ab' * 32))
+        self.assertFalse(os.path.exists(os.path.join(self.path, 'src')))
+
+    def test_evict(self):
+        a = self.add('aa' * 32, 100, 100)
+        b = self.add('bb' * 32, 100, 200)
+        c = self.add('cc' * 32, 100, 300)
+        self.assertEqual(self.cache.evict(), [a])
+        self.assertEqual(self.cache.evict(), [])
+
+        # Using an archive makes it the most recently used one
+        self.cache.get('bb' * 32)
+        self.add('dd' * 32, 100, 400)
+        self.assertEqual(self.cache.evict(), [c])
+        self.assertTrue(os.path.exists(b))
+
+    def test_no_limit(self):
+        self.cache.max_size = None
+        self.add('aa' * 32, 1000, 100)
+        self.assertEqual(self.cache.evict(), [])
+
+    def test_open(self):
+        self.assertIsNone(self.cache.open('ab' * 32))
+        path = self.add('ab' * 32, 10, 0)
+        with self.cache.open('ab' * 32) as f:
+            self.assertGreater(os.stat(path).st_mtime, 0)
+            # Another process may evict the archive before it is read
+            os.remove(path)
+            self.assertEqual(f.read(), b'x' * 10)
@@ -0,0 +1,136 @@
+from __future__ import unicode_literals
+
+import os
+import subprocess
+import sys
+import unittest
+
+import mock
+
+from cudnnenv import catalog
+
+
+# Wall-clock budget in seconds for `import cudnnenv` plus `cudnnenv version`.
+_startup_budget = 0.3
+
+_startup_script = '''
+import sys
+import time
+start = time.time()
+import cudnnenv
+cudnnenv.main(['version'])
+elapsed = time.time() - start
+print('cudnnenv.catalog' in sys.modules)
+print(elapsed)
+'''
+
+
+class TestCatalog(unittest.TestCase):
+
+    def test_load_linux(self):
+        entries = catalog.load('linux')
+        entry = entries['v8.2.4-cuda114']
+        self.assertEqual(entry.name, 'v8.2.4-cuda114')
+        self.assertEqual(entry.format, 'tgz')
+        self.assertEqual(
+            entry.url,
+            'https://developer.download.nvidia.com/compute/redist/cudnn/'
+            'v8.2.4/cudnn-11.4-linux-x64-v8.2.4.15.tgz')
+
+    def test_load_tar_xz(self):
+        entry = catalog.load('linux')['v8.4.0-cuda116']
+        self.assertEqual(entry.format, 'tar.xz')
+        self.assertEqual(
+            entry.url,
+            'https://developer.download.nvidia.com/compute/redist/cudnn/'
+            'v8.4.0/local_installers/11.6/'
+            'cudnn-linux-x86_64-8.4.0.27_cuda11.6-archive.tar.xz')
+
+    def test_load_darwin(self):
+        entries = catalog.load('darwin')
+        self.assertIn('v7.6.5-cuda101', entries)
+        self.assertNotIn('v8.4.0-cuda116', entries)
+        self.assertTrue(entries['v2'].flat)
+        self.assertFalse(entries['v3'].flat)
+
+    def test_mirror(self):
+        entry = catalog.load('linux')['v3']
+        mirror = {'CUDNNENV_MIRROR': 'file:///srv/cudnn/'}
+        with mock.patch.dict(os.environ, mirror):
+            self.assertEqual(
+                entry.url,
+                'file:///srv/cudnn/v3/cudnn-7.0-linux-x64-v3.0-prod.tgz')
+
+    def test_alias(self):
+        entries = catalog.load('linux')
+        self.assertIs(entries['v76-cuda101'], entries['v7.6.5-cuda101'])
+
+
+class TestIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = catalog.Index(catalog.load('linux'))
+
+    def resolve(self, spec, cuda=None):
+        entry = self.index.resolve(spec, cuda)
+        return entry and entry.name
+
+    def test_parsed_versions(self):
+        entry = catalog.load('linux')['v8.4.0-cuda116']
+        self.assertEqual(entry.cudnn_version, (8, 4, 0))
+        self.assertEqual(entry.cuda_version, (11, 6))
+        entry = catalog.load('linux')['v51-cuda8']
+        self.assertEqual(entry.cudnn_version, (5, 1, 0))
+        self.assertEqual(entry.cuda_version, (8, 0))
+
+    def test_parse_version(self):
+        self.assertEqual(catalog.parse_version('v8.2'), (8, 2))
+        self.assertEqual(catalog.parse_version('11'), (11,))
+        self.assertIsNone(catalog.parse_version('8.x'))
+
+    def test_latest(self):
+        self.assertEqual(self.resolve('latest'), 'v8.4.0-cuda116')
+        self.assertEqual(self.resolve('latest', (11, 4)), 'v8.2.4-cuda114')
+        self.assertEqual(self.resolve('latest', (9,)), 'v7.6.5-cuda92')
+        self.assertIsNone(self.resolve('latest', (12, 0)))
+
+    def test_prefix(self):
+        self.assertEqual(self.resolve('8.2'), 'v8.2.4-cuda114')
+        self.assertEqual(self.resolve('8.2', (10, 2)), 'v8.2.4-cuda102')
+        self.assertEqual(self.resolve('7.6.3', (10, 1)), 'v7.6.3-cuda101')
+        self.assertEqual(self.resolve('5'), 'v51-cuda8')
+        self.assertIsNone(self.resolve('9'))
+
+    def test_constraints(self):
+        self.assertEqual(
+            self.resolve('>=8.1,<8.3', (10, 2)), 'v8.2.4-cuda102')
+        self.assertEqual(self.resolve('<8'), 'v7.6.5-cuda102')
+        self.assertEqual(self.resolve('==7.0.1', (9, 0)), 'v7.0.1-cuda9')
+        self.assertIsNone(self.resolve('>8.4'))
+        self.assertIsNone(self.resolve('>=8.1,foo'))
+
+    def test_find_skips_aliases(self):
+        names = [entry.name for entry in self.index.find((8, 2), (11, 4))]
+        self.assertEqual(names, ['v8.2.4-cuda114', 'v8.2.2-cuda114'])
+
+
+class TestStartup(unittest.TestCase):
+
+    def run_startup(self):
+        env = dict(os.environ)
+        env['HOME'] = os.path.dirname(__file__)
+        env['PYTHONPATH'] = os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__)))
+        output = subprocess.check_output(
+            [sys.executable, '-c', _startup_script], env=env)
+        lines = output.decode('utf-8').split()
+        return lines[-2] == 'True', float(lines[-1])
+
+    def test_version_does_not_load_catalog(self):
+        loaded, _ = self.run_startup()
+        self.assertFalse(loaded)
+
+    def test_startup_budget(self):
+        # Take the best of a few runs to ignore a cold file cache
+        elapsed = min(self.run_startup()[1] for _ in range(3))
+        self.assertLess(elapsed, _startup_budget)
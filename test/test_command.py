@@ -6,15 +6,25 @@ try:
 except ImportError:
     import StringIO
     StringIO = StringIO.StringIO
+import contextlib
+import json
 import os
+import re
 import shutil
 import sys
 import tempfile
+import threading
 import unittest
 
 import mock
 
 import cudnnenv
+from cudnnenv import archive
+from cudnnenv import catalog
+from cudnnenv import components
+from cudnnenv import download
+from cudnnenv import lock
+from test import fixtures
 
 
 if 'linux' in sys.platform:
@@ -221,6 +231,9 @@ class TestCommand(unittest.TestCase):
         self.path = tempfile.mkdtemp()
         self.original_cudnn_home = cudnnenv.cudnn_home
         cudnnenv.cudnn_home = self.path
+        # The catalog depends on the remote catalog cached in cudnn_home
+        self.original_catalog = cudnnenv._catalog
+        cudnnenv._catalog = None
         self.stdout = StringIO()
         sys.stdout = self.stdout
 
@@ -229,10 +242,18 @@ class TestCommand(unittest.TestCase):
         sys.stdout = sys.__stdout__
         sys.stdin = sys.__stdin__
         cudnnenv.cudnn_home = self.original_cudnn_home
+        cudnnenv._catalog = self.original_catalog
+        download.offline = False
 
     def call_main(self, *args):
         return cudnnenv.main(args)
 
+    def listdir(self, *names):
+        path = os.path.join(self.path, *names)
+        if not os.path.isdir(path):
+            return []
+        return sorted(os.listdir(path))
+
     def get_stdout(self):
         return self.stdout.getvalue()
 
@@ -259,12 +280,103 @@ class TestCommand(unittest.TestCase):
 
         self.assertEqual(cont.exception.code, 2)
 
+    def test_install_resolve(self):
+        with mock.patch('cudnnenv.download_if_not_exist') as install, \
+                mock.patch('cudnnenv.select_cudnn') as select:
+            self.call_main('install', 'latest', '--cuda', '11.4')
+        install.assert_called_once_with(
+            'v8.2.4-cuda114', stream=False, connections=1, segment_size=None,
+            selected=components.components)
+        select.assert_called_once_with('v8.2.4-cuda114')
+        self.assertIn('latest: resolved to v8.2.4-cuda114', self.get_stdout())
+
+    def test_install_resolve_cuda_mismatch(self):
+        with self.assertRaises(SystemExit) as cont:
+            self.call_main('install', 'v82-cuda114', '--cuda', '10.2')
+        self.assertEqual(cont.exception.code, 2)
+        self.assertIn('(for CUDA 10.2)', self.get_stdout())
+
+    def test_install_resolve_activate(self):
+        with mock.patch('cudnnenv.install_versions') as install, \
+                mock.patch('cudnnenv.select_cudnn') as select:
+            install.return_value = []
+            self.call_main('install', 'v8.2.4-cuda114', 'v82-cuda114',
+                           '--activate', 'latest', '--cuda', '11.4')
+        select.assert_called_once_with('v8.2.4-cuda114')
+        self.assertIn('latest: resolved to v8.2.4-cuda114', self.get_stdout())
+
+    def test_install_activate_unknown(self):
+        with mock.patch('cudnnenv.download_if_not_exist') as install, \
+                self.assertRaises(SystemExit) as cont:
+            self.call_main('install', 'v82-cuda114', '--activate', 'unknown')
+        self.assertEqual(cont.exception.code, 2)
+        self.assertFalse(install.called)
+        self.assertIn('unknown version: unknown', self.get_stdout())
+
+    def test_versions_cuda(self):
+        self.call_main('versions', '--cuda', '11.4')
+        available = self.get_stdout().split('Installed versions:')[0]
+        self.assertEqual(
+            available.split(),
+            ['Available', 'versions:', 'v8.2.2-cuda114', 'v8.2.4-cuda114',
+             'v82-cuda114'])
+
+    def serve_catalog(self):
+        tables = {'linux': {'versions': [[
+            'v9.0.0-cuda12', 'v9.0.0', 'cudnn-9.0.0_cuda12-archive.tar.xz',
+            'a' * 64]]}}
+        server = fixtures.ArchiveServer(
+            {'catalog.json': json.dumps(tables).encode('utf-8')})
+        return server
+
+    def test_update(self):
+        with self.serve_catalog() as server, mock.patch.dict(
+                os.environ,
+                {'CUDNNENV_CATALOG_URL': server.url('catalog.json')}):
+            self.call_main('update')
+            self.call_main('update')
+            self.assertIn('v9.0.0-cuda12', cudnnenv.get_catalog())
+        self.assertEqual(
+            self.get_stdout().splitlines(),
+            ['catalog is updated: %d versions' % len(cudnnenv.get_catalog()),
+             'catalog is up to date'])
+
+    def test_update_without_url(self):
+        with self.assertRaises(SystemExit) as cont:
+            self.call_main('update')
+        self.assertEqual(cont.exception.code, 2)
+
+    def test_install_refresh_catalog(self):
+        with self.serve_catalog() as server, mock.patch.dict(
+                os.environ,
+                {'CUDNNENV_CATALOG_URL': server.url('catalog.json')}), \
+                mock.patch('cudnnenv.download_if_not_exist') as install, \
+                mock.patch('cudnnenv.select_cudnn'):
+            self.call_main('install', 'latest')
+            self.call_main('install', 'latest')
+        install.assert_called_with(
+            'v9.0.0-cuda12', stream=False, connections=1, segment_size=None,
+            selected=components.components)
+        # The cache is fresh for the second install
+        self.assertEqual(len(server.requests), 1)
+
+    def test_install_refresh_catalog_error(self):
+        url = 'http://127.0.0.1:1/catalog.json'
+        with mock.patch.dict(os.environ, {'CUDNNENV_CATALOG_URL': url}), \
+                mock.patch('cudnnenv.download_if_not_exist') as install, \
+                mock.patch('cudnnenv.select_cudnn'):
+            self.call_main('install', 'latest')
+        install.assert_called_with(
+            'v8.4.0-cuda116', stream=False, connections=1, segment_size=None,
+            selected=components.components)
+        self.assertIn('failed to refresh the catalog', self.get_stdout())
+
     def test_install_interrupt(self):
-        def interrupt(cmd, **kwargs):
+        def interrupt(url, *args, **kwargs):
             raise KeyboardInterrupt
 
         try:
-            with mock.patch('subprocess.check_call', new=interrupt):
+            with mock.patch('cudnnenv.download.urlopen', new=interrupt):
                 self.call_main('install', 'v2')
         except BaseException:
             pass
@@ -273,6 +385,759 @@ class TestCommand(unittest.TestCase):
         self.assertFalse(os.path.exists(
             os.path.join(self.path, 'versions', 'v2')))
 
+    @contextlib.contextmanager
+    def serve_versions(self, archives, aliases=None):
+        entries = {}
+        files = {}
+        for ver, (data, sha256sum) in archives.items():
+            entries[ver] = catalog.Entry(
+                ver, ver, 'cudnn.tgz', sha256sum, 'linux')
+            files['%s/cudnn.tgz' % ver] = data
+        for alias, ver in (aliases or {}).items():
+            entries[alias] = entries[ver]
+        with fixtures.ArchiveServer(files) as server, \
+                mock.patch.object(cudnnenv, '_catalog', entries), \
+                mock.patch.object(catalog, 'base_url', server.url('')[:-1]):
+            yield server
+
+    def serve(self, data, sha256sum=None):
+        if sha256sum is None:
+            sha256sum = fixtures.sha256(data)
+        return self.serve_versions(
+            {'v0': (data, sha256sum)}, {'v0-alias': 'v0'})
+
+    def check_installed(self):
+        path = os.path.join(self.path, 'versions', 'v0')
+        with open(os.path.join(path, 'cuda', 'include', 'cudnn.h')) as f:
+            self.assertEqual(f.read(), 'header')
+        active = os.readlink(os.path.join(self.path, 'active'))
+        self.assertEqual(active, 'versions/v0')
+        self.assertEqual(
+            os.listdir(os.path.join(self.path, 'versions')), ['v0'])
+
+    def test_install(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data):
+            self.call_main('install', 'v0')
+        self.check_installed()
+
+    def test_install_stream(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data):
+            self.call_main('install', '--stream', 'v0')
+        self.check_installed()
+        # A streamed archive is never written to the cache
+        self.assertEqual(cudnnenv.get_archive_cache().list(), [])
+
+    def read_trace(self, path):
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_install_trace(self):
+        trace_path = os.path.join(self.path, 'trace.jsonl')
+        data = fixtures.make_archive(
+            {'cuda/include/cudnn.h': b'header',
+             'cuda/lib64/libcudnn.so.8': b'library'},
+            symlinks={'cuda/lib64/libcudnn.so': 'libcudnn.so.8'})
+        with self.serve(data):
+            self.call_main('--trace', trace_path, 'install', 'v0')
+        self.check_installed()
+        events = self.read_trace(trace_path)
+        phases = dict((event['phase'], event) for event in events)
+        self.assertEqual(
+            set(phases),
+            {'dns', 'connect', 'transfer', 'hash', 'decompress', 'write',
+             'symlink', 'command'})
+        self.assertEqual(phases['transfer']['bytes'], len(data))
+        self.assertEqual(phases['transfer']['version'], 'v0')
+        self.assertEqual(phases['write']['bytes'], len(b'headerlibrary'))
+        self.assertEqual(phases['command']['command'], 'install')
+        # Files and the archive are hashed, and both links are traced
+        self.assertEqual(
+            sorted(event.get('bytes') for event in events
+                   if event['phase'] == 'hash'),
+            [len(b'headerlibrary'), len(data)])
+        self.assertEqual(
+            len([event for event in events if event['phase'] == 'symlink']),
+            2)
+
+    def test_install_trace_environment(self):
+        trace_path = os.path.join(self.path, 'trace.jsonl')
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data), \
+                mock.patch.dict(os.environ, {'CUDNNENV_TRACE': trace_path}):
+            self.call_main('install', '--stream', 'v0')
+        self.check_installed()
+        phases = set(event['phase'] for event in self.read_trace(trace_path))
+        self.assertIn('transfer', phases)
+        self.assertIn('decompress', phases)
+
+    def test_profile(self):
+        import pstats
+
+        profile_path = os.path.join(self.path, 'install.prof')
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data):
+            self.call_main('--profile', profile_path, 'install', 'v0')
+        self.check_installed()
+        stats = pstats.Stats(profile_path)
+        self.assertIn(
+            'download_if_not_exist',
+            [name for _, _, name in stats.stats])
+
+    def test_install_connections(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data) as server:
+            self.call_main(
+                'install', '--connections', '2', '--segment-size', '64', 'v0')
+        self.check_installed()
+        self.assertIn(
+            'bytes=0-63',
+            [headers.get('Range') for _, headers in server.requests])
+
+    def test_install_resume(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+
+        def interrupt(*args, **kwargs):
+            raise KeyboardInterrupt
+
+        with self.serve(data) as server:
+            with mock.patch('cudnnenv.download.copy', new=interrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    self.call_main('install', 'v0')
+            self.assertFalse(os.path.exists(
+                os.path.join(self.path, 'versions', 'v0')))
+
+            # Pretend that the first half had been downloaded
+            partial_path = os.path.join(
+                self.path, 'cache', fixtures.sha256(data) + '.part')
+            with open(partial_path, 'wb') as f:
+                f.write(data[:50])
+            self.call_main('install', 'v0')
+
+        self.check_installed()
+        self.assertEqual(server.requests[-1][1]['Range'], 'bytes=50-')
+        self.assertEqual(
+            os.listdir(os.path.join(self.path, 'cache')), ['archives'])
+
+    def test_install_stale_lock(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data) as server:
+            self.call_main('install', 'v0')
+            # Pretend that a command reading the tree, such as `dedupe`,
+            # was killed while it held the lock
+            lock_path = os.path.join(self.path, 'locks', 'v0.lock')
+            with open(lock_path, 'w') as f:
+                f.write('host:1')
+            self.assertTrue(cudnnenv.is_installed('v0'))
+            self.call_main('install', 'v0')
+            self.call_main('gc')
+        self.assertEqual(len(server.requests), 1)
+        self.check_installed()
+        self.assertNotIn('interrupted', self.get_stdout())
+
+    def test_install_interrupted_components(self):
+        data = self.make_components_archive()
+        path = cudnnenv.get_version_path('v0')
+        with self.serve(data) as server:
+            self.call_main('install', 'v0', '--headers-only')
+            # Pretend that adding components was killed while extracting
+            with open(cudnnenv.get_partial_marker(path), 'w'):
+                pass
+            os.makedirs(os.path.join(path, 'cuda', 'lib64'))
+            with open(os.path.join(path, 'cuda', 'lib64',
+                                   'libcudnn_static.a'), 'wb') as f:
+                f.write(b'sta')
+            self.clear_stdout()
+            self.call_main('install', 'v0', '--runtime-only')
+        self.assertEqual(len(server.requests), 1)
+        self.assertIn('interrupted install of v0', self.get_stdout())
+        self.assertFalse(os.path.exists(cudnnenv.get_partial_marker(path)))
+        self.assertEqual(self.listdir('versions', 'v0', 'cuda', 'lib64'),
+                         ['libcudnn.so', 'libcudnn.so.8'])
+        self.clear_stdout()
+        self.call_main('verify', 'v0', '--full')
+        self.assertEqual(self.get_stdout(), 'v0: ok\n')
+
+    def test_install_wait_lock(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        held = lock.FileLock(cudnnenv.get_lock_path('v0'))
+        held.acquire()
+
+        def install_other():
+            # Another process completes the install while this one waits
+            include = os.path.join(
+                cudnnenv.get_version_path('v0'), 'cuda', 'include')
+            os.makedirs(include)
+            with open(os.path.join(include, 'cudnn.h'), 'w') as f:
+                f.write('header')
+            held.release()
+
+        timer = threading.Timer(0.1, install_other)
+        timer.start()
+        with self.serve(data) as server:
+            self.call_main('install', 'v0')
+        timer.join()
+
+        self.assertEqual(server.requests, [])
+        self.check_installed()
+
+    def test_install_lock_timeout(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with lock.FileLock(cudnnenv.get_lock_path('v0')), \
+                self.serve(data), \
+                mock.patch.dict(os.environ, {'CUDNNENV_LOCK_TIMEOUT': '0.1'}):
+            with self.assertRaises(lock.LockTimeout):
+                self.call_main('install', 'v0')
+        self.assertEqual(self.listdir('versions'), [])
+
+    def check_reinstall(self, *args):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data) as server:
+            self.call_main('install', 'v0')
+            self.set_stdin('y\n')
+            self.call_main('uninstall', 'v0')
+            self.call_main('install', *args)
+        self.check_installed()
+        self.assertEqual(len(server.requests), 1)
+
+    def make_components_archive(self):
+        return fixtures.make_archive({
+            'cuda/NVIDIA_SLA_cuDNN_Support.txt': b'license',
+            'cuda/include/cudnn.h': b'header',
+            'cuda/lib64/libcudnn.so.8': b'shared',
+            'cuda/lib64/libcudnn_static.a': b'static',
+        }, symlinks={'cuda/lib64/libcudnn.so': 'libcudnn.so.8'})
+
+    def check_components(self, *args):
+        data = self.make_components_archive()
+        lib = os.path.join(self.path, 'versions', 'v0', 'cuda', 'lib64')
+        with self.serve(data) as server:
+            self.call_main('install', 'v0', '--no-static')
+            self.assertEqual(self.listdir('versions', 'v0', 'cuda', 'lib64'),
+                             ['libcudnn.so', 'libcudnn.so.8'])
+            self.clear_stdout()
+            self.call_main('versions')
+            self.assertIn('* v0 (no-static)\n', self.get_stdout())
+
+            # The missing component is added from the cached archive
+            inode = os.stat(os.path.join(lib, 'libcudnn.so.8')).st_ino
+            self.call_main('install', 'v0', *args)
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(
+            self.listdir('versions', 'v0', 'cuda', 'lib64'),
+            ['libcudnn.so', 'libcudnn.so.8', 'libcudnn_static.a'])
+        self.assertEqual(
+            os.stat(os.path.join(lib, 'libcudnn.so.8')).st_ino, inode)
+        self.clear_stdout()
+        self.call_main('versions')
+        self.assertIn('* v0\n', self.get_stdout())
+        self.clear_stdout()
+        self.call_main('verify', 'v0', '--full')
+        self.assertEqual(self.get_stdout(), 'v0: ok\n')
+
+    def test_install_components(self):
+        self.check_components()
+
+    def test_install_components_stream(self):
+        self.check_components('--stream')
+
+    def test_install_components_stream_checksum_error(self):
+        data = self.make_components_archive()
+        with self.serve(data):
+            self.call_main('install', 'v0', '--headers-only', '--stream')
+        path = cudnnenv.get_version_path('v0')
+        with self.serve(data, sha256sum='0' * 64):
+            with self.assertRaises(download.ChecksumError):
+                self.call_main('install', 'v0', '--runtime-only', '--stream')
+        # Nothing is written to the installed tree from a corrupted archive
+        self.assertEqual(self.listdir('versions', 'v0', 'cuda'),
+                         ['NVIDIA_SLA_cuDNN_Support.txt', 'include'])
+        self.assertFalse(os.path.exists(cudnnenv.get_partial_marker(path)))
+
+    def test_install_headers_only(self):
+        data = self.make_components_archive()
+        with self.serve(data) as server:
+            self.call_main('install', 'v0', '--headers-only')
+            self.assertEqual(self.listdir('versions', 'v0', 'cuda'),
+                             ['NVIDIA_SLA_cuDNN_Support.txt', 'include'])
+            # A narrower profile is already satisfied
+            self.call_main('install', 'v0-alias', '--headers-only')
+            self.call_main('install', 'v0', '--runtime-only', '--stream')
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(self.listdir('versions', 'v0', 'cuda', 'lib64'),
+                         ['libcudnn.so', 'libcudnn.so.8'])
+        self.clear_stdout()
+        self.call_main('versions')
+        self.assertIn('* v0 (no-static)\n', self.get_stdout())
+        self.assertIn('  v0-alias -> v0\n', self.get_stdout())
+
+    def test_install_batch_components(self):
+        data = self.make_components_archive()
+        with self.serve(data):
+            self.call_main('install', 'v0', 'v0-alias', '--runtime-only')
+            self.call_main('install', 'v0', 'v0-alias', '--headers-only')
+        self.assertEqual(
+            self.get_stdout(),
+            'v0: installed\nv0-alias: installed\n'
+            'v0: already installed\nv0-alias: already installed\n')
+        self.assertEqual(self.listdir('versions', 'v0', 'cuda'),
+                         ['NVIDIA_SLA_cuDNN_Support.txt', 'include', 'lib64'])
+        self.assertEqual(
+            components.load(cudnnenv.get_version_path('v0')),
+            ('headers', 'shared'))
+
+    def test_install_staged(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        extract = archive.extract
+        seen = []
+
+        def check_extract(f, path, *args):
+            # The final tree does not exist until extraction completes
+            seen.append(os.path.exists(cudnnenv.get_version_path('v0')))
+            extract(f, path, *args)
+
+        with self.serve(data), \
+                mock.patch('cudnnenv.archive.extract', new=check_extract):
+            self.call_main('install', 'v0')
+        self.assertEqual(seen, [False])
+        self.check_installed()
+
+    def test_gc(self):
+        versions = os.path.join(self.path, 'versions')
+        os.makedirs(os.path.join(versions, '.v0.abc', 'cuda'))
+        os.makedirs(os.path.join(versions, '.v1.def'))
+        os.makedirs(os.path.join(self.path, 'cache'))
+        partial_path = os.path.join(self.path, 'cache', 'x' * 64 + '.part')
+        for path in (partial_path, partial_path + '.json'):
+            with open(path, 'w'):
+                pass
+        # v1 is being installed by another process
+        with lock.FileLock(cudnnenv.get_lock_path('v1')):
+            self.call_main('gc')
+
+        self.assertEqual(self.listdir('versions'), ['.v1.def'])
+        self.assertEqual(self.listdir('cache'), [])
+        self.assertIn('removed %s' % partial_path, self.get_stdout())
+
+    def test_gc_partial_locked(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data):
+            partial_path = cudnnenv.get_partial_path(fixtures.sha256(data))
+            with open(partial_path, 'wb') as f:
+                f.write(data[:50])
+            with lock.FileLock(cudnnenv.get_archive_lock_path(
+                    fixtures.sha256(data))):
+                self.call_main('gc')
+            self.assertTrue(os.path.exists(partial_path))
+            self.assertIn('nothing to remove', self.get_stdout())
+
+    def test_reinstall_from_cache(self):
+        self.check_reinstall('v0')
+
+    def test_reinstall_stream_from_cache(self):
+        self.check_reinstall('--stream', 'v0')
+
+    def test_install_without_cache(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data), \
+                mock.patch.dict(os.environ, {'CUDNNENV_CACHE_SIZE': '0'}):
+            self.call_main('install', 'v0')
+        self.check_installed()
+        self.assertEqual(cudnnenv.get_archive_cache().list(), [])
+
+    def test_install_alias(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data) as server:
+            self.call_main('install', 'v0-alias')
+            self.call_main('install', 'v0')
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(
+            os.readlink(os.path.join(self.path, 'versions', 'v0-alias')),
+            'v0')
+        self.assertEqual(
+            os.readlink(os.path.join(self.path, 'active')), 'versions/v0')
+
+        self.call_main('activate', 'v0-alias')
+        path = os.path.join(self.path, 'active', 'cuda', 'include', 'cudnn.h')
+        self.assertTrue(os.path.exists(path))
+
+        self.clear_stdout()
+        with self.serve(data):
+            self.call_main('versions')
+        self.assertTrue(self.get_stdout().endswith(
+            'Installed versions:\n  v0\n* v0-alias -> v0\n'))
+
+        self.set_stdin('y\n')
+        self.call_main('uninstall', 'v0-alias')
+        self.assertEqual(
+            os.listdir(os.path.join(self.path, 'versions')), ['v0'])
+
+        self.call_main('activate', 'v0')
+        with self.serve(data):
+            self.call_main('install', 'v0-alias')
+        self.set_stdin('y\n')
+        self.call_main('uninstall', 'v0')
+        self.assertEqual(os.listdir(os.path.join(self.path, 'versions')), [])
+
+    def serve_batch(self):
+        archives = {}
+        for ver in ('v1', 'v2', 'v3'):
+            data = fixtures.make_archive(
+                {'cuda/include/cudnn.h': ver.encode('utf-8')})
+            archives[ver] = (data, fixtures.sha256(data))
+        archives['v3'] = (archives['v3'][0], '0' * 64)
+        return self.serve_versions(archives, {'v1-alias': 'v1'})
+
+    def test_install_batch(self):
+        with self.serve_batch() as server:
+            self.call_main('install', 'v1')
+            self.clear_stdout()
+            with self.assertRaises(SystemExit) as cont:
+                self.call_main(
+                    'install', '--jobs', '2', '--activate', 'v2',
+                    'v1', 'v2', 'v3', 'v1-alias')
+        self.assertEqual(cont.exception.code, 1)
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(self.listdir('versions'), ['v1', 'v1-alias', 'v2'])
+        self.assertEqual(
+            os.readlink(os.path.join(self.path, 'active')), 'versions/v2')
+
+        lines = self.get_stdout().splitlines()
+        self.assertEqual(lines[0], 'v1: already installed')
+        self.assertEqual(lines[1], 'v2: installed')
+        self.assertTrue(lines[2].startswith('v3: failed'))
+        self.assertEqual(lines[3], 'v1-alias: installed')
+
+    def test_install_batch_from_file(self):
+        versions_file = os.path.join(self.path, 'versions.txt')
+        with open(versions_file, 'w') as f:
+            f.write('# cuDNN for CI\nv1\n\nv2  # latest\n')
+        with self.serve_batch():
+            self.call_main(
+                'install', '--stream', '--from-file', versions_file)
+        self.assertEqual(self.listdir('versions'), ['v1', 'v2'])
+        self.assertFalse(os.path.lexists(os.path.join(self.path, 'active')))
+
+    def test_install_batch_unknown(self):
+        versions_file = os.path.join(self.path, 'versions.txt')
+        with open(versions_file, 'w') as f:
+            f.write('v1\nunknown\n')
+        with self.serve_batch():
+            with self.assertRaises(SystemExit) as cont:
+                self.call_main('install', '--from-file', versions_file)
+        self.assertEqual(cont.exception.code, 2)
+
+    def make_store(self, *vers):
+        store = os.path.join(self.path, 'store')
+        for ver in vers:
+            include = os.path.join(store, 'versions', ver, 'cuda', 'include')
+            os.makedirs(include)
+            with open(os.path.join(include, 'cudnn.h'), 'w') as f:
+                f.write('header')
+        return store
+
+    def serve_similar_versions(self):
+        archives = {}
+        for ver, library in (('v0', b'library-0'), ('v1', b'library-1')):
+            data = fixtures.make_archive({
+                'cuda/include/cudnn.h': b'header',
+                'cuda/lib64/libcudnn.so': library,
+            })
+            archives[ver] = (data, fixtures.sha256(data))
+        return self.serve_versions(archives, {'v0-alias': 'v0'})
+
+    def get_inode(self, ver):
+        return os.stat(os.path.join(
+            self.path, 'versions', ver, 'cuda', 'include', 'cudnn.h')).st_ino
+
+    def test_dedupe(self):
+        with self.serve_similar_versions():
+            self.call_main('install', 'v0', 'v0-alias', 'v1')
+        self.clear_stdout()
+        self.call_main('dedupe', '--dry-run')
+        self.assertEqual(
+            self.get_stdout(), 'would link 1 files and reclaim 6 bytes\n')
+        self.assertNotEqual(self.get_inode('v0'), self.get_inode('v1'))
+
+        self.clear_stdout()
+        self.call_main('dedupe')
+        self.assertEqual(
+            self.get_stdout(), 'linked 1 files and reclaimed 6 bytes\n')
+        self.assertEqual(self.get_inode('v0'), self.get_inode('v1'))
+        self.clear_stdout()
+        self.call_main('dedupe')
+        self.assertEqual(self.get_stdout(), 'nothing to dedupe\n')
+
+        # Uninstalling a version leaves the linked files of the other
+        self.set_stdin('y\n')
+        self.call_main('uninstall', 'v0')
+        self.clear_stdout()
+        self.call_main('verify', '--full')
+        self.assertEqual(self.get_stdout(), 'v1: ok\n')
+
+    def test_dedupe_locked(self):
+        with self.serve_similar_versions():
+            self.call_main('install', 'v0', 'v1')
+        self.clear_stdout()
+        with lock.FileLock(cudnnenv.get_lock_path('v1')):
+            self.call_main('dedupe')
+        self.assertEqual(
+            self.get_stdout(),
+            'v1: skipped (being installed)\nnothing to dedupe\n')
+
+    def test_install_dedupe(self):
+        with self.serve_similar_versions():
+            self.call_main('install', 'v0')
+            self.clear_stdout()
+            self.call_main('install', 'v1', '--dedupe')
+        self.assertTrue(self.get_stdout().startswith(
+            'linked 1 files and reclaimed 6 bytes\n'))
+        self.assertEqual(self.get_inode('v0'), self.get_inode('v1'))
+
+    def install_sized_versions(self, *args):
+        archives = {}
+        for i in range(3):
+            data = fixtures.make_archive(
+                {'cuda/lib64/libcudnn.so': b'%d' % i * 1000})
+            archives['v%d' % i] = (data, fixtures.sha256(data))
+        with self.serve_versions(archives, {'v0-alias': 'v0'}):
+            self.call_main('install', 'v0', 'v0-alias', 'v1', 'v2', *args)
+        usage = cudnnenv.get_usage()
+        for i, ver in enumerate(('v0', 'v1', 'v2')):
+            os.utime(usage.get_path(ver, 'used'), (1000 + i, 1000 + i))
+        os.utime(usage.get_path('v0-alias', 'used'), (1000, 1000))
+        self.clear_stdout()
+
+    def get_removed(self, prefix='removed'):
+        return re.findall(r'^%s (\S+) \(' % prefix, self.get_stdout(), re.M)
+
+    def test_prune(self):
+        self.install_sized_versions()
+        self.call_main('activate', 'v0')
+        self.clear_stdout()
+        self.call_main('prune', '--max-size', '1500', '--dry-run')
+        self.assertEqual(self.get_removed('would remove'), ['v1', 'v2'])
+        self.assertEqual(self.listdir('versions'),
+                         ['v0', 'v0-alias', 'v1', 'v2'])
+
+        self.clear_stdout()
+        self.call_main('prune', '--max-size', '1500')
+        self.assertEqual(self.get_removed(), ['v1', 'v2'])
+        self.assertEqual(self.listdir('versions'), ['v0', 'v0-alias'])
+        self.assertEqual(self.listdir('usage'),
+                         ['v0-alias.used', 'v0.activated', 'v0.used'])
+
+        self.clear_stdout()
+        self.call_main('prune', '--max-size', '1500')
+        self.assertTrue(
+            self.get_stdout().startswith('nothing to prune: versions use '))
+
+    def test_prune_pinned(self):
+        self.install_sized_versions()
+        self.call_main('pin', 'v0-alias')
+        self.call_main('pin', 'v1')
+        self.call_main('activate', 'v2')
+        self.clear_stdout()
+        self.call_main('versions')
+        self.assertIn('  v0-alias -> v0 (pinned)\n', self.get_stdout())
+        self.clear_stdout()
+        with self.assertRaises(SystemExit) as cont:
+            self.call_main('prune', '--max-size', '0')
+        self.assertEqual(cont.exception.code, 1)
+        self.assertIn('which exceeds 0 bytes, but the others are active, '
+                      'pinned or being installed', self.get_stdout())
+
+        self.call_main('unpin', 'v0-alias')
+        self.clear_stdout()
+        with self.assertRaises(SystemExit):
+            self.call_main('prune', '--max-size', '0')
+        self.assertEqual(self.get_removed(), ['v0'])
+        # The alias is removed with its version
+        self.assertEqual(self.listdir('versions'), ['v1', 'v2'])
+
+    def test_prune_locked(self):
+        self.install_sized_versions()
+        with lock.FileLock(cudnnenv.get_lock_path('v0')):
+            self.call_main('prune', '--max-size', '2500')
+        self.assertEqual(self.get_removed(), ['v1'])
+
+    def test_prune_without_size(self):
+        with self.assertRaises(SystemExit) as cont:
+            self.call_main('prune')
+        self.assertEqual(cont.exception.code, 2)
+
+    def test_install_quota(self):
+        self.install_sized_versions()
+        data = fixtures.make_archive({'cuda/lib64/libcudnn.so': b'x' * 500})
+        with self.serve(data), \
+                mock.patch.dict(os.environ, {'CUDNNENV_QUOTA': '2K'}):
+            self.call_main('install', 'v0')
+        # The installed version is kept even though it was used least
+        # recently
+        self.assertEqual(self.get_removed(), ['v1', 'v2'])
+        self.assertEqual(self.listdir('versions'), ['v0', 'v0-alias'])
+
+    def test_fetch(self):
+        with self.serve_similar_versions() as server:
+            self.call_main('fetch', 'v0', 'v0-alias', 'v1')
+            self.assertEqual(
+                self.get_stdout(),
+                'v0: fetched\nv0-alias: fetched\nv1: fetched\n')
+            self.assertEqual(len(server.requests), 2)
+            self.assertEqual(self.listdir('versions'), [])
+
+            self.clear_stdout()
+            self.call_main('fetch', 'v1')
+            self.assertEqual(self.get_stdout(), 'v1: already cached\n')
+
+            # Nothing is requested while offline
+            self.call_main('install', 'v0', 'v1', '--offline',
+                           '--activate', 'v1')
+            self.assertEqual(len(server.requests), 2)
+        self.assertEqual(self.listdir('versions'), ['v0', 'v1'])
+        self.assertEqual(
+            os.readlink(os.path.join(self.path, 'active')), 'versions/v1')
+
+    def test_fetch_evicted(self):
+        with self.serve_similar_versions(), \
+                mock.patch.dict(os.environ, {'CUDNNENV_CACHE_SIZE': '0'}):
+            with self.assertRaises(SystemExit) as cont:
+                self.call_main('fetch', 'v0')
+        self.assertEqual(cont.exception.code, 1)
+        self.assertIn('v0: failed (evicted from the cache', self.get_stdout())
+
+    def test_install_offline_without_archive(self):
+        with self.serve_similar_versions() as server:
+            self.call_main('fetch', 'v0')
+            self.clear_stdout()
+            with self.assertRaises(SystemExit) as cont:
+                self.call_main('install', 'v0', 'v1', '--offline')
+            self.assertEqual(len(server.requests), 1)
+        self.assertEqual(cont.exception.code, 1)
+        self.assertIn('archives are not in the cache: v1', self.get_stdout())
+        self.assertEqual(self.listdir('versions'), [])
+
+    def test_install_offline_refresh_catalog(self):
+        with self.serve_similar_versions(), \
+                mock.patch.dict(os.environ,
+                                {'CUDNNENV_CATALOG_URL': 'http://invalid/'}):
+            self.call_main('fetch', 'v0')
+            self.clear_stdout()
+            with mock.patch('cudnnenv.refresh_catalog') as refresh:
+                self.call_main('install', 'v0', '--offline')
+        self.assertFalse(refresh.called)
+        self.assertEqual(self.listdir('versions'), ['v0'])
+
+    def test_store(self):
+        store = self.make_store('v0', 'v5')
+        with mock.patch.dict(os.environ, {'CUDNNENV_STORES': os.pathsep.join(
+                [os.path.join(self.path, 'missing'), store])}):
+            self.call_main('install-file', self.empty_tgz_path, 'v1')
+            self.clear_stdout()
+            self.call_main('versions')
+            self.assertTrue(self.get_stdout().endswith(
+                'Installed versions:\n  v0\n* v1\n  v5\n'))
+
+            self.call_main('activate', 'v5')
+            store_path = os.path.join(store, 'versions', 'v5')
+            self.assertEqual(
+                os.readlink(os.path.join(self.path, 'versions', 'v5')),
+                store_path)
+            self.assertEqual(
+                os.readlink(os.path.join(self.path, 'active')),
+                'versions/v5')
+
+            data = fixtures.make_archive({'cuda/include/cudnn.h': b'x'})
+            with self.serve(data) as server:
+                self.call_main('install', 'v0')
+            self.assertEqual(server.requests, [])
+            self.assertEqual(
+                os.readlink(os.path.join(self.path, 'versions', 'v0')),
+                os.path.join(store, 'versions', 'v0'))
+            self.assertEqual(
+                os.readlink(os.path.join(self.path, 'active')),
+                'versions/v0')
+
+            self.set_stdin('y\n')
+            self.call_main('uninstall', 'v0')
+            self.assertTrue(os.path.exists(
+                os.path.join(store, 'versions', 'v0')))
+            with self.assertRaises(SystemExit) as cont:
+                self.call_main('uninstall', 'v0')
+            self.assertEqual(cont.exception.code, 2)
+
+    def test_mirror(self):
+        linux = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        darwin = fixtures.make_archive({'cuda/include/cudnn.h': b'darwin'})
+        tables = {
+            'linux': ((('v0', 'v0', 'linux.tgz', fixtures.sha256(linux)),),
+                      (('v0-alias', 'v0'),)),
+            'darwin': ((('v0', 'v0', 'osx.tgz', fixtures.sha256(darwin)),),
+                       ()),
+        }
+        files = {'v0/linux.tgz': linux, 'v0/osx.tgz': darwin}
+        mirror_dir = os.path.join(self.path, 'mirror')
+        with fixtures.ArchiveServer(files) as server, \
+                mock.patch.object(catalog, '_tables', tables):
+            source = server.url('')
+            self.call_main('mirror', '--source', source, mirror_dir)
+            self.assertEqual(self.get_stdout(), 'v0/linux.tgz: fetched\n'
+                             'v0/osx.tgz: fetched\n')
+            self.assertEqual(len(server.requests), 2)
+
+            self.clear_stdout()
+            self.call_main('mirror', '--source', source, '--platform',
+                           'linux', mirror_dir, 'v0-alias')
+            self.assertEqual(self.get_stdout(), 'v0/linux.tgz: exists\n')
+            self.assertEqual(len(server.requests), 2)
+
+            mirror_url = 'file://' + mirror_dir
+            with mock.patch.object(cudnnenv, '_catalog', None), \
+                    mock.patch.dict(os.environ,
+                                    {'CUDNNENV_MIRROR': mirror_url}):
+                self.call_main('install', 'v0')
+            self.assertEqual(len(server.requests), 2)
+
+        self.assertEqual(self.listdir('mirror', 'v0'),
+                         ['linux.tgz', 'osx.tgz'])
+        self.check_installed()
+
+    def test_mirror_remote(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        tables = {'linux': {'versions': [
+            ['v9', 'v9', 'remote.tgz', fixtures.sha256(data)]]}}
+        with open(cudnnenv.get_catalog_cache_path(), 'w') as f:
+            json.dump({'catalog': tables}, f)
+        mirror_dir = os.path.join(self.path, 'mirror')
+        with fixtures.ArchiveServer({'v9/remote.tgz': data}) as server:
+            self.call_main('mirror', '--source', server.url(''),
+                           '--platform', 'linux', mirror_dir, 'v9')
+        self.assertEqual(self.get_stdout(), 'v9/remote.tgz: fetched\n')
+        self.assertEqual(self.listdir('mirror', 'v9'), ['remote.tgz'])
+
+    def test_mirror_unknown(self):
+        with self.assertRaises(SystemExit) as cont:
+            self.call_main('mirror', self.path, 'unknown')
+        self.assertEqual(cont.exception.code, 2)
+
+    def check_install_checksum_error(self, *args):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data, sha256sum='0' * 64):
+            with self.assertRaises(download.ChecksumError):
+                self.call_main('install', *args)
+
+        self.assertEqual(self.listdir('versions'), [])
+
+    def test_install_checksum_error(self):
+        self.check_install_checksum_error('v0')
+
+    def test_install_stream_checksum_error(self):
+        self.check_install_checksum_error('--stream', 'v0')
+
+    def test_install_connections_checksum_error(self):
+        self.check_install_checksum_error('--connections', '2', 'v0')
+
     def test_install_file_and_uninstall(self):
         self.call_main('install-file', self.empty_tgz_path, 'v0')
 
@@ -306,6 +1171,63 @@ Installed versions:
 Installed versions:
 '''.format(_available_versions))
 
+    def write_archive(self, data):
+        archive_path = os.path.join(self.path, 'cudnn.tar.xz')
+        with open(archive_path, 'wb') as f:
+            f.write(data)
+        return archive_path
+
+    def test_install_file_xz(self):
+        data = fixtures.make_archive(
+            {'cuda/include/cudnn.h': b'header'}, mode='w:xz')
+        self.call_main('install-file', self.write_archive(data), 'v0',
+                       '--sha256', fixtures.sha256(data))
+        self.check_installed()
+        self.clear_stdout()
+        self.call_main('verify', 'v0')
+        self.assertEqual(self.get_stdout(), 'v0: ok\n')
+
+    def test_install_file_stdin(self):
+        data = fixtures.make_archive(
+            {'cuda/include/cudnn.h': b'header'}, mode='w:bz2')
+        stdin = mock.Mock()
+        stdin.buffer = io.BytesIO(data)
+        with mock.patch('sys.stdin', new=stdin):
+            self.call_main('install-file', '-', 'v0')
+        self.check_installed()
+
+    def test_install_file_checksum_error(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.assertRaises(SystemExit) as cont:
+            self.call_main('install-file', self.write_archive(data), 'v0',
+                           '--sha256', fixtures.sha256(b''))
+        self.assertEqual(cont.exception.code, 1)
+        self.assertIn('sha256sum of', self.get_stdout())
+        self.assertEqual(self.listdir('versions'), [])
+        self.assertFalse(os.path.exists(os.path.join(self.path, 'active')))
+
+    def test_install_file_corrupted(self):
+        with self.assertRaises(SystemExit) as cont:
+            self.call_main('install-file', self.write_archive(b'x' * 1000),
+                           'v0')
+        self.assertEqual(cont.exception.code, 1)
+        self.assertEqual(self.listdir('versions'), [])
+
+    def test_install_file_missing(self):
+        with self.assertRaises(SystemExit) as cont:
+            self.call_main('install-file', 'missing.tgz', 'v0')
+        self.assertEqual(cont.exception.code, 2)
+
+    def test_activate_environment(self):
+        self.call_main('install-file', self.empty_tgz_path, 'v0')
+        lib = os.path.join(self.path, 'active', 'cuda', cudnnenv.LIBDIR)
+        include = os.path.join(self.path, 'active', 'cuda', 'include')
+        self.assertIn(
+            '  LD_LIBRARY_PATH=%s:$LD_LIBRARY_PATH\n'
+            '  CPATH=%s:$CPATH\n'
+            '  LIBRARY_PATH=%s:$LIBRARY_PATH\n' % (lib, include, lib),
+            self.get_stdout())
+
     def test_install_exists(self):
         self.call_main('install-file', self.empty_tgz_path, 'v0')
         with self.assertRaises(SystemExit) as cont:
@@ -337,6 +1259,183 @@ Installed versions:
   v1
 '''.format(_available_versions))
 
+    def test_activate_atomic(self):
+        self.call_main('install-file', self.empty_tgz_path, 'v0')
+        self.call_main('install-file', self.empty_tgz_path, 'v1')
+        active = os.path.join(self.path, 'active')
+        missing = []
+        done = threading.Event()
+
+        def check():
+            while not done.is_set():
+                if not os.path.lexists(active):
+                    missing.append(True)
+
+        def switch(ver):
+            for _ in range(50):
+                cudnnenv.select_cudnn(ver)
+
+        checker = threading.Thread(target=check)
+        checker.start()
+        switchers = [threading.Thread(target=switch, args=(ver,))
+                     for ver in ('v0', 'v1')]
+        for thread in switchers:
+            thread.start()
+        for thread in switchers:
+            thread.join()
+        done.set()
+        checker.join()
+
+        self.assertEqual(missing, [])
+        self.assertIn(os.readlink(active), ['versions/v0', 'versions/v1'])
+        self.assertEqual(
+            sorted(os.listdir(self.path)),
+            ['active', 'active.lock', 'env.sh', 'locks', 'usage',
+             'versions'])
+
+    def call_exec(self, *args):
+        with mock.patch('os.execvpe') as execvpe, \
+                mock.patch.object(cudnnenv, 'get_catalog',
+                                  side_effect=AssertionError), \
+                mock.patch.dict(os.environ, {'CPATH': '/usr/include'}):
+            os.environ.pop('LD_LIBRARY_PATH', None)
+            self.call_main('exec', *args)
+        return execvpe
+
+    def test_exec(self):
+        self.call_main('install-file', self.empty_tgz_path, 'v0')
+        self.clear_stdout()
+        execvpe = self.call_exec('v0', '--', 'nvcc', '-V')
+
+        cuda = os.path.join(self.path, 'versions', 'v0', 'cuda')
+        file, argv, env = execvpe.call_args[0]
+        self.assertEqual(file, 'nvcc')
+        self.assertEqual(argv, ['nvcc', '-V'])
+        self.assertEqual(
+            env['LD_LIBRARY_PATH'], os.path.join(cuda, cudnnenv.LIBDIR))
+        self.assertEqual(
+            env['CPATH'],
+            os.path.join(cuda, 'include') + os.pathsep + '/usr/include')
+        self.assertEqual(self.get_stdout(), '')
+
+    def test_exec_store(self):
+        store = self.make_store('v1')
+        with mock.patch.dict(os.environ, {'CUDNNENV_STORES': store}):
+            execvpe = self.call_exec('v1', '--', 'nvcc')
+        env = execvpe.call_args[0][2]
+        self.assertTrue(env['CPATH'].startswith(
+            os.path.join(store, 'versions', 'v1', 'cuda', 'include')))
+        # Nothing is written to disk
+        self.assertEqual(self.listdir(), ['store'])
+
+    def test_exec_usage(self):
+        store = self.make_store('v1')
+        with mock.patch.dict(os.environ, {'CUDNNENV_STORES': store,
+                                          'CUDNNENV_EXEC_USAGE': '1'}):
+            self.call_exec('v1', '--', 'nvcc')
+        self.assertEqual(self.listdir('usage'), ['v1.used'])
+
+    def test_exec_not_installed(self):
+        with self.assertRaises(SystemExit) as cont:
+            self.call_exec('v0', '--', 'nvcc')
+        self.assertEqual(cont.exception.code, 2)
+
+    def test_exec_no_command(self):
+        self.call_main('install-file', self.empty_tgz_path, 'v0')
+        with self.assertRaises(SystemExit) as cont:
+            self.call_exec('v0', '--')
+        self.assertEqual(cont.exception.code, 2)
+
+    def test_activate_removed_while_waiting(self):
+        self.call_main('install-file', self.empty_tgz_path, 'v0')
+        self.call_main('install-file', self.empty_tgz_path, 'v1')
+        active_lock = cudnnenv.active_lock
+
+        @contextlib.contextmanager
+        def prune_while_waiting():
+            # `prune` removes the version before this gets the lock
+            cudnnenv.remove_version('v0')
+            with active_lock():
+                yield
+
+        with mock.patch.object(cudnnenv, 'active_lock',
+                               new=prune_while_waiting):
+            with self.assertRaises(SystemExit) as cont:
+                self.call_main('activate', 'v0')
+        self.assertEqual(cont.exception.code, 2)
+        self.assertEqual(
+            os.readlink(os.path.join(self.path, 'active')), 'versions/v1')
+
+    def read_env_snippet(self):
+        with open(os.path.join(self.path, 'env.sh')) as f:
+            return f.readline().strip()
+
+    def test_activate_env_snippet(self):
+        self.call_main('install-file', self.empty_tgz_path, 'v0')
+        self.assertEqual(self.read_env_snippet(), '# active: versions/v0')
+        self.call_main('deactivate')
+        self.assertEqual(self.read_env_snippet(), '# active: (none)')
+
+    def test_init(self):
+        self.call_main('install-file', self.empty_tgz_path, 'v0')
+        # Activated by a version without shell integration
+        os.remove(os.path.join(self.path, 'env.sh'))
+        self.clear_stdout()
+        self.call_main('init', 'bash')
+        self.assertEqual(self.read_env_snippet(), '# active: versions/v0')
+        self.assertIn('PROMPT_COMMAND=', self.get_stdout())
+
+        self.clear_stdout()
+        self.call_main('init', 'zsh')
+        self.assertIn('add-zsh-hook precmd _cudnnenv_hook', self.get_stdout())
+
+    def test_verify(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data):
+            self.call_main('install', 'v0', '--stream')
+            self.call_main('install', 'v0-alias')
+        self.call_main('install-file', self.empty_tgz_path, 'v1')
+        self.clear_stdout()
+        self.call_main('verify', '--full')
+        self.assertEqual(self.get_stdout(), 'v0: ok\nv1: ok\n')
+
+        header = os.path.join(self.path, 'versions', 'v0', 'cuda', 'include',
+                              'cudnn.h')
+        os.remove(header)
+        self.clear_stdout()
+        with self.assertRaises(SystemExit) as cont:
+            self.call_main('verify', 'v0')
+        self.assertEqual(cont.exception.code, 1)
+        self.assertEqual(
+            self.get_stdout(),
+            'v0: failed\n  cuda/include/cudnn.h: missing\n')
+
+    def test_verify_without_manifest(self):
+        os.makedirs(os.path.join(self.path, 'versions', 'v0'))
+        with self.assertRaises(SystemExit) as cont:
+            self.call_main('verify', 'v0')
+        self.assertEqual(cont.exception.code, 1)
+        self.assertIn('no manifest', self.get_stdout())
+
+    def test_activate_verify(self):
+        data = fixtures.make_archive({'cuda/include/cudnn.h': b'header'})
+        with self.serve(data):
+            self.call_main('install', 'v0')
+        self.call_main('deactivate')
+        self.call_main('activate', 'v0', '--verify')
+        self.assertEqual(
+            os.readlink(os.path.join(self.path, 'active')), 'versions/v0')
+
+        self.call_main('deactivate')
+        header = os.path.join(self.path, 'versions', 'v0', 'cuda', 'include',
+                              'cudnn.h')
+        with open(header, 'a') as f:
+            f.write('x')
+        with self.assertRaises(SystemExit) as cont:
+            self.call_main('activate', 'v0', '--verify')
+        self.assertEqual(cont.exception.code, 1)
+        self.assertFalse(os.path.lexists(os.path.join(self.path, 'active')))
+
     def test_clean_environment(self):
         self.call_main('versions')
         self.assertEqual(self.get_stdout(), '''Available versions:
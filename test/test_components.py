@@ -0,0 +1,104 @@
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+
+from cudnnenv import archive
+from cudnnenv import components
+from test import fixtures
+
+
+class TestComponents(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def test_get_component(self):
+        self.assertEqual(
+            components.get_component('cuda/include/cudnn.h'), 'headers')
+        self.assertEqual(
+            components.get_component('cuda/include/cudnn_backend'),
+            'headers')
+        self.assertEqual(
+            components.get_component('cuda/lib64/libcudnn.so.8'), 'shared')
+        self.assertEqual(
+            components.get_component('cuda/lib/libcudnn.8.dylib'), 'shared')
+        self.assertEqual(
+            components.get_component('cuda/lib64/libcudnn_static.a'),
+            'static')
+        self.assertEqual(
+            components.get_component(
+                'cudnn-linux-x86_64-8.3.2.44_cuda11.5-archive/lib/'
+                'libcudnn_cnn_infer_static.a'),
+            'static')
+        self.assertIsNone(
+            components.get_component('cuda/NVIDIA_SLA_cuDNN_Support.txt'))
+
+    def test_select(self):
+        select = components.select(('headers',))
+        self.assertEqual(select('cuda/include/cudnn.h'), 'cuda/include/cudnn.h')
+        self.assertIsNone(select('cuda/lib64/libcudnn.so'))
+        self.assertEqual(select('cuda/LICENSE'), 'cuda/LICENSE')
+        self.assertIsNone(components.select(components.components))
+
+    def test_select_rename(self):
+        # Components are decided by names after a layout renames them
+        select = components.select(
+            ('shared',), archive.flat_layout('lib64'))
+        self.assertIsNone(select('cudnn-6.5-linux-x64-v2/cudnn.h'))
+        self.assertEqual(select('cudnn-6.5-linux-x64-v2/libcudnn.so'),
+                         'cuda/lib64/libcudnn.so')
+        self.assertIsNone(select('cudnn-6.5-linux-x64-v2'))
+
+    def test_extract(self):
+        data = fixtures.make_archive({
+            'cuda/include/cudnn.h': b'header',
+            'cuda/lib64/libcudnn.so.8': b'shared',
+            'cuda/lib64/libcudnn_static.a': b'static',
+        }, symlinks={'cuda/lib64/libcudnn.so': 'libcudnn.so.8'})
+        archive.extract(io.BytesIO(data), self.path,
+                        components.select(('shared',)), writers=0)
+        self.assertEqual(os.listdir(os.path.join(self.path, 'cuda')),
+                         ['lib64'])
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.path, 'cuda', 'lib64'))),
+            ['libcudnn.so', 'libcudnn.so.8'])
+
+    def test_extract_hardlink(self):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode='w') as tar:
+            info = tarfile.TarInfo('cuda/lib64/libcudnn_static.a')
+            info.size = 6
+            tar.addfile(info, io.BytesIO(b'static'))
+            info = tarfile.TarInfo('cuda/lib64/libcudnn_static_v8.a')
+            info.type = tarfile.LNKTYPE
+            info.linkname = 'cuda/lib64/libcudnn_static.a'
+            tar.addfile(info)
+        buf.seek(0)
+        archive.extract(buf, self.path, components.select(('shared',)),
+                        writers=0)
+        self.assertEqual(os.listdir(self.path), [])
+
+    def test_describe(self):
+        self.assertEqual(components.describe(components.components), 'full')
+        self.assertEqual(
+            components.describe(('shared', 'headers')), 'no-static')
+        self.assertEqual(
+            components.describe(('static', 'headers')), 'headers, static')
+        self.assertEqual(components.describe(()), 'none')
+
+    def test_save_load(self):
+        self.assertEqual(components.load(self.path), components.components)
+        components.save(self.path, ('shared', 'headers'))
+        self.assertEqual(components.load(self.path), ('headers', 'shared'))
+        self.assertEqual(
+            components.missing(self.path, components.components),
+            ('static',))
+        self.assertEqual(components.missing(self.path, ('headers',)), ())
@@ -0,0 +1,117 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cudnnenv import dedupe
+from cudnnenv import manifest
+
+
+class TestDedupe(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.roots = []
+        for ver, library in (('a', b'library-a'), ('b', b'library-b'),
+                             ('c', b'library-a')):
+            root = os.path.join(self.path, ver)
+            self.write(root, 'include/cudnn.h', b'header')
+            self.write(root, 'lib64/libcudnn.so', library)
+            manifest.build(root, jobs=1).save(root)
+            self.roots.append(root)
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def write(self, root, name, data):
+        path = os.path.join(root, *name.split('/'))
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def inode(self, ver, name):
+        return os.stat(os.path.join(self.path, ver, *name.split('/'))).st_ino
+
+    def verify(self, ver):
+        root = os.path.join(self.path, ver)
+        return manifest.verify(root, manifest.Manifest.load(root), True)
+
+    def test_dedupe(self):
+        linked, reclaimed = dedupe.dedupe(self.roots)
+        self.assertEqual(linked, 3)
+        self.assertEqual(reclaimed, len(b'header') * 2 + len(b'library-a'))
+        header = 'include/cudnn.h'
+        self.assertEqual(self.inode('a', header), self.inode('b', header))
+        self.assertEqual(self.inode('a', header), self.inode('c', header))
+        library = 'lib64/libcudnn.so'
+        self.assertEqual(self.inode('a', library), self.inode('c', library))
+        self.assertNotEqual(self.inode('a', library), self.inode('b', library))
+        for ver in ('a', 'b', 'c'):
+            self.assertEqual(self.verify(ver), [])
+
+        # Files already linked are not linked again
+        self.assertEqual(dedupe.dedupe(self.roots), (0, 0))
+
+    def test_dry_run(self):
+        header = 'include/cudnn.h'
+        inode = self.inode('b', header)
+        self.assertEqual(dedupe.dedupe(self.roots, dry_run=True),
+                         (3, len(b'header') * 2 + len(b'library-a')))
+        self.assertEqual(self.inode('b', header), inode)
+
+    def test_targets(self):
+        linked, _ = dedupe.dedupe(self.roots, targets=[self.roots[1]])
+        self.assertEqual(linked, 2)
+        library = 'lib64/libcudnn.so'
+        self.assertNotEqual(self.inode('a', library), self.inode('c', library))
+
+    def test_remove_linked(self):
+        dedupe.dedupe(self.roots)
+        shutil.rmtree(self.roots[0])
+        self.assertEqual(self.verify('b'), [])
+        self.assertEqual(self.verify('c'), [])
+
+    def test_modified(self):
+        # A file which differs from its manifest is not linked
+        self.write(self.roots[2], 'lib64/libcudnn.so', b'library-b')
+        linked, _ = dedupe.dedupe(self.roots)
+        self.assertEqual(linked, 2)
+        library = 'lib64/libcudnn.so'
+        self.assertNotEqual(self.inode('b', library), self.inode('c', library))
+
+    def test_mode(self):
+        os.chmod(os.path.join(self.roots[1], 'include', 'cudnn.h'), 0o600)
+        manifest.build(self.roots[1], jobs=1).save(self.roots[1])
+        linked, _ = dedupe.dedupe(self.roots)
+        self.assertEqual(linked, 2)
+        header = 'include/cudnn.h'
+        self.assertNotEqual(self.inode('a', header), self.inode('b', header))
+
+    def test_without_manifest(self):
+        shutil.rmtree(os.path.join(self.roots[2], manifest.metadata_dir))
+        linked, _ = dedupe.dedupe(self.roots)
+        self.assertEqual(linked, 3)
+
+    def test_keep_most_linked(self):
+        # The file with other links is kept, so that they share it too
+        outside = os.path.join(self.path, 'outside')
+        os.link(os.path.join(self.roots[1], 'include', 'cudnn.h'), outside)
+        linked, reclaimed = dedupe.dedupe(self.roots)
+        self.assertEqual(linked, 3)
+        self.assertEqual(reclaimed, len(b'header') * 2 + len(b'library-a'))
+        self.assertEqual(self.inode('a', 'include/cudnn.h'),
+                         os.stat(outside).st_ino)
+
+    def test_partially_linked(self):
+        # An inode is only reclaimed when all of its links are replaced
+        for root, names in ((self.roots[0], ('outside1', 'outside2')),
+                            (self.roots[2], ('outside3',))):
+            for name in names:
+                os.link(os.path.join(root, 'lib64', 'libcudnn.so'),
+                        os.path.join(self.path, name))
+        linked, reclaimed = dedupe.dedupe(self.roots)
+        self.assertEqual(linked, 3)
+        self.assertEqual(reclaimed, len(b'header') * 2)
@@ -0,0 +1,199 @@
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from cudnnenv import download
+from test import fixtures
+
+
+class CountingReader(object):
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sizes = []
+
+    def read(self, size=-1):
+        self.sizes.append(size)
+        return self.fileobj.read(size)
+
+
+class TestHashReader(unittest.TestCase):
+
+    def test_hash(self):
+        reader = download.HashReader(io.BytesIO(b'abc' * 1000))
+        reader.read(10)
+        reader.drain(100)
+        self.assertEqual(reader.size, 3000)
+        self.assertEqual(reader.hexdigest(), fixtures.sha256(b'abc' * 1000))
+
+    def test_check(self):
+        reader = download.HashReader(io.BytesIO(b'abc'))
+        reader.drain()
+        reader.check('url', fixtures.sha256(b'abc'))
+        reader.check('url', None)
+        with self.assertRaises(download.ChecksumError):
+            reader.check('url', fixtures.sha256(b'abd'))
+
+    def test_copy_chunk_size(self):
+        src = CountingReader(io.BytesIO(b'x' * 1000))
+        dst = io.BytesIO()
+        download.copy(src, dst, 64)
+        self.assertEqual(dst.getvalue(), b'x' * 1000)
+        self.assertEqual(set(src.sizes), {64})
+
+
+class TestDownload(unittest.TestCase):
+
+    data = b'cudnn' * 10000
+
+    def test_download(self):
+        with fixtures.ArchiveServer({'a.tgz': self.data}) as server:
+            out = io.BytesIO()
+            digest = download.download(
+                server.url('a.tgz'), out, fixtures.sha256(self.data), 1000)
+        self.assertEqual(out.getvalue(), self.data)
+        self.assertEqual(digest, fixtures.sha256(self.data))
+
+    def test_download_checksum_error(self):
+        with fixtures.ArchiveServer({'a.tgz': self.data}) as server:
+            with self.assertRaises(download.ChecksumError) as cont:
+                download.download(
+                    server.url('a.tgz'), io.BytesIO(), fixtures.sha256(b''))
+        self.assertEqual(cont.exception.actual, fixtures.sha256(self.data))
+
+    def test_offline(self):
+        with fixtures.ArchiveServer({'a.tgz': self.data}) as server:
+            download.offline = True
+            try:
+                with self.assertRaises(download.OfflineError):
+                    download.download(server.url('a.tgz'), io.BytesIO())
+            finally:
+                download.offline = False
+            self.assertEqual(server.requests, [])
+
+
+class TestDownloadSegmented(unittest.TestCase):
+
+    data = os.urandom(1000) * 10
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'a.tgz')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def ranges(self, server):
+        return [headers.get('Range') for _, headers in server.requests]
+
+    def test_download_segmented(self):
+        with fixtures.ArchiveServer({'a.tgz': self.data}) as server:
+            digest = download.download_segmented(
+                server.url('a.tgz'), self.path, fixtures.sha256(self.data),
+                connections=3, size=3000)
+        self.assertEqual(self.read(), self.data)
+        self.assertEqual(digest, fixtures.sha256(self.data))
+        self.assertEqual(
+            sorted(self.ranges(server)),
+            ['bytes=0-0', 'bytes=0-2999', 'bytes=3000-5999',
+             'bytes=6000-8999', 'bytes=9000-9999'])
+
+    def test_download_segmented_checksum_error(self):
+        with fixtures.ArchiveServer({'a.tgz': self.data}) as server:
+            with self.assertRaises(download.ChecksumError):
+                download.download_segmented(
+                    server.url('a.tgz'), self.path, fixtures.sha256(b''),
+                    connections=3, size=3000)
+
+    def test_download_segmented_without_range(self):
+        files = {'a.tgz': self.data}
+        with fixtures.ArchiveServer(files, support_range=False) as server:
+            download.download_segmented(
+                server.url('a.tgz'), self.path, fixtures.sha256(self.data),
+                connections=3, size=3000)
+        self.assertEqual(self.read(), self.data)
+        self.assertEqual(len(server.requests), 2)
+
+
+class TestDownloadResumable(unittest.TestCase):
+
+    data = os.urandom(1000) * 10
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'a.part')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def write_partial(self, data, url, etag=None):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        with open(self.path + '.json', 'w') as f:
+            json.dump({'url': url, 'sha256sum': fixtures.sha256(self.data),
+                       'etag': etag}, f)
+
+    def download(self, server):
+        return download.download_resumable(
+            server.url('a.tgz'), self.path, fixtures.sha256(self.data))
+
+    def last_headers(self, server):
+        return server.requests[-1][1]
+
+    def test_download(self):
+        with fixtures.ArchiveServer({'a.tgz': self.data}) as server:
+            self.download(server)
+            with open(self.path + '.json') as f:
+                metadata = json.load(f)
+        self.assertEqual(self.read(), self.data)
+        self.assertEqual(metadata['url'], server.url('a.tgz'))
+        self.assertEqual(metadata['etag'], '"%s"' % fixtures.sha256(self.data))
+
+    def test_resume(self):
+        with fixtures.ArchiveServer({'a.tgz': self.data}) as server:
+            etag = '"%s"' % fixtures.sha256(self.data)
+            self.write_partial(self.data[:3000], server.url('a.tgz'), etag)
+            self.download(server)
+        self.assertEqual(self.read(), self.data)
+        self.assertEqual(self.last_headers(server)['Range'], 'bytes=3000-')
+        self.assertEqual(self.last_headers(server)['If-Range'], etag)
+
+    def test_resume_completed(self):
+        with fixtures.ArchiveServer({'a.tgz': self.data}) as server:
+            self.write_partial(self.data, server.url('a.tgz'))
+            self.download(server)
+        self.assertEqual(self.read(), self.data)
+
+    def test_resume_changed(self):
+        with fixtures.ArchiveServer({'a.tgz': self.data}) as server:
+            self.write_partial(b'x' * 3000, server.url('a.tgz'), '"old"')
+            self.download(server)
+        self.assertEqual(self.read(), self.data)
+
+    def test_resume_other_url(self):
+        with fixtures.ArchiveServer({'a.tgz': self.data}) as server:
+            self.write_partial(b'x' * 3000, server.url('b.tgz'))
+            self.download(server)
+        self.assertEqual(self.read(), self.data)
+        self.assertNotIn('Range', self.last_headers(server))
+
+    def test_resume_corrupted(self):
+        with fixtures.ArchiveServer({'a.tgz': self.data}) as server:
+            self.write_partial(b'x' * 3000, server.url('a.tgz'))
+            with self.assertRaises(download.ChecksumError):
+                self.download(server)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + '.json'))
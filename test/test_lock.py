@@ -0,0 +1,54 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from cudnnenv import lock
+
+
+class TestFileLock(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'a.lock')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_lock(self):
+        with lock.FileLock(self.path):
+            self.assertFalse(lock.FileLock(self.path).acquire(blocking=False))
+        other = lock.FileLock(self.path)
+        self.assertTrue(other.acquire(blocking=False))
+        other.release()
+
+    def test_timeout(self):
+        with lock.FileLock(self.path):
+            with self.assertRaises(lock.LockTimeout):
+                lock.FileLock(self.path, timeout=0.1).acquire()
+
+    def test_wait(self):
+        held = lock.FileLock(self.path)
+        held.acquire()
+        timer = threading.Timer(0.1, held.release)
+        timer.start()
+        with lock.FileLock(self.path, timeout=5):
+            self.assertIsNone(held.fd)
+        timer.join()
+
+    def test_owner(self):
+        with lock.FileLock(self.path) as held:
+            self.assertEqual(lock.read_owner(self.path), lock.get_owner())
+            self.assertIsNone(held.stale_owner)
+        self.assertIsNone(lock.read_owner(self.path))
+
+    def test_stale_owner(self):
+        # A holder which was killed leaves its owner in the file
+        with open(self.path, 'w') as f:
+            f.write('host:1')
+        with lock.FileLock(self.path) as held:
+            self.assertEqual(held.stale_owner, 'host:1')
+            self.assertEqual(lock.read_owner(self.path), lock.get_owner())
@@ -0,0 +1,86 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cudnnenv import manifest
+from test import fixtures
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        lib = os.path.join(self.path, 'cuda', 'lib64')
+        os.makedirs(lib)
+        self.library = os.path.join(lib, 'libcudnn.so.8')
+        with open(self.library, 'wb') as f:
+            f.write(b'library')
+        os.symlink('libcudnn.so.8', os.path.join(lib, 'libcudnn.so'))
+        self.manifest = manifest.build(self.path, jobs=2)
+        self.manifest.save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def verify(self, full=False):
+        return manifest.verify(
+            self.path, manifest.Manifest.load(self.path), full, jobs=2)
+
+    def test_build(self):
+        record = self.manifest.files['cuda/lib64/libcudnn.so.8']
+        self.assertEqual(record['size'], 7)
+        self.assertEqual(record['sha256'], fixtures.sha256(b'library'))
+        self.assertEqual(
+            self.manifest.links, {'cuda/lib64/libcudnn.so': 'libcudnn.so.8'})
+        # The manifest itself is not recorded
+        self.assertEqual(list(self.manifest.files), ['cuda/lib64/libcudnn.so.8'])
+
+    def test_verify(self):
+        self.assertEqual(self.verify(), [])
+        self.assertEqual(self.verify(full=True), [])
+
+    def test_truncated(self):
+        with open(self.library, 'wb') as f:
+            f.write(b'lib')
+        self.assertEqual(
+            self.verify(),
+            [('cuda/lib64/libcudnn.so.8', 'size changed from 7 to 3')])
+
+    def test_bitrot(self):
+        # The content changes without changing the size and the mtime.
+        # Whole seconds survive utime() exactly, unlike a float st_mtime.
+        os.utime(self.library, (1000000000, 1000000000))
+        manifest.build(self.path, jobs=2).save(self.path)
+        with open(self.library, 'wb') as f:
+            f.write(b'librarx')
+        os.utime(self.library, (1000000000, 1000000000))
+        self.assertEqual(self.verify(), [])
+        self.assertEqual(
+            self.verify(full=True),
+            [('cuda/lib64/libcudnn.so.8', 'checksum mismatch')])
+
+    def test_modified(self):
+        st = os.stat(self.library)
+        os.utime(self.library, (st.st_atime, st.st_mtime + 10))
+        self.assertEqual(
+            self.verify(), [('cuda/lib64/libcudnn.so.8', 'modified')])
+
+    def test_mode(self):
+        os.chmod(self.library, 0o600)
+        problems = self.verify()
+        self.assertEqual(len(problems), 1)
+        self.assertIn('mode changed', problems[0][1])
+
+    def test_removed(self):
+        shutil.rmtree(os.path.join(self.path, 'cuda'))
+        self.assertEqual(
+            self.verify(),
+            [('cuda/lib64/libcudnn.so', 'missing'),
+             ('cuda/lib64/libcudnn.so.8', 'missing')])
+
+    def test_load_missing(self):
+        shutil.rmtree(os.path.join(self.path, manifest.metadata_dir))
+        self.assertIsNone(manifest.Manifest.load(self.path))
@@ -0,0 +1,84 @@
+from __future__ import unicode_literals
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from cudnnenv import catalog
+from cudnnenv import remote
+from test import fixtures
+
+
+tables = {
+    'linux': {
+        'versions': [[
+            'v9.0.0-cuda12', 'v9.0.0',
+            'local_installers/12.0/'
+            'cudnn-linux-x86_64-9.0.0.312_cuda12-archive.tar.xz',
+            'a' * 64]],
+        'aliases': [['v9-cuda12', 'v9.0.0-cuda12']],
+    },
+}
+
+
+class TestRemote(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'catalog.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def serve(self, data):
+        return fixtures.ArchiveServer({'catalog.json': data})
+
+    def test_refresh(self):
+        with self.serve(json.dumps(tables).encode('utf-8')) as server:
+            url = server.url('catalog.json')
+            self.assertTrue(remote.refresh(url, self.path))
+            self.assertFalse(remote.refresh(url, self.path))
+        self.assertEqual(
+            server.requests[-1][1]['If-None-Match'],
+            '"%s"' % fixtures.sha256(json.dumps(tables).encode('utf-8')))
+        self.assertEqual(catalog.read_cached(self.path), tables)
+
+    def test_refresh_invalid(self):
+        invalid = {'linux': {'versions': [['v9', 'v9']]}}
+        with self.serve(json.dumps(invalid).encode('utf-8')) as server:
+            with self.assertRaises(remote.CatalogError):
+                remote.refresh(server.url('catalog.json'), self.path)
+        self.assertIsNone(catalog.read_cached(self.path))
+
+    def test_validate(self):
+        remote.validate(tables)
+        row = tables['linux']['versions'][0]
+        for invalid in (['../v9'] + row[1:], ['.staging'] + row[1:],
+                        [row[0], '/v9'] + row[2:],
+                        [row[0], 'v9/../..'] + row[2:],
+                        row[:2] + ['../../archive.tar.xz', row[3]],
+                        row[:2] + ['local_installers//a.tar.xz', row[3]],
+                        row[:3] + ['a' * 63], row[:3] + ['A' * 64]):
+            with self.assertRaises(remote.CatalogError):
+                remote.validate({'linux': {'versions': [invalid]}})
+        with self.assertRaises(remote.CatalogError):
+            remote.validate({'linux': {'versions': [row],
+                                       'aliases': [['..', row[0]]]}})
+
+    def test_is_fresh(self):
+        with self.serve(json.dumps(tables).encode('utf-8')) as server:
+            url = server.url('catalog.json')
+            self.assertFalse(remote.is_fresh(self.path, url, 60))
+            remote.refresh(url, self.path)
+        self.assertTrue(remote.is_fresh(self.path, url, 60))
+        self.assertFalse(remote.is_fresh(self.path, url, 0))
+        self.assertFalse(remote.is_fresh(self.path, url + '?other', 60))
+
+    def test_load(self):
+        entries = catalog.load('linux', tables)
+        self.assertIs(entries['v9-cuda12'], entries['v9.0.0-cuda12'])
+        self.assertEqual(entries['v9.0.0-cuda12'].cuda_version, (12,))
+        self.assertIn('v8.4.0-cuda116', entries)
+        self.assertNotIn('v9.0.0-cuda12', catalog.load('darwin', tables))
@@ -0,0 +1,63 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from cudnnenv import shell
+
+try:
+    from shutil import which
+except ImportError:
+    from distutils.spawn import find_executable as which
+
+
+_bash = which('bash')
+
+
+class TestShell(unittest.TestCase):
+
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        self.snippet_path = os.path.join(self.home, shell.snippet_name)
+
+    def tearDown(self):
+        shutil.rmtree(self.home, ignore_errors=True)
+
+    def write_snippet(self, target):
+        with open(self.snippet_path, 'w') as f:
+            f.write(shell.render_snippet(self.home, target))
+
+    def test_snippet(self):
+        self.write_snippet('versions/v0')
+        self.assertEqual(
+            shell.read_key(self.snippet_path), shell.get_key('versions/v0'))
+        with open(self.snippet_path) as f:
+            self.assertIn(
+                os.path.join(self.home, 'versions', 'v0', 'cuda'), f.read())
+
+    def test_read_key_missing(self):
+        self.assertIsNone(shell.read_key(self.snippet_path))
+
+    @unittest.skipIf(_bash is None, 'bash is not installed')
+    def test_bash_hook(self):
+        self.write_snippet('versions/v0')
+        switch = shell.render_snippet(self.home, 'versions/v1')
+        script = shell.render_hook('bash', self.home, 'lib64') + '''
+echo "$LD_LIBRARY_PATH $CPATH $CUDNNENV_VERSION"
+cat > %s <<'EOF'
+%sEOF
+_cudnnenv_hook
+echo "$LD_LIBRARY_PATH $CPATH $CUDNNENV_VERSION"
+''' % (self.snippet_path, switch)
+        env = {'LD_LIBRARY_PATH': '/usr/lib', 'PATH': os.environ['PATH']}
+        output = subprocess.check_output([_bash, '-c', script], env=env)
+
+        cuda = os.path.join(self.home, 'versions', '%s', 'cuda')
+        expected = []
+        for ver in ('v0', 'v1'):
+            expected.append('%s/lib64:/usr/lib %s/include %s' % (
+                cuda % ver, cuda % ver, ver))
+        self.assertEqual(output.decode('utf-8').splitlines(), expected)
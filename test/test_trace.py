@@ -0,0 +1,82 @@
+from __future__ import unicode_literals
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from cudnnenv import trace
+
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.trace_path = os.path.join(self.path, 'trace.jsonl')
+        trace.enable(self.trace_path)
+
+    def tearDown(self):
+        trace.disable()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def read_events(self):
+        trace.disable()
+        with open(self.trace_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_phase(self):
+        phase = trace.phase('write', path='a')
+        for size in (10, 20):
+            start = phase.clock()
+            phase.add(start, size)
+        phase.emit()
+        event, = self.read_events()
+        self.assertEqual(event['phase'], 'write')
+        self.assertEqual(event['path'], 'a')
+        self.assertEqual(event['bytes'], 30)
+        self.assertLessEqual(event['start'], event['end'])
+        self.assertLessEqual(event['duration'], event['end'] - event['start'])
+        if event['duration'] > 0:
+            self.assertAlmostEqual(
+                event['throughput'], 30 / event['duration'])
+
+    def test_phase_without_work(self):
+        trace.phase('write').emit()
+        self.assertEqual(self.read_events(), [])
+
+    def test_span(self):
+        with trace.span('transfer', url='u') as phase:
+            phase.count(100)
+        with self.assertRaises(ValueError):
+            with trace.span('connect'):
+                raise ValueError('refused')
+        transfer, connect = self.read_events()
+        self.assertEqual(transfer['bytes'], 100)
+        self.assertNotIn('error', transfer)
+        self.assertEqual(connect['error'], 'refused')
+        self.assertNotIn('bytes', connect)
+
+    def test_context(self):
+        with trace.context(version='v0'):
+            with trace.context(url='u'):
+                phase = trace.phase('hash')
+            other = trace.phase('write')
+        phase.add(phase.clock())
+        phase.emit()
+        other.add(other.clock())
+        other.emit()
+        hashed, written = self.read_events()
+        self.assertEqual((hashed['version'], hashed['url']), ('v0', 'u'))
+        self.assertEqual(written['version'], 'v0')
+        self.assertNotIn('url', written)
+
+    def test_disabled(self):
+        trace.disable()
+        self.assertFalse(trace.is_enabled())
+        phase = trace.phase('write')
+        phase.add(phase.clock(), 10)
+        phase.emit()
+        with trace.span('transfer') as phase:
+            phase.count(10)
+        self.assertEqual(self.read_events(), [])
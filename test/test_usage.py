@@ -0,0 +1,64 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cudnnenv import usage
+
+
+class TestUsage(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.usage = usage.Usage(os.path.join(self.path, 'usage'))
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def test_touch(self):
+        self.assertIsNone(self.usage.last_used('v0'))
+        self.usage.touch('v0', 'activated')
+        os.utime(self.usage.get_path('v0', 'activated'), (100, 100))
+        self.assertEqual(self.usage.last_used('v0'), 100)
+        self.usage.touch('v0')
+        os.utime(self.usage.get_path('v0', 'used'), (200, 200))
+        self.assertEqual(self.usage.get('v0', 'activated'), 100)
+        self.assertEqual(self.usage.last_used('v0'), 200)
+
+        self.usage.touch('v0', 'activated')
+        self.assertGreater(self.usage.get('v0', 'activated'), 200)
+
+    def test_pin(self):
+        self.assertFalse(self.usage.is_pinned('v0'))
+        self.usage.pin('v0')
+        self.assertTrue(self.usage.is_pinned('v0'))
+        self.usage.unpin('v0')
+        self.usage.unpin('v0')
+        self.assertFalse(self.usage.is_pinned('v0'))
+
+    def test_remove(self):
+        self.usage.touch('v0')
+        self.usage.pin('v0')
+        self.usage.touch('v1')
+        self.usage.remove('v0')
+        self.assertEqual(os.listdir(self.usage.root), ['v1.used'])
+
+    def test_measure(self):
+        roots = []
+        for ver in ('v0', 'v1'):
+            root = os.path.join(self.path, ver)
+            os.makedirs(os.path.join(root, 'lib'))
+            with open(os.path.join(root, 'lib', 'libcudnn.so.8'), 'wb') as f:
+                f.write(b'x' * 100)
+            os.symlink('libcudnn.so.8',
+                       os.path.join(root, 'lib', 'libcudnn.so'))
+            roots.append(root)
+        os.link(os.path.join(roots[0], 'lib', 'libcudnn.so.8'),
+                os.path.join(roots[1], 'lib', 'libcudnn.so.8.0'))
+        sizes = usage.measure(roots)
+        self.assertEqual(usage.get_total_size(sizes, roots[:1]), 100)
+        self.assertEqual(usage.get_total_size(sizes, roots[1:]), 200)
+        # A file linked from both trees is counted once
+        self.assertEqual(usage.get_total_size(sizes, roots), 200)
@@ -6,6 +6,7 @@ try:
 except ImportError:
     import StringIO
     StringIO = StringIO.StringIO
+import argparse
 import os
 import shutil
 import sys
@@ -15,23 +16,7 @@ import unittest
 import cudnnenv
 
 
-class TestSafeTempDir(unittest.TestCase):
-
-    def test_safe_temp_dir(self):
-        with cudnnenv.safe_temp_dir() as path:
-            self.assertTrue(os.path.exists(path))
-        self.assertFalse(os.path.exists(path))
-
-    def test_safe_temp_dir_error(self):
-        try:
-            with cudnnenv.safe_temp_dir() as path:
-                raise Exception
-        except Exception:
-            pass
-        self.assertFalse(os.path.exists(path))
-
-
-class TestSafeDir(unittest.TestCase):
+class TestSafeStagingDir(unittest.TestCase):
 
     def setUp(self):
         self.path = tempfile.mkdtemp()
@@ -39,21 +24,24 @@ class TestSafeDir(unittest.TestCase):
     def tearDown(self):
         shutil.rmtree(self.path, ignore_errors=True)
 
-    def test_safe_dir(self):
+    def test_safe_staging_dir(self):
         path = os.path.join(self.path, 'd')
-        with cudnnenv.safe_dir(path) as p:
+        with cudnnenv.safe_staging_dir(path) as p:
             self.assertTrue(os.path.exists(p))
+            self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(p))
         self.assertTrue(os.path.exists(path))
 
-    def test_safe_dir_error(self):
+    def test_safe_staging_dir_error(self):
         path = os.path.join(self.path, 'd')
         try:
-            with cudnnenv.safe_dir(path) as p:
+            with cudnnenv.safe_staging_dir(path) as p:
                 raise Exception
         except Exception:
             pass
         self.assertFalse(os.path.exists(p))
         self.assertFalse(os.path.exists(path))
+        self.assertEqual(os.listdir(self.path), [])
 
 
 class TestYesNo(unittest.TestCase):
@@ -72,3 +60,18 @@ class TestYesNo(unittest.TestCase):
     def test_invalid(self):
         sys.stdin = StringIO('a\nb\nc\nd\ny\nn\n')
         self.assertTrue(cudnnenv.yes_no_query('q'))
+
+
+class TestParseSize(unittest.TestCase):
+
+    def test_parse_size(self):
+        self.assertEqual(cudnnenv.parse_size('100'), 100)
+        self.assertEqual(cudnnenv.parse_size('16k'), 16 << 10)
+        self.assertEqual(cudnnenv.parse_size('16M'), 16 << 20)
+        self.assertEqual(cudnnenv.parse_size('1.5G'), 3 << 29)
+
+    def test_invalid(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            cudnnenv.parse_size('16X')
+        with self.assertRaises(argparse.ArgumentTypeError):
+            cudnnenv.parse_size('')